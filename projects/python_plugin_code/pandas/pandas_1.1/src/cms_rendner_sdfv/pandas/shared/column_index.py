@@ -0,0 +1,228 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+from collections import OrderedDict
+from typing import Any, Optional, Set, Tuple
+
+import numpy as np
+from pandas import DataFrame, Index, Series, StringDtype, Timedelta, Timestamp, factorize, isna
+
+from cms_rendner_sdfv.base.types import QuickFilter, QuickFilterOp
+
+# Quick filters select the rows of a single column by a range or by equality. Evaluating them requires a scan of
+# the whole column. Users often filter the same columns repeatedly with different values, the ColumnIndexes answer
+# these queries in O(log n + k) for k matching rows:
+#
+#   - range queries (LT, LE, GT, GE, BETWEEN) by a binary search in the sorted values of a column
+#   - equality queries (EQ, IN) by a map from the factorized values to the positions of the rows
+#
+# The indexes are built on first use and are dropped, least recently used first, if they exceed the memory budget.
+# An index which exceeds the budget on its own isn't kept at all and the column is scanned.
+# Columns which can't be indexed (e.g. mixed types, categorical or other extension types) are scanned as before.
+
+
+def _position_dtype(rows: int) -> type:
+    return np.int32 if rows <= np.iinfo(np.int32).max else np.intp
+
+
+class _SortedValues:
+    def __init__(self, values: np.ndarray):
+        if values.dtype.kind == "O" and isna(values).any():
+            # comparisons with missing values break the sort order of objects
+            raise TypeError("Object values with missing values can't be sorted.")
+        # the order of equal values doesn't matter, the found positions are sorted
+        order = np.argsort(values).astype(_position_dtype(len(values)), copy=False)
+        sorted_values = values[order]
+        na = isna(sorted_values)
+        valid = len(sorted_values) - int(na.sum())
+        if na[:valid].any():
+            # missing values have to be sorted to the end
+            raise TypeError("Missing values are not sorted to the end.")
+        self.order = order
+        self.sorted_values = sorted_values[:valid]
+
+    @property
+    def nbytes(self) -> int:
+        return self.order.nbytes + self.sorted_values.nbytes
+
+    def find(self, op: QuickFilterOp, value: Any) -> np.ndarray:
+        values = self.sorted_values
+        if op == QuickFilterOp.BETWEEN:
+            start, end = values.searchsorted(value[0], side="left"), values.searchsorted(value[1], side="right")
+        elif op == QuickFilterOp.GT:
+            start, end = values.searchsorted(value, side="right"), len(values)
+        elif op == QuickFilterOp.GE:
+            start, end = values.searchsorted(value, side="left"), len(values)
+        elif op == QuickFilterOp.LT:
+            start, end = 0, values.searchsorted(value, side="left")
+        else:
+            start, end = 0, values.searchsorted(value, side="right")
+        return np.sort(self.order[start:max(start, end)])
+
+
+class _FactorizedValues:
+    def __init__(self, values: np.ndarray):
+        codes, uniques = factorize(values)
+        self.uniques = Index(uniques)
+        if len(uniques) <= np.iinfo(np.int16).max:
+            # a stable sort of 16-bit integers is a radix sort
+            codes = codes.astype(np.int16)
+        # positions grouped by code, the missing values (code -1) are sorted to the front
+        self.order = np.argsort(codes, kind="stable").astype(_position_dtype(len(values)), copy=False)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]) + (len(codes) - int(counts.sum()))
+
+    @property
+    def nbytes(self) -> int:
+        return self.order.nbytes + self.offsets.nbytes + self.uniques.nbytes
+
+    def find(self, values: list) -> np.ndarray:
+        codes = self.uniques.get_indexer(values)
+        groups = [self.order[self.offsets[c]:self.offsets[c + 1]] for c in np.unique(codes[codes >= 0])]
+        if not groups:
+            return np.empty(0, dtype=self.order.dtype)
+        # positions of a group are sorted (stable sort)
+        return groups[0] if len(groups) == 1 else np.sort(np.concatenate(groups))
+
+
+def _to_comparable(value: Any, series: Series) -> Any:
+    # values of datetime-like columns are also specified as strings
+    kind = series.dtype.kind if isinstance(series.dtype, np.dtype) else None
+    if kind == "M":
+        return Timestamp(value).to_datetime64()
+    if kind == "m":
+        return Timedelta(value).to_timedelta64()
+    return value
+
+
+class ColumnIndexes:
+    def __init__(self, source_frame: DataFrame, max_bytes: int = 0):
+        self._source_frame = source_frame
+        self._max_bytes = max_bytes
+        # (position of column, kind of index) -> index or None if the column can't be indexed
+        self._indexes: OrderedDict = OrderedDict()
+        # keys of the columns which can't be indexed because their indexes exceed the budget
+        self._too_large: Set[Tuple[int, type]] = set()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(0 if i is None else i.nbytes for i in self._indexes.values())
+
+    def set_max_bytes(self, max_bytes: int):
+        if max_bytes > self._max_bytes:
+            # retry the columns whose indexes didn't fit into the previous budget
+            for key in self._too_large:
+                self._indexes.pop(key, None)
+            self._too_large.clear()
+        self._max_bytes = max_bytes
+        self._evict(max_bytes)
+
+    def clear(self):
+        self._indexes.clear()
+        self._too_large.clear()
+
+    def find_positions(self, col: int, quick_filter: QuickFilter) -> np.ndarray:
+        # Returns the sorted positions of the rows matching the quick filter.
+        series = self._source_frame.iloc[:, col]
+        op = quick_filter.op
+        if op == QuickFilterOp.EQ or op == QuickFilterOp.IN:
+            values = [quick_filter.value] if op == QuickFilterOp.EQ else list(quick_filter.value)
+            values = [_to_comparable(v, series) for v in values]
+            # NaN doesn't equal NaN, but is matched by "isin"
+            if not any(_is_missing(v) for v in values):
+                index = self._get_index(col, series, _FactorizedValues)
+                if index is not None:
+                    return index.find(values)
+            return np.flatnonzero(_to_mask(series.isin(values)))
+
+        if op == QuickFilterOp.BETWEEN:
+            value = tuple(_to_comparable(v, series) for v in quick_filter.value)
+        else:
+            value = _to_comparable(quick_filter.value, series)
+        bounds = value if op == QuickFilterOp.BETWEEN else (value,)
+        # comparisons with missing values are always False, but the binary search would find a position
+        index = None if any(_is_missing(b) for b in bounds) else self._get_index(col, series, _SortedValues)
+        if index is not None:
+            try:
+                return index.find(op, value)
+            except TypeError:
+                # not comparable, the scan reports the error of pandas
+                pass
+        return np.flatnonzero(_to_mask(_scan(series, op, value)))
+
+    def _get_index(self, col: int, series: Series, kind: type) -> Optional[Any]:
+        key = (col, kind)
+        if key in self._indexes:
+            self._indexes.move_to_end(key)
+            return self._indexes[key]
+        index = None
+        # every index stores the positions of all rows, no need to build one if these don't fit
+        rows = len(series.index)
+        if rows * np.dtype(_position_dtype(rows)).itemsize <= self._max_bytes:
+            try:
+                index = kind(_get_indexable_values(series))
+            except (TypeError, ValueError):
+                pass
+        if index is not None and index.nbytes > self._max_bytes:
+            # remembered as not indexable, otherwise the index would be rebuilt by every query
+            self._too_large.add(key)
+            index = None
+        if index is not None:
+            self._evict(self._max_bytes - index.nbytes)
+        self._indexes[key] = index
+        return index
+
+    def _evict(self, max_bytes: int):
+        nbytes = self.nbytes
+        # only the built indexes, the columns which can't be indexed are kept
+        for key in [k for k, i in self._indexes.items() if i is not None]:
+            if nbytes <= max_bytes:
+                break
+            nbytes -= self._indexes.pop(key).nbytes
+
+
+def _is_missing(value: Any) -> bool:
+    try:
+        return bool(isna(value))
+    except (TypeError, ValueError):
+        # not a scalar
+        return False
+
+
+def _get_indexable_values(series: Series) -> np.ndarray:
+    # Extension types have their own comparison semantics, which aren't kept by "to_numpy". For example the values
+    # of a categorical are ordered by their categories (or can't be compared at all if unordered). Only strings
+    # are compared like the str values of an object column.
+    if not isinstance(series.dtype, (np.dtype, StringDtype)):
+        raise TypeError(f"Unsupported dtype {series.dtype}.")
+    values = series.to_numpy()
+    if values.dtype.kind not in "biufcmMOU":
+        raise TypeError(f"Unsupported dtype {values.dtype}.")
+    return values
+
+
+def _scan(series: Series, op: QuickFilterOp, value: Any) -> Series:
+    if op == QuickFilterOp.BETWEEN:
+        return (series >= value[0]) & (series <= value[1])
+    if op == QuickFilterOp.GT:
+        return series > value
+    if op == QuickFilterOp.GE:
+        return series >= value
+    if op == QuickFilterOp.LT:
+        return series < value
+    return series <= value
+
+
+def _to_mask(result: Series) -> np.ndarray:
+    return result.to_numpy(dtype=bool, na_value=False)
+
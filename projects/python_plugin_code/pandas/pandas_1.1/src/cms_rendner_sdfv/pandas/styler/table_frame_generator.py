@@ -17,6 +17,7 @@ from typing import Callable, Dict, List, Optional, Set, Tuple
 
 from pandas.io.formats.style import Styler
 
+from cms_rendner_sdfv.base.constants import CELL_MAX_STR_LEN
 from cms_rendner_sdfv.base.table_source import AbstractTableFrameGenerator
 from cms_rendner_sdfv.base.types import Region, TableFrame, TableFrameCell, TableFrameColumn, TableFrameLegend
 from cms_rendner_sdfv.pandas.shared.value_formatter import ValueFormatter
@@ -89,10 +90,28 @@ class TableFrameGenerator(AbstractTableFrameGenerator):
                  exclude_row_header: bool = False,
                  exclude_col_header: bool = False,
                  ) -> TableFrame:
+        chunk = self.__styler_context.visible_frame.get_chunk(region)
+        html_props = self.__compute_html_props(chunk, exclude_row_header, exclude_col_header)
+
+        return self._convert_to_table_frame(
+            html_props,
+            chunk,
+            exclude_row_header=exclude_row_header,
+            exclude_col_header=exclude_col_header,
+            formatter=ValueFormatter(),
+        )
+
+    def generate_styles(self, region: Region = None) -> List[List[Optional[Dict[str, str]]]]:
+        # Computes only the css of the cells of the region (row by row, None for cells without css).
+        chunk = self.__styler_context.visible_frame.get_chunk(region)
+        html_props = self.__compute_html_props(chunk, exclude_row_header=True, exclude_col_header=True)
+        with self._perf_stats.measure("format_css"):
+            return self._extract_css(html_props)
+
+    def __compute_html_props(self, chunk: Chunk, exclude_row_header: bool, exclude_col_header: bool) -> dict:
         # -- Compute styling
         # The plugin only renders the visible (non-hidden cols/rows) of the styler DataFrame
         # therefore the chunk is created from the visible data.
-        chunk = self.__styler_context.visible_frame.get_chunk(region)
         chunk_df = chunk.to_frame()
 
         # The apply/map params are patched to not operate outside the chunk bounds.
@@ -126,15 +145,9 @@ class TableFrameGenerator(AbstractTableFrameGenerator):
         chunk_styler.ctx = _TranslateKeysDict(computed_styler.ctx, translate_key)
         chunk_styler._display_funcs = _TranslateKeysDict(computed_styler._display_funcs, translate_key)
 
-        html_props = chunk_styler._translate()
-
-        return self._convert_to_table_frame(
-            html_props,
-            chunk,
-            exclude_row_header=exclude_row_header,
-            exclude_col_header=exclude_col_header,
-            formatter=ValueFormatter(),
-        )
+        with self._perf_stats.measure("styler_translate"):
+            html_props = chunk_styler._translate()
+        return html_props
 
     def __compute_styling(self,
                           chunk_aware_todos: List[Tuple[Callable, tuple, dict]],
@@ -155,7 +168,8 @@ class TableFrameGenerator(AbstractTableFrameGenerator):
             copy.hide_index()
 
         # operate on copy
-        copy._compute()
+        with self._perf_stats.measure("styler_compute"):
+            copy._compute()
         return copy
 
     @staticmethod
@@ -194,9 +208,12 @@ class TableFrameGenerator(AbstractTableFrameGenerator):
         self._resolve_spans(html_props, "head")
         self._resolve_spans(html_props, "body")
 
-        columns = [] if exclude_col_header else self._extract_columns(html_props, chunk, formatter)
-        index_labels = [] if exclude_row_header else self._extract_index_header_labels(html_props, formatter)
-        cells = self._extract_cells(html_props, formatter)
+        with self._perf_stats.measure("format_columns"):
+            columns = [] if exclude_col_header else self._extract_columns(html_props, chunk, formatter)
+        with self._perf_stats.measure("format_index"):
+            index_labels = [] if exclude_row_header else self._extract_index_header_labels(html_props, formatter)
+        with self._perf_stats.measure("format_cells"):
+            cells = self._extract_cells(html_props, chunk, formatter)
         legend_label = None if exclude_col_header and exclude_row_header else self._extract_legend_label(html_props, formatter)
 
         return TableFrame(
@@ -366,10 +383,13 @@ class TableFrameGenerator(AbstractTableFrameGenerator):
 
         return result
 
-    def _extract_cells(self, html_props: dict, formatter: ValueFormatter) -> List[List[TableFrameCell]]:
+    def _extract_cells(self, html_props: dict, chunk: Chunk, formatter: ValueFormatter) -> List[List[TableFrameCell]]:
         result: List[List[TableFrameCell]] = []
 
         css_dict = self.__create_css_dict(html_props)
+        max_lengths = [
+            self._get_cell_max_str_len(chunk.region.first_col + c, CELL_MAX_STR_LEN) for c in range(chunk.region.cols)
+        ]
 
         for row in html_props.get("body", []):
 
@@ -383,7 +403,10 @@ class TableFrameGenerator(AbstractTableFrameGenerator):
                     if "data" in element_classes:
                         cells_in_row.append(
                             TableFrameCell(
-                                value=formatter.format_cell(element.get("display_value", "")),
+                                value=formatter.format_cell(
+                                    element.get("display_value", ""),
+                                    max_lengths[len(cells_in_row)],
+                                ),
                                 css=self._get_css_dict(element.get("id", None), element_classes, css_dict),
                             ),
                         )
@@ -393,6 +416,28 @@ class TableFrameGenerator(AbstractTableFrameGenerator):
 
         return result
 
+    def _extract_css(self, html_props: dict) -> List[List[Optional[Dict[str, str]]]]:
+        result: List[List[Optional[Dict[str, str]]]] = []
+
+        css_dict = self.__create_css_dict(html_props)
+
+        for row in html_props.get("body", []):
+
+            css_in_row: List[Optional[Dict[str, str]]] = []
+
+            for element in row:
+
+                if element.get("type", "") == "td" and element.get("is_visible", True):
+                    element_classes = set(element.get("class", "").split(" "))
+
+                    if "data" in element_classes:
+                        css_in_row.append(self._get_css_dict(element.get("id", None), element_classes, css_dict))
+
+            if css_in_row:
+                result.append(css_in_row)
+
+        return result
+
     @staticmethod
     def _get_css_dict(element_id: str, element_classes: Set[str], css_dict: Dict[str, _CSSPropsWithIndex]) -> \
             Optional[dict]:
@@ -136,6 +136,20 @@ def test_create_fails_on_wrong_filter_type():
     assert failure.info == str(type({}))
 
 
+def test_create_with_mask_and_query_filter():
+    for filter_eval_expr in ["df['col_0'] > 1", "'col_0 > 1'"]:
+        table_source = _create_table_source(df, CreateTableSourceConfig(filter_eval_expr=filter_eval_expr))
+        assert isinstance(table_source, TableSource)
+        assert _get_table_frame(table_source).index_labels == [['1'], ['2']]
+
+
+def test_create_fails_on_non_boolean_mask_filter():
+    failure = _create_table_source(df, CreateTableSourceConfig(filter_eval_expr="df['col_0']"))
+
+    assert isinstance(failure, CreateTableSourceFailure)
+    assert failure.error_kind == "FILTER_FRAME_OF_WRONG_TYPE"
+
+
 def test_create_with_filter():
     table_source = _create_table_source(
         df,
@@ -211,3 +225,21 @@ def test_filter_expr_can_resolve_synthetic_identifier():
 
     assert table_source.get_table_structure().rows_count == 1
     assert table_source.get_table_structure().org_rows_count == 2
+
+
+def test_create_with_profiling():
+    table_source = _create_table_source(df, CreateTableSourceConfig(profiling=True, profiling_trace_memory=True))
+    assert isinstance(table_source, TableSource)
+
+    table_source.jsonify(_get_table_frame(table_source))
+
+    records = json.loads(table_source.get_profile_records())
+    assert [r["call"] for r in records] == ["create", "get_table_structure", "compute_chunk_table_frame", "jsonify"]
+    assert "generate" in records[2]["stats"]
+    assert records[2]["peak_memory"] > 0
+
+
+def test_create_without_profiling():
+    table_source = _create_table_source(df)
+    table_source.get_table_structure()
+    assert table_source.get_profile_records() == "[]"
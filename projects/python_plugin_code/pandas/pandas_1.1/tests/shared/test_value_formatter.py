@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.io.formats.printing import pprint_thing
+
+from cms_rendner_sdfv.base.constants import CELL_MAX_STR_LEN
+from cms_rendner_sdfv.base.helpers import truncate_str
+from cms_rendner_sdfv.pandas.shared.value_formatter import ValueFormatter, bounded_pprint_thing
+
+
+@pytest.mark.parametrize(
+    "thing",
+    [
+        [1, 'a', None],
+        (1,),
+        {1, 2},
+        {'a': [1, 'b', {'c': 'd'}], 'e': (1,)},
+        list(range(300)),
+        np.arange(100),
+        b'bytes',
+        [[[[[[1]]]]]],
+        [['q' * 50] * 3] * 3,
+        {'k' * 300: 1},
+        pd.Series([1, 2]),
+    ],
+)
+@pytest.mark.parametrize("max_length", [1, 10, CELL_MAX_STR_LEN])
+@pytest.mark.parametrize("max_seq_items", [1, 42, 100])
+def test_matches_truncated_pprint_thing(thing, max_length, max_seq_items):
+    expected = truncate_str(pprint_thing(thing, max_seq_items=max_seq_items), max_length)
+    assert bounded_pprint_thing(thing, max_length, max_seq_items) == expected
+
+
+def test_respects_nest_depth():
+    thing = [[[1, 2]], {'a': {'b': 'c'}}]
+    with pd.option_context('display.pprint_nest_depth', 2):
+        assert bounded_pprint_thing(thing, CELL_MAX_STR_LEN, 42) == pprint_thing(thing, max_seq_items=42)
+
+
+def test_stops_iterating_when_output_is_full():
+    class _CountingList(list):
+        def __init__(self, *args):
+            super().__init__(*args)
+            self.visited = 0
+
+        def __iter__(self):
+            for item in super().__iter__():
+                self.visited += 1
+                yield item
+
+    seq = _CountingList(['x' * 30] * 100)
+    actual = bounded_pprint_thing(seq, 50, 100)
+    assert len(actual) == 50
+    assert seq.visited == 2
+
+
+def test_format_cell_with_huge_values():
+    assert ValueFormatter.format_cell('x' * 5_000_000) == 'x' * (CELL_MAX_STR_LEN - 1) + '…'
+    assert ValueFormatter.format_cell(['y' * 5_000_000]) == '[' + 'y' * (CELL_MAX_STR_LEN - 2) + '…'
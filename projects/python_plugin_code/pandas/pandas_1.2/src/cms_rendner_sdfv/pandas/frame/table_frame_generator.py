@@ -11,17 +11,23 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+from functools import partial
 from typing import Any, Callable, List, Optional
 
-from pandas import get_option
+import numpy as np
+from pandas import MultiIndex, PeriodDtype, get_option
 from pandas.core.dtypes.common import (
     is_complex,
     is_float,
     is_integer,
 )
 
+from cms_rendner_sdfv.base.constants import CELL_MAX_STR_LEN
+from cms_rendner_sdfv.base.helpers import truncate_str
 from cms_rendner_sdfv.base.table_source import AbstractTableFrameGenerator
 from cms_rendner_sdfv.base.types import Region, TableFrame, TableFrameCell, TableFrameColumn, TableFrameLegend
+from cms_rendner_sdfv.pandas.shared.datetimelike_formatter import format_datetimelike_values
+from cms_rendner_sdfv.pandas.shared.formatted_labels_cache import FormattedLabelsCache
 from cms_rendner_sdfv.pandas.shared.value_formatter import ValueFormatter
 from cms_rendner_sdfv.pandas.shared.visible_frame import Chunk, VisibleFrame
 
@@ -31,6 +37,10 @@ class _ValueFormatter(ValueFormatter):
         self._precision = get_option("display.precision")
         self._float_format: Optional[Callable] = get_option("display.float_format")
 
+    @property
+    def state(self) -> tuple:
+        return self._precision, self._float_format, get_option("display.max_seq_items")
+
     def _default_format(self, x: Any, fallback_formatter) -> Any:
         if is_float(x) or is_complex(x):
             if callable(self._float_format):
@@ -47,13 +57,15 @@ class _ValueFormatter(ValueFormatter):
     def format_index(self, value: Any) -> str:
         return self._default_format(value, super().format_index)
 
-    def format_cell(self, value: Any) -> str:
-        return self._default_format(value, super().format_cell)
+    def format_cell(self, value: Any, max_length: int = CELL_MAX_STR_LEN) -> str:
+        fallback_formatter = partial(super().format_cell, max_length=max_length)
+        return truncate_str(self._default_format(value, fallback_formatter), max_length)
 
 
 class TableFrameGenerator(AbstractTableFrameGenerator):
-    def __init__(self, visible_frame: VisibleFrame):
+    def __init__(self, visible_frame: VisibleFrame, labels_cache: Optional[FormattedLabelsCache] = None):
         super().__init__(visible_frame)
+        self._labels_cache: FormattedLabelsCache = FormattedLabelsCache() if labels_cache is None else labels_cache
 
     def generate(self,
                  region: Region = None,
@@ -63,12 +75,15 @@ class TableFrameGenerator(AbstractTableFrameGenerator):
 
         chunk = self._visible_frame.get_chunk(region)
         formatter = _ValueFormatter()
+        self._labels_cache.sync_formatter_state(formatter.state)
 
-        columns = [] if exclude_col_header else self._extract_columns(chunk, formatter)
-        index_labels = [] if exclude_row_header else self._extract_index_header_labels(chunk, formatter)
-        cells = self._extract_cells(chunk, formatter)
-        legend_label = None if exclude_col_header and exclude_row_header else self._extract_legend_label(chunk,
-                                                                                                         formatter)
+        with self._perf_stats.measure("format_columns"):
+            columns = [] if exclude_col_header else self._extract_columns(chunk, formatter)
+        with self._perf_stats.measure("format_index"):
+            index_labels = [] if exclude_row_header else self._extract_index_header_labels(chunk, formatter)
+        with self._perf_stats.measure("format_cells"):
+            cells = self._extract_cells(chunk, formatter)
+        legend_label = None if exclude_col_header and exclude_row_header else self._extract_legend_label(chunk, formatter)
 
         return TableFrame(
             index_labels=index_labels,
@@ -80,12 +95,20 @@ class TableFrameGenerator(AbstractTableFrameGenerator):
     def _extract_columns(self, chunk: Chunk, formatter: ValueFormatter) -> List[TableFrameColumn]:
         result: List[TableFrameColumn] = []
 
-        for col_offset in range(chunk.region.cols):
-            name = chunk.column_at(col_offset)
-            if isinstance(name, tuple):
-                labels = [formatter.format_column(h) for h in name]
-            else:
-                labels = [formatter.format_column(name)]
+        columns = chunk.source_columns()
+        if isinstance(columns, MultiIndex):
+            labels_per_column = self._format_multi_index_labels(
+                "columns",
+                columns,
+                chunk.column_positions(),
+                formatter.format_column,
+            )
+        else:
+            labels_per_column = [
+                self._format_label(chunk.column_at(c), formatter.format_column) for c in range(chunk.region.cols)
+            ]
+
+        for col_offset, labels in enumerate(labels_per_column):
             result.append(
                 TableFrameColumn(
                     dtype=str(chunk.dtype_at(col_offset)),
@@ -96,31 +119,80 @@ class TableFrameGenerator(AbstractTableFrameGenerator):
 
         return result
 
-    @staticmethod
-    def _extract_index_header_labels(chunk: Chunk, formatter: ValueFormatter) -> List[List[str]]:
-        result: List[List[str]] = []
+    def _extract_index_header_labels(self, chunk: Chunk, formatter: ValueFormatter) -> List[List[str]]:
+        index = chunk.source_index()
+        if isinstance(index, MultiIndex):
+            return self._format_multi_index_labels("index", index, chunk.row_positions(), formatter.format_index)
 
-        for row_offset in range(chunk.region.rows):
-            name = chunk.index_at(row_offset)
-            if isinstance(name, tuple):
-                result.append([formatter.format_index(h) for h in name])
-            else:
-                result.append([formatter.format_index(name)])
+        return [self._format_label(chunk.index_at(r), formatter.format_index) for r in range(chunk.region.rows)]
 
-        return result
-
-    @staticmethod
-    def _extract_cells(chunk: Chunk, formatter: ValueFormatter) -> List[List[TableFrameCell]]:
+    def _extract_cells(self, chunk: Chunk, formatter: ValueFormatter) -> List[List[TableFrameCell]]:
         result: List[List[TableFrameCell]] = []
 
         col_range = range(chunk.region.cols)
+        max_lengths = [self._get_cell_max_str_len(chunk.region.first_col + c, CELL_MAX_STR_LEN) for c in col_range]
+        # values of categorical and datetimelike columns are formatted column-wise, all others cell by cell
+        formatted_columns = [self._format_column(chunk, c, formatter, max_lengths[c]) for c in col_range]
         for row_offset in range(chunk.region.rows):
-            result.append(
-                [TableFrameCell(
-                    value=formatter.format_cell(chunk.cell_value_at(row_offset, col_offset))
-                ) for col_offset in col_range])
+            row = []
+            for col_offset in col_range:
+                formatted_column = formatted_columns[col_offset]
+                if formatted_column is None:
+                    value = formatter.format_cell(chunk.cell_value_at(row_offset, col_offset), max_lengths[col_offset])
+                else:
+                    value = formatted_column[row_offset]
+                row.append(TableFrameCell(value=value))
+            result.append(row)
+
         return result
 
+    @staticmethod
+    def _format_label(name: Any, format_label: Callable[[Any], str]) -> List[str]:
+        if isinstance(name, tuple):
+            return [format_label(h) for h in name]
+        return [format_label(name)]
+
+    def _format_column(self,
+                       chunk: Chunk,
+                       col_offset: int,
+                       formatter: ValueFormatter,
+                       max_length: int,
+                       ) -> Optional[List[str]]:
+        dtype = chunk.dtype_at(col_offset)
+        if isinstance(dtype, PeriodDtype) or dtype.kind in 'mM':
+            values = format_datetimelike_values(chunk.column_values_at(col_offset))
+            return None if values is None else [truncate_str(v, max_length) for v in values]
+
+        categorical = chunk.categorical_at(col_offset)
+        if categorical is None:
+            return None
+        return self._labels_cache.format_codes(
+            key=("cells", int(chunk.column_positions()[col_offset]), max_length),
+            labels=categorical.categories,
+            codes=categorical.codes[chunk.row_indexer()],
+            format_label=partial(formatter.format_cell, max_length=max_length),
+            get_na_value=lambda row_offset: chunk.cell_value_at(row_offset, col_offset),
+        )
+
+    def _format_multi_index_labels(self,
+                                   key: str,
+                                   index: MultiIndex,
+                                   positions: np.ndarray,
+                                   format_label: Callable[[Any], str],
+                                   ) -> List[List[str]]:
+        formatted_levels = []
+        for level, (labels, codes) in enumerate(zip(index.levels, index.codes)):
+            formatted_levels.append(
+                self._labels_cache.format_codes(
+                    key=(key, level),
+                    labels=labels,
+                    codes=codes[positions],
+                    format_label=format_label,
+                    get_na_value=lambda i, lv=level: index[positions[i]][lv],
+                )
+            )
+        return [list(labels) for labels in zip(*formatted_levels)]
+
     @staticmethod
     def _extract_legend_label(chunk: Chunk, formatter: ValueFormatter) -> TableFrameLegend:
         index_legend = [formatter.format_index(n) for n in chunk.index_names() if n is not None]
@@ -0,0 +1,367 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import ast
+import datetime
+import threading
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
+from types import CodeType
+from typing import Any, Callable, Hashable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from pandas import DataFrame, Index, Series
+from pandas.api.types import is_bool_dtype
+
+from cms_rendner_sdfv.base.caller_namespace import CallerNamespace
+from cms_rendner_sdfv.base.types import CreateTableSourceFailure, FrameDigest
+from cms_rendner_sdfv.pandas.shared.filter_refinement import get_referenced_names, is_row_local_predicate, \
+    parse_filter_expr, split_refinement
+from cms_rendner_sdfv.pandas.shared.frame_digest import create_frame_digest
+from cms_rendner_sdfv.pandas.shared.types import FilterCriteria
+from cms_rendner_sdfv.pandas.shared.visible_frame import Indexer
+
+# Resolves a filter into boolean masks over the positions of the rows and columns of the source frame.
+#
+# Supported filters:
+#   - DataFrame (or FilterCriteria): keeps the rows and columns with the labels of the filter frame
+#   - boolean Series: keeps the rows marked as True (matched by position if the index is the one of the source frame,
+#     otherwise by label)
+#   - boolean ndarray: keeps the rows marked as True
+#   - str: a "DataFrame.query" expression, evaluated against the source frame (variables referenced via "@name"
+#     are resolved in the namespace of the caller)
+#
+# The order of the source frame is kept and rows with duplicated labels are not duplicated.
+SUPPORTED_FILTER_TYPES = (DataFrame, FilterCriteria, Series, np.ndarray, str)
+
+
+class PositionalFilter:
+    def __init__(self, row_mask: Optional[np.ndarray] = None, col_mask: Optional[np.ndarray] = None):
+        # None keeps all rows/columns
+        self.row_mask = row_mask
+        self.col_mask = col_mask
+
+    def is_empty(self) -> bool:
+        return self.row_mask is None and self.col_mask is None
+
+    def get_nbytes(self) -> int:
+        return sum(0 if m is None else m.nbytes for m in (self.row_mask, self.col_mask))
+
+    def get_row_positions(self, rows: int, hidden: Optional[Sequence[int]] = None) -> Indexer:
+        return _get_positions(rows, self.row_mask, hidden)
+
+    def get_col_positions(self, cols: int, hidden: Optional[Sequence[int]] = None) -> Indexer:
+        return _get_positions(cols, self.col_mask, hidden)
+
+
+def _get_positions(count: int, mask: Optional[np.ndarray], hidden: Optional[Sequence[int]]) -> Indexer:
+    if hidden is not None and len(hidden) > 0:
+        mask = np.ones(count, dtype=bool) if mask is None else mask.copy()
+        mask[np.asarray(hidden, dtype=np.intp)] = False
+    return range(count) if mask is None else np.flatnonzero(mask)
+
+
+def resolve_filter(source_frame: DataFrame,
+                   filter_input: Any,
+                   caller_namespace: Optional[CallerNamespace] = None,
+                   ) -> PositionalFilter:
+    # Raises a TypeError if the filter isn't supported.
+    if filter_input is None:
+        return PositionalFilter()
+    if isinstance(filter_input, PositionalFilter):
+        return filter_input
+    if isinstance(filter_input, str):
+        filter_input = _eval_query(source_frame, filter_input, caller_namespace)
+    if isinstance(filter_input, DataFrame):
+        return PositionalFilter(
+            _create_label_mask(source_frame.index, filter_input.index),
+            _create_label_mask(source_frame.columns, filter_input.columns),
+        )
+    if isinstance(filter_input, FilterCriteria):
+        return PositionalFilter(
+            None if filter_input.index is None else _create_label_mask(source_frame.index, filter_input.index),
+            None if filter_input.columns is None else _create_label_mask(source_frame.columns, filter_input.columns),
+        )
+    if isinstance(filter_input, Series):
+        if not is_bool_dtype(filter_input.dtype):
+            raise TypeError(f"Filter Series has to be of dtype bool, got {filter_input.dtype}.")
+        values = filter_input.to_numpy(dtype=bool, na_value=False)
+        if filter_input.index is source_frame.index or filter_input.index.equals(source_frame.index):
+            return PositionalFilter(row_mask=values)
+        return PositionalFilter(row_mask=_create_label_mask(source_frame.index, filter_input.index[values]))
+    if isinstance(filter_input, np.ndarray):
+        if filter_input.dtype != bool or filter_input.shape != (len(source_frame.index),):
+            raise TypeError(f"Filter mask has to be a 1D bool array of length {len(source_frame.index)}.")
+        return PositionalFilter(row_mask=filter_input)
+    raise TypeError(f"Unsupported filter of type {type(filter_input)}.")
+
+
+def _eval_query(source_frame: DataFrame, query: str, caller_namespace: Optional[CallerNamespace]) -> Series:
+    # Like "DataFrame.query", which resolves "@name" in the scope of its caller. Without the namespaces, the names
+    # would be resolved in the scope of this function.
+    local_dict, global_dict = ({}, {}) if caller_namespace is None \
+        else (caller_namespace.get_locals(), caller_namespace.get_globals())
+    result = source_frame.eval(query, local_dict=local_dict, global_dict=global_dict)
+    # also rejects assignments ("c = a + b"), which result in a modified copy of the frame
+    if not isinstance(result, Series) or not is_bool_dtype(result.dtype):
+        raise TypeError(f"Query expression has to result in a boolean Series, got {type(result)}.")
+    return result
+
+
+def _create_label_mask(labels: Index, keep: Index) -> Optional[np.ndarray]:
+    if keep is labels:
+        return None
+    if labels.is_unique:
+        # a lookup of the kept labels, instead of hashing all labels of the source frame
+        try:
+            positions = labels.get_indexer(keep)
+        except (TypeError, ValueError):
+            # incompatible labels, for example a MultiIndex and a flat index
+            return labels.isin(keep)
+        mask = np.zeros(len(labels), dtype=bool)
+        mask[positions[positions >= 0]] = True
+        return mask
+    return labels.isin(keep)
+
+
+# upper bound for the size of the masks kept by the FilterCache
+DEFAULT_FILTER_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+# kind of the evaluated filter expressions, only the filters of boolean Series can be refined
+BOOLEAN_SERIES_RESULT = "boolean_series"
+OTHER_RESULT = "other"
+
+
+class FilterCache:
+    # Keeps the resolved filters of the recently evaluated filter expressions.
+    #
+    # The filter expression is re-evaluated every time the IDE refreshes a table, even if neither the frame nor the
+    # expression has changed. Which is slow for expensive expressions or huge frames. The key of an entry should
+    # identify the frame and the expression, an entry is only reused if the digest of the frame is unchanged.
+    #
+    # In-place modifications of objects referenced by an expression (for example a list used for an "isin") can't
+    # be detected, the key should therefore identify these objects to detect at least re-assignments. The id of an
+    # object is only unique during its lifetime, an entry references the "referenced_objects" of its key and is only
+    # reused if the current objects are identical.
+    #
+    # The cache lives as long as the debug session. To not keep the frames of the user alive, the objects are
+    # referenced weakly (if supported by their type), an entry with a collected object is dropped.
+    def __init__(self, max_bytes: int = DEFAULT_FILTER_CACHE_MAX_BYTES, max_entries: int = 8):
+        self._max_bytes = max_bytes
+        self._max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self,
+            key: Hashable,
+            digest: FrameDigest,
+            referenced_objects: Tuple[Any, ...] = (),
+            result_kind: Optional[str] = None,
+            ) -> Optional[PositionalFilter]:
+        # Only returns the filter of an expression of the "result_kind", if specified.
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is None:
+                return None
+            if entry[0] != digest or not _references_objects(entry[2], referenced_objects):
+                del self._entries[key]
+                return None
+            if result_kind is not None and entry[3] != result_kind:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self,
+            key: Hashable,
+            digest: FrameDigest,
+            positional_filter: PositionalFilter,
+            referenced_objects: Tuple[Any, ...] = (),
+            result_kind: str = OTHER_RESULT,
+            ):
+        with self._lock:
+            self._entries.pop(key, None)
+            for dead_key in [k for k, e in self._entries.items() if any(r() is None for r in e[2])]:
+                del self._entries[dead_key]
+            if positional_filter.get_nbytes() > self._max_bytes:
+                return
+            references = tuple(_create_reference(o) for o in referenced_objects)
+            self._entries[key] = (digest, positional_filter, references, result_kind)
+            nbytes = sum(e[1].get_nbytes() for e in self._entries.values())
+            while len(self._entries) > self._max_entries or nbytes > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                nbytes -= evicted[1].get_nbytes()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class _StrongReference:
+    # for objects which don't support weak references (e.g. lists), same interface as "weakref.ref"
+    __slots__ = ("_obj",)
+
+    def __init__(self, obj: Any):
+        self._obj = obj
+
+    def __call__(self) -> Any:
+        return self._obj
+
+
+def _create_reference(obj: Any) -> Callable[[], Any]:
+    try:
+        return weakref.ref(obj)
+    except TypeError:
+        return _StrongReference(obj)
+
+
+def _references_objects(references: Tuple[Callable[[], Any], ...], objects: Tuple[Any, ...]) -> bool:
+    # a collected object is never identical to a current one (its id could have been reused)
+    return len(references) == len(objects) and all(r() is o for r, o in zip(references, objects))
+
+
+FILTER_CACHE = FilterCache()
+
+
+def evaluate_filter_expr(source_frame: DataFrame,
+                         fingerprint: str,
+                         filter_expr: str,
+                         caller_namespace: CallerNamespace,
+                         org_data_source: Any = None,
+                         previous_filter_expr: Optional[str] = None,
+                         filter_cache: FilterCache = FILTER_CACHE,
+                         ) -> Union[PositionalFilter, CreateTableSourceFailure]:
+    # Evaluates the filter expression in the namespace of the caller and resolves the result.
+    # The resolved filter is reused as long as the frame, the expression and the referenced objects are unchanged.
+    #
+    # A "previous_filter_expr" is narrowed by the filter expression (see "CreateTableSourceConfig"). If the filter of
+    # the previous expression is still cached, only the rows kept by it are evaluated (see "filter_refinement").
+    try:
+        tree = parse_filter_expr(filter_expr, previous_filter_expr)
+        cache_key, referenced_objects = _create_cache_key(fingerprint, tree, caller_namespace)
+        digest = create_frame_digest(source_frame, org_data_source)
+        positional_filter = filter_cache.get(cache_key, digest, referenced_objects)
+        if positional_filter is not None:
+            return positional_filter
+        positional_filter = _refine_cached_filter(
+            source_frame,
+            fingerprint,
+            tree,
+            caller_namespace,
+            digest,
+            filter_cache,
+        )
+        if positional_filter is not None:
+            filter_cache.put(cache_key, digest, positional_filter, referenced_objects, BOOLEAN_SERIES_RESULT)
+            return positional_filter
+        filter_result = caller_namespace.eval(_compile(tree))
+    except Exception as e:
+        return CreateTableSourceFailure(error_kind="FILTER_FRAME_EVAL_FAILED", info=repr(e))
+
+    # a DataFrame, a boolean Series (mask) or a "DataFrame.query" string
+    if not isinstance(filter_result, (DataFrame, Series, str)):
+        return CreateTableSourceFailure(error_kind="FILTER_FRAME_OF_WRONG_TYPE", info=str(type(filter_result)))
+
+    try:
+        positional_filter = resolve_filter(source_frame, filter_result, caller_namespace)
+    except TypeError as e:
+        return CreateTableSourceFailure(error_kind="FILTER_FRAME_OF_WRONG_TYPE", info=str(e))
+    except Exception as e:
+        return CreateTableSourceFailure(error_kind="FILTER_FRAME_EVAL_FAILED", info=repr(e))
+
+    # the variables referenced by a query string ("@name") aren't part of the key
+    if not isinstance(filter_result, str):
+        is_boolean_series = isinstance(filter_result, Series) and is_bool_dtype(filter_result.dtype)
+        result_kind = BOOLEAN_SERIES_RESULT if is_boolean_series else OTHER_RESULT
+        filter_cache.put(cache_key, digest, positional_filter, referenced_objects, result_kind)
+    return positional_filter
+
+
+@lru_cache(maxsize=64)
+def _compile(tree: ast.Expression) -> CodeType:
+    return compile(tree, "<expression>", "eval")
+
+
+_IMMUTABLE_SCALAR_TYPES = (
+    type(None), bool, int, float, complex, str, bytes, datetime.date, datetime.time, datetime.timedelta, np.generic,
+)
+
+
+def _is_immutable_scalar(value: Any) -> bool:
+    if not isinstance(value, _IMMUTABLE_SCALAR_TYPES):
+        return False
+    try:
+        hash(value)
+        return True
+    except TypeError:
+        return False
+
+
+def _create_cache_key(fingerprint: str, tree: ast.Expression, caller_namespace: CallerNamespace) -> Tuple[tuple, tuple]:
+    # Returns the key and the objects referenced by the key, which have to be held by the cache entry.
+    # Immutable scalars are part of the key, other objects are identified by their id.
+    values = []
+    referenced_objects = []
+    for name, value in caller_namespace.get_referenced_values(_compile(tree)):
+        if _is_immutable_scalar(value):
+            # the type distinguishes equal values of different types, e.g. "1" and "True"
+            values.append((name, type(value), value))
+        else:
+            values.append((name, id(value)))
+            referenced_objects.append(value)
+    # the dump of the syntax tree doesn't depend on formatting and redundant parentheses
+    return (fingerprint, ast.dump(tree), tuple(values)), tuple(referenced_objects)
+
+
+def _refine_cached_filter(source_frame: DataFrame,
+                          fingerprint: str,
+                          tree: ast.Expression,
+                          caller_namespace: CallerNamespace,
+                          digest: FrameDigest,
+                          filter_cache: FilterCache,
+                          ) -> Optional[PositionalFilter]:
+    # Returns None if the expression can't be evaluated as refinement of a cached filter.
+    parts = split_refinement(tree)
+    if parts is None:
+        return None
+    previous_tree, predicate = parts
+
+    previous_key, previous_objects = _create_cache_key(fingerprint, previous_tree, caller_namespace)
+    # the filter of a DataFrame (kept labels) is also a row mask, but "previous & predicate" isn't a combination
+    # of row masks in this case
+    previous = filter_cache.get(previous_key, digest, previous_objects, BOOLEAN_SERIES_RESULT)
+    if previous is None or previous.row_mask is None or previous.col_mask is not None:
+        return None
+
+    names = get_referenced_names(predicate)
+    if any(name not in caller_namespace for name in names):
+        return None
+    values = {name: caller_namespace[name] for name in names}
+    if not is_row_local_predicate(predicate, source_frame, values):
+        return None
+
+    kept_rows = np.flatnonzero(previous.row_mask)
+    kept_frame = source_frame.iloc[kept_rows]
+    values.update({name: kept_frame for name, value in values.items() if value is source_frame})
+    try:
+        result = eval(_compile(predicate), {}, values)
+    except Exception:
+        # evaluated again on all rows, to report the error of the complete expression
+        return None
+    if not isinstance(result, Series) or not is_bool_dtype(result.dtype) or not result.index.equals(kept_frame.index):
+        return None
+
+    row_mask = np.zeros(len(source_frame.index), dtype=bool)
+    row_mask[kept_rows] = result.to_numpy(dtype=bool, na_value=False)
+    return PositionalFilter(row_mask=row_mask)
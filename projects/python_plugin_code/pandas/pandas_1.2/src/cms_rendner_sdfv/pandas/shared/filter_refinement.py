@@ -0,0 +1,184 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import ast
+import datetime
+import numbers
+from functools import lru_cache
+from typing import Any, Dict, Optional, Set, Tuple
+
+import numpy as np
+from pandas import DataFrame, Index
+
+# A filter expression of the form "previous & predicate" narrows the rows kept by "previous". If the predicate is
+# row-local (the result for a row depends only on the values of this row), it can be evaluated on the rows kept
+# by "previous" instead of on all rows of the frame.
+#
+# Predicates are only considered row-local if they consist of:
+#   - columns of the frame ("_df.a", "_df['a']")
+#   - scalars (literals or variables) and collections of scalars
+#   - arithmetic (except "@"), bitwise and comparison operators
+#   - elementwise methods ("_df.a.isin([1, 2])", "_df.s.str.contains('x')", "_df.d.dt.year")
+#
+# Everything else, for example "_df.a > _df.a.mean()", has to be evaluated on all rows.
+
+_ELEMENTWISE_METHODS = {
+    "abs", "astype", "between", "clip", "eq", "ge", "gt", "isin", "isna", "isnull", "le", "lt", "ne", "notna",
+    "notnull", "round",
+}
+_ACCESSORS = {"cat", "dt", "str"}
+_ELEMENTWISE_ACCESSOR_METHODS = {
+    "contains", "endswith", "fullmatch", "isalnum", "isalpha", "isdecimal", "isdigit", "islower", "isnumeric",
+    "isspace", "istitle", "isupper", "len", "lower", "lstrip", "match", "rstrip", "startswith", "strip", "upper",
+}
+_ELEMENTWISE_ACCESSOR_ATTRIBUTES = {
+    "codes", "date", "day", "day_of_week", "day_of_year", "dayofweek", "dayofyear", "days", "hour",
+    "is_leap_year", "is_month_end", "is_month_start", "is_quarter_end", "is_quarter_start", "is_year_end",
+    "is_year_start", "microsecond", "minute", "month", "nanosecond", "quarter", "second", "seconds", "time",
+    "weekday", "year",
+}
+_SCALAR_TYPES = (numbers.Number, str, bytes, datetime.date, datetime.time, datetime.timedelta, np.generic)
+
+_SERIES = "series"
+_ACCESSOR = "accessor"
+_FRAME = "frame"
+_SCALAR = "scalar"
+_COLLECTION = "collection"
+
+
+@lru_cache(maxsize=64)
+def parse_filter_expr(filter_expr: str, previous_filter_expr: Optional[str] = None) -> ast.Expression:
+    # Returns the combined expression "(previous_filter_expr) & (filter_expr)" if a previous expression is specified.
+    tree = ast.parse(filter_expr.strip(), mode="eval")
+    if previous_filter_expr is None:
+        return tree
+    previous = ast.parse(previous_filter_expr.strip(), mode="eval")
+    combined = ast.BinOp(left=previous.body, op=ast.BitAnd(), right=tree.body)
+    return ast.fix_missing_locations(ast.Expression(body=combined))
+
+
+@lru_cache(maxsize=64)
+def split_refinement(tree: ast.Expression) -> Optional[Tuple[ast.Expression, ast.Expression]]:
+    # Returns the previous expression and the predicate of an expression of the form "previous & predicate".
+    body = tree.body
+    if isinstance(body, ast.BinOp) and isinstance(body.op, ast.BitAnd):
+        return ast.Expression(body=body.left), ast.Expression(body=body.right)
+    return None
+
+
+def is_row_local_predicate(predicate: ast.Expression, frame: DataFrame, values: Dict[str, Any]) -> bool:
+    # "values" contains the values of the names referenced by the predicate.
+    frame_names = {name for name, value in values.items() if value is frame}
+    return _classify(predicate.body, frame_names, frame.columns, values) == _SERIES
+
+
+def get_referenced_names(tree: ast.Expression) -> Set[str]:
+    return {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+
+
+def _is_scalar(value: Any) -> bool:
+    return value is None or isinstance(value, _SCALAR_TYPES)
+
+
+def _is_collection(value: Any) -> bool:
+    return isinstance(value, (list, tuple, set, frozenset)) and all(_is_scalar(v) for v in value)
+
+
+def _literal_value(node: ast.AST) -> Tuple[bool, Any]:
+    try:
+        return True, ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError):
+        return False, None
+
+
+def _is_column(key: Any, columns: Index) -> bool:
+    try:
+        return key in columns
+    except TypeError:
+        return False
+
+
+def _classify(node: ast.AST, frame_names: Set[str], columns: Index, values: Dict[str, Any]) -> Optional[str]:
+    if isinstance(node, ast.Name):
+        if node.id in frame_names:
+            return _FRAME
+        if node.id not in values:
+            return None
+        value = values[node.id]
+        if _is_scalar(value):
+            return _SCALAR
+        return _COLLECTION if _is_collection(value) else None
+
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        is_literal, value = _literal_value(node)
+        return _COLLECTION if is_literal and _is_collection(value) else None
+
+    if isinstance(node, ast.Attribute):
+        base = _classify(node.value, frame_names, columns, values)
+        if base == _FRAME:
+            # a column which isn't shadowed by an attribute of the frame
+            return _SERIES if _is_column(node.attr, columns) and not hasattr(DataFrame, node.attr) else None
+        if base == _SERIES and node.attr in _ACCESSORS:
+            return _ACCESSOR
+        if base == _ACCESSOR and node.attr in _ELEMENTWISE_ACCESSOR_ATTRIBUTES:
+            return _SERIES
+        return None
+
+    if isinstance(node, ast.Subscript):
+        if _classify(node.value, frame_names, columns, values) != _FRAME:
+            return None
+        key = node.slice
+        # before Python 3.9 the key is wrapped into an "Index" node
+        if type(key).__name__ == "Index":
+            key = key.value
+        is_literal, value = _literal_value(key)
+        return _SERIES if is_literal and _is_column(value, columns) else None
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Attribute):
+            return None
+        base = _classify(node.func.value, frame_names, columns, values)
+        if not ((base == _SERIES and node.func.attr in _ELEMENTWISE_METHODS)
+                or (base == _ACCESSOR and node.func.attr in _ELEMENTWISE_ACCESSOR_METHODS)):
+            return None
+        arguments = list(node.args) + [k.value for k in node.keywords]
+        if any(_classify(a, frame_names, columns, values) not in (_SCALAR, _COLLECTION) for a in arguments):
+            return None
+        return _SERIES
+
+    if isinstance(node, ast.UnaryOp):
+        if isinstance(node.op, ast.Not):
+            return None
+        return _combine([node.operand], frame_names, columns, values)
+
+    if isinstance(node, ast.BinOp):
+        # a matrix multiplication combines all rows
+        if isinstance(node.op, ast.MatMult):
+            return None
+        return _combine([node.left, node.right], frame_names, columns, values)
+
+    if isinstance(node, ast.Compare):
+        # chained comparisons are combined with "and", which isn't supported by Series
+        if len(node.ops) != 1:
+            return None
+        return _combine([node.left] + node.comparators, frame_names, columns, values)
+
+    is_literal, value = _literal_value(node)
+    return _SCALAR if is_literal and _is_scalar(value) else None
+
+
+def _combine(operands: list, frame_names: Set[str], columns: Index, values: Dict[str, Any]) -> Optional[str]:
+    kinds = [_classify(o, frame_names, columns, values) for o in operands]
+    if any(k not in (_SERIES, _SCALAR) for k in kinds):
+        return None
+    return _SERIES if _SERIES in kinds else _SCALAR
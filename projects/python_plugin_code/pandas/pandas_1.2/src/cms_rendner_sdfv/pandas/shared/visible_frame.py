@@ -11,16 +11,48 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
-from typing import Any, Callable, List, Tuple, Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import numpy as np
-from pandas import DataFrame, Series
+from pandas import Categorical, DataFrame, Index, Series
 
 from cms_rendner_sdfv.base.constants import DESCRIBE_COL_MAX_STR_LEN
 from cms_rendner_sdfv.base.helpers import truncate_str
 from cms_rendner_sdfv.base.table_source import AbstractVisibleFrame
 from cms_rendner_sdfv.base.types import Region
 
+# Positions of the visible rows or columns in the source frame. Unmodified (and contiguous) positions are
+# represented by a "range", which requires O(1) memory and allows to slice the source frame.
+Indexer = Union[range, np.ndarray]
+
+
+def create_compact_indexer(positions: Indexer) -> Indexer:
+    if isinstance(positions, range):
+        return positions
+    if len(positions) == 0:
+        return range(0)
+    first = int(positions[0])
+    last = int(positions[-1])
+    if last - first == len(positions) - 1 and np.all(np.diff(positions) == 1):
+        return range(first, last + 1)
+    # int32 halves the memory, positions are always >= 0
+    if int(positions.max()) <= np.iinfo(np.int32).max:
+        return positions.astype(np.int32, copy=False)
+    return positions
+
+
+def get_indexer_nbytes(indexer: Indexer) -> int:
+    return 0 if isinstance(indexer, range) else indexer.nbytes
+
+
+def to_positions(indexer: Indexer) -> np.ndarray:
+    return np.arange(indexer.start, indexer.stop, indexer.step) if isinstance(indexer, range) else indexer
+
+
+def to_slice_or_positions(indexer: Indexer) -> Union[slice, np.ndarray]:
+    # slicing returns views, fancy indexing copies the selected values
+    return slice(indexer.start, indexer.stop, indexer.step) if isinstance(indexer, range) else indexer
+
 
 class Chunk:
     def __init__(self, frame: 'VisibleFrame', region: Region):
@@ -53,6 +85,41 @@ class Chunk:
         except TypeError as e:
             return {'error': str(e)}
 
+    def categorical_at(self, col: int) -> Optional[Categorical]:
+        values = self._frame.source_frame.iloc[:, self._frame.i_cols[self.region.first_col + col]].array
+        return values if isinstance(values, Categorical) else None
+
+    def column_values_at(self, col: int) -> Any:
+        values = self._frame.source_frame.iloc[:, self._frame.i_cols[self.region.first_col + col]].array
+        return values[self.row_indexer()]
+
+    def row_positions(self) -> np.ndarray:
+        return to_positions(self._visible_rows())
+
+    def column_positions(self) -> np.ndarray:
+        return to_positions(self._visible_cols())
+
+    def row_indexer(self) -> Union[slice, np.ndarray]:
+        # to extract the values of the rows of the chunk, a slice if the rows are contiguous
+        return to_slice_or_positions(self._visible_rows())
+
+    def column_indexer(self) -> Union[slice, np.ndarray]:
+        return to_slice_or_positions(self._visible_cols())
+
+    def _visible_rows(self) -> Indexer:
+        r = self.region
+        return self._frame.i_rows[r.first_row:r.first_row + r.rows]
+
+    def _visible_cols(self) -> Indexer:
+        r = self.region
+        return self._frame.i_cols[r.first_col:r.first_col + r.cols]
+
+    def source_index(self) -> Index:
+        return self._frame.source_frame.index
+
+    def source_columns(self) -> Index:
+        return self._frame.source_frame.columns
+
     def index_names(self) -> list:
         return self._frame.source_frame.index.names
 
@@ -60,10 +127,7 @@ class Chunk:
         return self._frame.source_frame.columns.names
 
     def to_frame(self) -> DataFrame:
-        r = self.region
-        i_rows = self._frame.i_rows[r.first_row:r.first_row + r.rows]
-        i_cols = self._frame.i_cols[r.first_col:r.first_col + r.cols]
-        return self._frame.source_frame.iloc[i_rows, i_cols]
+        return self._frame.source_frame.iloc[self.row_indexer(), self.column_indexer()]
 
     def create_cell_iloc_into_org_frame_translator(self) -> Callable[[Tuple[int, int]], Tuple[int, int]]:
         ri_translator = self.create_row_into_org_frame_translator()
@@ -94,10 +158,10 @@ class Chunk:
 
 
 class VisibleFrame(AbstractVisibleFrame):
-    def __init__(self, source_frame: DataFrame, visible_rows: np.ndarray, visible_cols: np.ndarray):
+    def __init__(self, source_frame: DataFrame, visible_rows: Indexer, visible_cols: Indexer):
         self.source_frame = source_frame
-        self.i_rows = visible_rows
-        self.i_cols = visible_cols
+        self.i_rows: Indexer = create_compact_indexer(visible_rows)
+        self.i_cols: Indexer = create_compact_indexer(visible_cols)
         self._region = Region(0, 0, len(visible_rows), len(visible_cols))
 
     @property
@@ -108,4 +172,7 @@ class VisibleFrame(AbstractVisibleFrame):
         return Chunk(self, self._region if region is None else self.region.get_bounded_region(region))
 
     def get_column_indices(self, part_start: int, max_columns: int) -> List[int]:
-        return list(self.i_cols[part_start:part_start + max_columns])
+        return [int(i) for i in self.i_cols[part_start:part_start + max_columns]]
+
+    def get_indexers_nbytes(self) -> int:
+        return get_indexer_nbytes(self.i_rows) + get_indexer_nbytes(self.i_cols)
@@ -0,0 +1,46 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.io.formats.printing import pprint_thing
+
+from cms_rendner_sdfv.pandas.shared.datetimelike_formatter import format_datetimelike_values
+
+
+def _format_one_by_one(values) -> list:
+    return [pprint_thing(v) for v in values]
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        pd.array(pd.to_datetime([
+            pd.Timestamp('2024-01-01'),
+            pd.Timestamp('2024-01-01 00:00:00.5'),
+            pd.Timestamp('2024-01-01 00:00:00.000001'),
+            pd.Timestamp('2024-01-01 00:00:00.000000001'),
+            pd.Timestamp('1901-12-13 20:45:52.123456789'),
+            None,
+        ])),
+        pd.array(pd.date_range('2024-10-27 00:00', periods=8, freq='30min', tz='Europe/Berlin')),
+        pd.array(pd.date_range('2024-10-27 00:00', periods=3, freq='D', tz='UTC')),
+        pd.array(pd.date_range('2024-10-27', periods=3, freq='D', tz=dt.timezone(dt.timedelta(hours=5, minutes=30)))),
+        pd.array(pd.to_timedelta([0, 1, -1, 1000, -10 ** 6, 10 ** 9, None, -86400 * 10 ** 9, 123456789123456789])),
+        pd.array(pd.period_range('2024-01-01', periods=3, freq='D')),
+        pd.array(pd.period_range('2024-01-01', periods=3, freq='W')),
+        pd.array(pd.period_range('2024', periods=3, freq='Q')),
+    ],
+)
+def test_matches_formatting_of_boxed_values(values):
+    assert format_datetimelike_values(values) == _format_one_by_one(values)
+
+
+def test_only_missing_values():
+    values = pd.array(pd.to_datetime([None, None]).tz_localize('Europe/Berlin'))
+    assert format_datetimelike_values(values) == ['NaT', 'NaT']
+
+
+def test_unsupported_values():
+    assert format_datetimelike_values(pd.array([1, 2, 3])) is None
+    assert format_datetimelike_values(pd.array(np.array(['a', 'b'], dtype=object))) is None
@@ -0,0 +1,221 @@
+import gc
+import weakref
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cms_rendner_sdfv.pandas.frame.frame_context import FrameContext
+from cms_rendner_sdfv.base.caller_namespace import CallerNamespace
+from cms_rendner_sdfv.base.types import CreateTableSourceFailure
+from cms_rendner_sdfv.pandas.shared.filter_engine import FilterCache, PositionalFilter, evaluate_filter_expr, \
+    resolve_filter
+from cms_rendner_sdfv.pandas.shared.frame_digest import create_frame_digest
+from cms_rendner_sdfv.pandas.shared.types import FilterCriteria
+
+df = pd.DataFrame({
+    "a": [4, 1, 3, 2, 5],
+    "b": [10, 11, 12, 13, 14],
+}, index=["x", "y", "x", "z", "w"])
+
+
+def _visible_rows(ctx: FrameContext) -> list:
+    return list(ctx.visible_frame.get_chunk().row_positions())
+
+
+def test_filter_frame_with_duplicated_labels_does_not_duplicate_rows():
+    ctx = FrameContext(df, resolve_filter(df, df[df["a"] > 2]))
+    assert _visible_rows(ctx) == [0, 2, 4]
+
+
+def test_boolean_series_is_matched_by_position():
+    positional_filter = resolve_filter(df, df["a"] > 2)
+    assert list(positional_filter.row_mask) == [True, False, True, False, True]
+    assert positional_filter.col_mask is None
+
+
+def test_boolean_series_with_other_index_is_matched_by_label():
+    mask = pd.Series([True, False], index=["z", "y"])
+    assert list(resolve_filter(df, mask).row_mask) == [False, False, False, True, False]
+
+
+def test_query_string():
+    assert list(resolve_filter(df, "a > 2 and b < 14").row_mask) == [True, False, True, False, False]
+
+
+def test_query_string_with_variables_of_caller():
+    ns = CallerNamespace({"limit": 10}, {"limit": 2})
+    assert list(resolve_filter(df, "a > @limit", ns).row_mask) == [True, False, True, False, True]
+
+    # the filter of a query string isn't cached, the referenced variables could have been re-assigned
+    cache = FilterCache()
+    first = evaluate_filter_expr(df, "fp", "'a > @limit'", CallerNamespace({}, {"limit": 4}), filter_cache=cache)
+    second = evaluate_filter_expr(df, "fp", "'a > @limit'", CallerNamespace({}, {"limit": 3}), filter_cache=cache)
+    assert list(first.row_mask) == [False, False, False, False, True]
+    assert list(second.row_mask) == [True, False, False, False, True]
+
+
+def test_query_string_has_to_result_in_boolean_series():
+    for query in ["a + 1", "c = a + b"]:
+        with pytest.raises(TypeError):
+            resolve_filter(df, query)
+
+
+def test_boolean_array():
+    mask = np.array([False, True, False, False, True])
+    assert resolve_filter(df, mask).row_mask is mask
+
+
+def test_filter_criteria():
+    positional_filter = resolve_filter(df, FilterCriteria(None, pd.Index(["b"])))
+    assert positional_filter.row_mask is None
+    assert list(positional_filter.col_mask) == [False, True]
+
+
+def test_unmodified_labels_are_not_resolved():
+    positional_filter = resolve_filter(df, df[["b"]])
+    assert positional_filter.row_mask is None
+    assert positional_filter.is_empty() is False
+
+
+def test_unsupported_filters():
+    for filter_input in [df["a"], np.array([1, 2]), "a + 1", {}]:
+        with pytest.raises(TypeError):
+            resolve_filter(df, filter_input)
+
+
+def test_sorting_keeps_filtered_rows():
+    ctx = FrameContext(df, resolve_filter(df, df["a"] > 1))
+    ctx.set_sort_criteria([0], [False])
+    assert _visible_rows(ctx) == [4, 0, 2, 3]
+
+
+def test_filter_cache_evicts_oldest_entries():
+    cache = FilterCache(max_bytes=8, max_entries=2)
+    digest = create_frame_digest(df)
+    filters = [PositionalFilter(row_mask=np.ones(4, dtype=bool)) for _ in range(3)]
+    for i, f in enumerate(filters):
+        cache.put(i, digest, f)
+
+    assert cache.get(0, digest) is None
+    assert cache.get(1, digest) is filters[1]
+    assert cache.get(2, digest) is filters[2]
+
+    cache.put(3, digest, PositionalFilter(row_mask=np.ones(8, dtype=bool)))
+    assert cache.get(1, digest) is None
+    assert cache.get(2, digest) is None
+
+
+def test_filter_cache_ignores_entries_of_modified_frame():
+    frame = df.copy()
+    cache = FilterCache()
+    positional_filter = PositionalFilter(row_mask=np.ones(5, dtype=bool))
+    cache.put("key", create_frame_digest(frame), positional_filter)
+    assert cache.get("key", create_frame_digest(frame)) is positional_filter
+
+    frame.iloc[0, 0] = 100
+    assert cache.get("key", create_frame_digest(frame)) is None
+
+
+def test_evaluate_filter_expr_reuses_cached_filter():
+    cache = FilterCache()
+    ns = CallerNamespace({"df": df}, {})
+    first = evaluate_filter_expr(df, "fp", "df['a'] > 2", ns, filter_cache=cache)
+    assert list(first.row_mask) == [True, False, True, False, True]
+    assert evaluate_filter_expr(df, "fp", "df['a'] > 2", ns, filter_cache=cache) is first
+
+    # a re-assigned variable invalidates the cached filter
+    ns = CallerNamespace({"df": df}, {"limit": 3})
+    first = evaluate_filter_expr(df, "fp", "df['a'] > limit", ns, filter_cache=cache)
+    ns = CallerNamespace({"df": df}, {"limit": 4})
+    second = evaluate_filter_expr(df, "fp", "df['a'] > limit", ns, filter_cache=cache)
+    assert list(first.row_mask) == [True, False, False, False, True]
+    assert list(second.row_mask) == [False, False, False, False, True]
+
+
+def test_evaluate_filter_expr_detects_re_assigned_variables():
+    frame = pd.DataFrame({"a": np.arange(1000) / 100})
+    cache = FilterCache()
+    for i in range(200):
+        # the ids of the freed floats are reused
+        threshold = i / 100
+        ns = CallerNamespace({"df": frame}, {"threshold": threshold})
+        positional_filter = evaluate_filter_expr(frame, "fp", "df.a > threshold", ns, filter_cache=cache)
+        assert positional_filter.row_mask.sum() == 999 - i
+
+    # other objects are held by the cache entry and compared by identity
+    ns = CallerNamespace({"df": frame}, {"values": [0.0, 0.01]})
+    first = evaluate_filter_expr(frame, "fp", "df.a.isin(values)", ns, filter_cache=cache)
+    assert evaluate_filter_expr(frame, "fp", "df.a.isin(values)", ns, filter_cache=cache) is first
+    ns = CallerNamespace({"df": frame}, {"values": [0.0]})
+    assert evaluate_filter_expr(frame, "fp", "df.a.isin(values)", ns, filter_cache=cache).row_mask.sum() == 1
+
+
+def test_filter_cache_does_not_keep_frames_alive():
+    cache = FilterCache()
+    frame = pd.DataFrame({"a": np.arange(10)})
+    frame_ref = weakref.ref(frame)
+    ns = CallerNamespace({}, {})
+    ns["_df"] = frame
+    positional_filter = evaluate_filter_expr(frame, "fp", "_df[_df.a > 5]", ns, filter_cache=cache)
+    assert positional_filter.row_mask.sum() == 4
+
+    del frame, ns
+    gc.collect()
+    assert frame_ref() is None
+
+    # entries of collected objects are dropped
+    cache.put("other", create_frame_digest(df), PositionalFilter())
+    assert len(cache._entries) == 1
+
+
+def test_evaluate_filter_expr_failures():
+    ns = CallerNamespace({"df": df}, {})
+    failure = evaluate_filter_expr(df, "fp", "df[", ns, filter_cache=FilterCache())
+    assert isinstance(failure, CreateTableSourceFailure)
+    assert failure.error_kind == "FILTER_FRAME_EVAL_FAILED"
+
+    failure = evaluate_filter_expr(df, "fp", "{}", ns, filter_cache=FilterCache())
+    assert isinstance(failure, CreateTableSourceFailure)
+    assert failure.error_kind == "FILTER_FRAME_OF_WRONG_TYPE"
+
+
+def test_evaluate_filter_expr_refines_cached_filter():
+    cache = FilterCache()
+    ns = CallerNamespace({"df": df}, {})
+    evaluate_filter_expr(df, "fp", "df['a'] > 1", ns, filter_cache=cache)
+
+    refined = evaluate_filter_expr(df, "fp", "(df['a'] > 1) & (df.b < 14)", ns, filter_cache=cache)
+    assert list(refined.row_mask) == [True, False, True, True, False]
+
+    # explicit refinement of a previous expression
+    refined = evaluate_filter_expr(
+        df, "fp", "df.a.isin([3, 5])", ns, previous_filter_expr="df['a'] > 1", filter_cache=cache,
+    )
+    assert list(refined.row_mask) == [False, False, True, False, True]
+
+
+def test_evaluate_filter_expr_refines_only_filters_of_boolean_series():
+    frame = df.reset_index(drop=True)
+    cache = FilterCache()
+    ns = CallerNamespace({"df": frame}, {})
+    uncached = evaluate_filter_expr(
+        frame, "fp", "df.b > 12", ns, previous_filter_expr="df[df.a > 2]", filter_cache=FilterCache(),
+    )
+
+    evaluate_filter_expr(frame, "fp", "df[df.a > 2]", ns, filter_cache=cache)
+    cached = evaluate_filter_expr(frame, "fp", "df.b > 12", ns, previous_filter_expr="df[df.a > 2]", filter_cache=cache)
+
+    # the same result, independent of the cached filter of the DataFrame
+    assert list(cached.row_mask) == list(uncached.row_mask)
+    assert list(cached.col_mask) == list(uncached.col_mask)
+
+
+def test_evaluate_filter_expr_does_not_refine_with_non_row_local_predicate():
+    cache = FilterCache()
+    ns = CallerNamespace({"df": df}, {})
+    evaluate_filter_expr(df, "fp", "df['a'] > 1", ns, filter_cache=cache)
+
+    # the mean of all rows is 3, the mean of the kept rows is 3.5
+    refined = evaluate_filter_expr(df, "fp", "(df['a'] > 1) & (df.a >= df.a.mean())", ns, filter_cache=cache)
+    assert list(refined.row_mask) == [True, False, True, False, True]
@@ -12,21 +12,41 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 from abc import ABC
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple, Union
 
-from pandas import DataFrame
+import numpy as np
+from pandas import DataFrame, RangeIndex
 
 from cms_rendner_sdfv.base.table_source import AbstractTableSourceContext
-from cms_rendner_sdfv.base.types import SortCriteria, TableStructure
+from cms_rendner_sdfv.base.types import FrameDigest, QuickFilter, SortCriteria, TableStructure
+from cms_rendner_sdfv.pandas.shared.column_index import ColumnIndexes
+from cms_rendner_sdfv.pandas.shared.filter_engine import PositionalFilter, resolve_filter
+from cms_rendner_sdfv.pandas.shared.frame_digest import create_frame_digest
 from cms_rendner_sdfv.pandas.shared.types import FilterCriteria
-from cms_rendner_sdfv.pandas.shared.visible_frame import VisibleFrame
+from cms_rendner_sdfv.pandas.shared.visible_frame import Indexer, VisibleFrame, create_compact_indexer, \
+    get_indexer_nbytes, to_positions, to_slice_or_positions
 
 
 class PandasTableSourceContext(AbstractTableSourceContext, ABC):
-    def __init__(self, source_frame: DataFrame, filter_criteria: Optional[FilterCriteria] = None):
+    def __init__(self,
+                 source_frame: DataFrame,
+                 filter_criteria: Union[FilterCriteria, PositionalFilter, None] = None,
+                 ):
+        super().__init__()
         self._source_frame = source_frame
         self._sort_criteria: SortCriteria = SortCriteria()
-        self._filter_criteria: FilterCriteria = filter_criteria if filter_criteria is not None else FilterCriteria()
+        self._quick_filters: List[QuickFilter] = []
+        self._column_indexes: ColumnIndexes = ColumnIndexes(source_frame)
+        # the filter is resolved once, sorting only reorders the filtered positions
+        with self._perf_stats.measure("filter"):
+            self._filter: PositionalFilter = resolve_filter(source_frame, filter_criteria)
+            hidden_rows, hidden_cols = self._get_hidden_positions()
+            self._filtered_rows: Indexer = create_compact_indexer(
+                self._filter.get_row_positions(len(source_frame.index), hidden_rows),
+            )
+            self._filtered_cols: Indexer = create_compact_indexer(
+                self._filter.get_col_positions(len(source_frame.columns), hidden_cols),
+            )
         self._visible_frame: VisibleFrame = self._recompute_visible_frame()
 
     @property
@@ -46,35 +66,69 @@ class PandasTableSourceContext(AbstractTableSourceContext, ABC):
             fingerprint=fingerprint,
         )
 
+    def get_memory_usage(self) -> int:
+        # The source frame isn't included, it is owned by the caller and not freed when the table source is removed.
+        vf = self._visible_frame
+        filter_bytes = 0 if self._filtered_rows is vf.i_rows else get_indexer_nbytes(self._filtered_rows)
+        return filter_bytes + vf.get_indexers_nbytes() + self._column_indexes.nbytes
+
+    def create_frame_digest(self) -> FrameDigest:
+        return create_frame_digest(self._source_frame)
+
     def set_sort_criteria(self, sort_by_column_index: Optional[List[int]], sort_ascending: Optional[List[bool]]):
         new_sort_criteria = SortCriteria(sort_by_column_index, sort_ascending)
         if new_sort_criteria != self._sort_criteria:
             self._sort_criteria = new_sort_criteria
             self._visible_frame = self._recompute_visible_frame()
 
-    def _get_initial_visible_frame_indexes(self):
-        return self._source_frame.index, self._source_frame.columns
+    def set_quick_filters(self, quick_filters: List[QuickFilter]):
+        if quick_filters != self._quick_filters:
+            self._quick_filters = list(quick_filters)
+            self._visible_frame = self._recompute_visible_frame()
 
-    def _recompute_visible_frame(self) -> VisibleFrame:
-        index, columns = self._get_initial_visible_frame_indexes()
+    def set_column_index_budget(self, max_bytes: int):
+        self._column_indexes.set_max_bytes(max_bytes)
 
-        if self._filter_criteria.index is not None:
-            index = index.intersection(self._filter_criteria.index)
+    def clear_caches(self):
+        self._column_indexes.clear()
 
-        if self._filter_criteria.columns is not None:
-            columns = columns.intersection(self._filter_criteria.columns)
+    def _get_hidden_positions(self) -> Tuple[Optional[Sequence[int]], Optional[Sequence[int]]]:
+        # positions of the rows and columns which are never visible
+        return None, None
+
+    def _recompute_visible_frame(self) -> VisibleFrame:
+        rows = self._filtered_rows
+        cols = self._filtered_cols
+
+        if self._quick_filters:
+            with self._perf_stats.measure("quick_filter"):
+                for qf in self._quick_filters:
+                    rows = _keep_positions(rows, self._column_indexes.find_positions(int(cols[qf.column]), qf))
+                rows = create_compact_indexer(rows)
 
         if not self._sort_criteria.is_empty():
-            sc = self._sort_criteria
-            frame = self._source_frame.loc[index, columns]
-            frame = frame.sort_values(
-                by=[frame.columns[i] for i in sc.by_column],
-                ascending=True if sc.ascending is None or len(sc.ascending) == 0 else sc.ascending,
-            )
-            index = frame.index
+            with self._perf_stats.measure("sort"):
+                sc = self._sort_criteria
+                by = [int(cols[i]) for i in sc.by_column]
+                frame = self._source_frame.iloc[to_slice_or_positions(rows), by]
+                # positional labels, the labels of the source frame can contain duplicates
+                frame.index = RangeIndex(len(frame.index))
+                frame.columns = RangeIndex(len(by))
+                frame = frame.sort_values(
+                    by=list(frame.columns),
+                    ascending=True if sc.ascending is None or len(sc.ascending) == 0 else sc.ascending,
+                )
+                rows = to_positions(rows)[frame.index.to_numpy()]
 
-        return VisibleFrame(
-            self._source_frame,
-            self._source_frame.index.get_indexer_for(index),
-            self._source_frame.columns.get_indexer_for(columns),
-        )
+        return VisibleFrame(self._source_frame, rows, cols)
+
+
+def _keep_positions(rows: Indexer, positions: np.ndarray) -> np.ndarray:
+    # Returns the positions which are part of the rows, both are sorted.
+    if isinstance(rows, range):
+        # compact ranges have a step of 1
+        return positions[positions.searchsorted(rows.start):positions.searchsorted(rows.stop)]
+    found = rows.searchsorted(positions)
+    in_bounds = found < len(rows)
+    in_bounds[in_bounds] = rows[found[in_bounds]] == positions[in_bounds]
+    return positions[in_bounds]
@@ -0,0 +1,73 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+import numpy as np
+from pandas import Index
+
+
+class _FormattedLabels:
+    def __init__(self, labels: Index):
+        self.labels = labels
+        self.formatted: Dict[int, str] = {}
+        self.na_label: Optional[str] = None
+
+
+class FormattedLabelsCache:
+    # Caches the formatted labels of "coded" data, like the categories of a column with a "CategoricalDtype"
+    # or the levels of a "MultiIndex". Each label is formatted at most once, the values of a chunk are
+    # resolved by looking up their integer codes.
+    #
+    # Labels are formatted on first use instead of all at once, to not pay for the formatting of
+    # categories/levels which are never displayed (a level can be as large as the index itself).
+
+    def __init__(self):
+        self._entries: Dict[Hashable, _FormattedLabels] = {}
+        self._formatter_state: Any = None
+
+    def sync_formatter_state(self, state: Any):
+        # The formatted labels depend on the display options used by the formatter.
+        # In case the options were changed, all cached labels have to be discarded.
+        if state != self._formatter_state:
+            self._formatter_state = state
+            self._entries.clear()
+
+    def format_codes(self,
+                     key: Hashable,
+                     labels: Index,
+                     codes: np.ndarray,
+                     format_label: Callable[[Any], str],
+                     get_na_value: Callable[[int], Any],
+                     ) -> List[str]:
+        # "codes" refer to an entry in "labels", a code of -1 marks a missing value.
+        # "get_na_value" returns the boxed missing value for a position in "codes" - the missing value is
+        # formatted in the same way as all other values.
+        entry = self._entries.get(key, None)
+        if entry is None or entry.labels is not labels:
+            entry = self._entries[key] = _FormattedLabels(labels)
+
+        formatted = entry.formatted
+        result = []
+        for i, code in enumerate(codes.tolist()):
+            if code < 0:
+                if entry.na_label is None:
+                    entry.na_label = format_label(get_na_value(i))
+                result.append(entry.na_label)
+                continue
+            label = formatted.get(code, None)
+            if label is None:
+                label = formatted[code] = format_label(labels[code])
+            result.append(label)
+
+        return result
@@ -11,9 +11,9 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
-from typing import Callable, List, Optional, Tuple
+from typing import Callable, List, Optional, Sequence, Tuple
 
-from pandas import DataFrame, Index
+from pandas import DataFrame
 from pandas.io.formats.style import Styler
 
 from cms_rendner_sdfv.base.table_source import AbstractTableFrameGenerator, TableFrameValidator
@@ -33,12 +33,18 @@ class PatchedStylerContext(PandasTableSourceContext):
         self._has_hidden_columns = len(styler.hidden_columns) > 0
         self._styler = styler
         self._styler_todos = [StylerTodo.from_tuple(t) for t in styler._todo]
+        self._deferred_styling = False
         super().__init__(styler.data, filter_criteria)
 
     def get_table_frame_generator(self) -> AbstractTableFrameGenerator:
         # local import to resolve cyclic import
         from cms_rendner_sdfv.pandas.styler.table_frame_generator import TableFrameGenerator
-        return TableFrameGenerator(self)
+        return TableFrameGenerator(self, (lambda todo: False) if self._deferred_styling else None)
+
+    def set_deferred_styling(self, enabled: bool):
+        # If enabled, the generated table frames only contain the formatted values (display funcs are applied)
+        # but none of the styling of the todos. The css has to be computed separately.
+        self._deferred_styling = enabled
 
     def get_styler(self) -> Styler:
         return self._styler
@@ -54,15 +60,33 @@ class PatchedStylerContext(PandasTableSourceContext):
                              chunk: DataFrame,
                              todos_filter: Optional[Callable[[StylerTodo], bool]] = None,
                              ) -> List[Tuple[Callable, tuple, dict]]:
-        filtered_todos = self._styler_todos if todos_filter is None else list(filter(todos_filter, self._styler_todos))
-        return TodosPatcher().patch_todos_for_chunk(filtered_todos, self._source_frame, chunk)
+        result = []
+        patcher = TodosPatcher()
+        for i, todo in enumerate(self._styler_todos):
+            if todos_filter is None or todos_filter(todo):
+                # the stage of a todo is identified by its index (same as the "StyleFunctionInfo.index")
+                patched_todos = patcher.patch_todos_for_chunk([todo], self._source_frame, chunk)
+                result.extend(self._measure_todo(f"styler_todo.{i}", t) for t in patched_todos)
+        return result
+
+    def _measure_todo(self, stage: str, todo: Tuple[Callable, tuple, dict]) -> Tuple[Callable, tuple, dict]:
+        # Records the time spent in the style function of the todo, when the todo is executed by the styler.
+        apply_func, args, kwargs = todo
+        perf_stats = self._perf_stats
+
+        def measured_apply_func(styler: Styler):
+            bound_apply_func = apply_func(styler)
+
+            def measured(*a, **kw):
+                with perf_stats.measure(stage):
+                    return bound_apply_func(*a, **kw)
 
-    def _get_initial_visible_frame_indexes(self):
-        index, columns = super()._get_initial_visible_frame_indexes()
+            return measured
 
-        if self._has_hidden_columns:
-            columns = columns.delete(Index(self._styler.hidden_columns))
-        if self._has_hidden_rows:
-            index = index.delete(Index(self._styler.hidden_rows))
+        return measured_apply_func, args, kwargs
 
-        return index, columns
+    def _get_hidden_positions(self) -> Tuple[Optional[Sequence[int]], Optional[Sequence[int]]]:
+        return (
+            self._styler.hidden_rows if self._has_hidden_rows else None,
+            self._styler.hidden_columns if self._has_hidden_columns else None,
+        )
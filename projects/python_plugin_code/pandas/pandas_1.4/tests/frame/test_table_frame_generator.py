@@ -4,6 +4,7 @@ from pandas import option_context
 from cms_rendner_sdfv.base.constants import CELL_MAX_STR_LEN, DESCRIBE_COL_MAX_STR_LEN
 from cms_rendner_sdfv.base.types import TableFrame, TableFrameCell, TableFrameColumn, TableFrameLegend
 from cms_rendner_sdfv.pandas.frame.frame_context import FrameContext
+from cms_rendner_sdfv.pandas.shared.value_formatter import ValueFormatter
 from tests.helpers.asserts.assert_table_frames import assert_table_frames
 
 
@@ -327,3 +328,116 @@ def test_column_describe():
         ),
         include_column_describe=True,
     )
+
+
+def test_categorical_values_with_missing_values():
+    df = pd.DataFrame.from_dict({
+        'str': pd.Categorical(['b', None, 'a', 'b']),
+        'float': pd.Categorical([1.5, 2.0, None, 1.5]),
+        'datetime': pd.Categorical(pd.to_datetime(['2024-01-01', None, '2024-01-02', '2024-01-01'])),
+    })
+
+    ctx = FrameContext(df)
+    actual = ctx.get_table_frame_generator().generate_by_combining_chunks(3, 2)
+    assert actual.cells == [
+        [TableFrameCell(value='b'), TableFrameCell(value='1.500000'), TableFrameCell(value='2024-01-01 00:00:00')],
+        [TableFrameCell(value='nan'), TableFrameCell(value='2.000000'), TableFrameCell(value='nan')],
+        [TableFrameCell(value='a'), TableFrameCell(value='nan'), TableFrameCell(value='2024-01-02 00:00:00')],
+        [TableFrameCell(value='b'), TableFrameCell(value='1.500000'), TableFrameCell(value='2024-01-01 00:00:00')],
+    ]
+
+
+def test_categorical_values_respect_sorting():
+    df = pd.DataFrame.from_dict({
+        'cat': pd.Categorical(['b', 'c', 'a'], categories=['c', 'b', 'a'], ordered=True),
+    })
+
+    ctx = FrameContext(df)
+    ctx.set_sort_criteria([0], [True])
+    actual = ctx.get_table_frame_generator().generate()
+    assert actual.cells == [[TableFrameCell(value='c')], [TableFrameCell(value='b')], [TableFrameCell(value='a')]]
+
+
+def test_categorical_values_are_formatted_with_current_display_options():
+    df = pd.DataFrame.from_dict({'cat': pd.Categorical([1.123456789])})
+    ctx = FrameContext(df)
+
+    with option_context('display.precision', 2):
+        assert ctx.get_table_frame_generator().generate().cells == [[TableFrameCell(value='1.12')]]
+
+    with option_context('display.precision', 4):
+        assert ctx.get_table_frame_generator().generate().cells == [[TableFrameCell(value='1.1235')]]
+
+
+def test_multi_index_with_missing_level_values():
+    index = pd.MultiIndex.from_arrays(
+        [['X', None, 'Y'], pd.to_datetime(['2024-01-01', '2024-01-02', None])],
+        names=['char', 'date'],
+    )
+    columns = pd.MultiIndex.from_arrays([['A', 'A', None], [1, None, 2]])
+    df = pd.DataFrame([[0, 1, 2], [3, 4, 5], [6, 7, 8]], index=index, columns=columns)
+
+    ctx = FrameContext(df)
+    actual = ctx.get_table_frame_generator().generate_by_combining_chunks(2, 2)
+    assert actual.index_labels == [
+        ['X', '2024-01-01 00:00:00'],
+        ['nan', '2024-01-02 00:00:00'],
+        ['Y', 'nan'],
+    ]
+    assert [c.labels for c in actual.columns] == [['A', '1'], ['A', 'nan'], ['nan', '2']]
+
+
+def test_categorical_and_multi_index_labels_match_cell_by_cell_formatting():
+    index = pd.MultiIndex.from_product([['X', 'Y'], [1.5, 2.5]], names=['char', 'num'])
+    df = pd.DataFrame.from_dict({
+        'cat': pd.Categorical(['a', None, 'a', 'b']),
+        'num': [1, 2, 3, 4],
+    })
+    df.index = index
+    ctx = FrameContext(df)
+    ctx.set_sort_criteria([0], [False])
+
+    result = ctx.get_table_frame_validator().validate(1, 1)
+    assert result.actual == result.expected
+
+
+def test_datetimelike_values():
+    df = pd.DataFrame.from_dict({
+        'datetime': pd.to_datetime([pd.Timestamp('2024-01-01'), None, pd.Timestamp('2024-01-02 12:30:00.5')]),
+        'datetime_tz': pd.to_datetime(['2024-01-01', '2024-07-01', None]).tz_localize('Europe/Berlin'),
+        'timedelta': pd.to_timedelta(['1 days 2 hours', '-1s', None]),
+        'period': pd.period_range('2024-01', periods=3, freq='M'),
+    })
+
+    ctx = FrameContext(df)
+    actual = ctx.get_table_frame_generator().generate_by_combining_chunks(2, 2)
+    assert [[c.value for c in row] for row in actual.cells] == [
+        ['2024-01-01 00:00:00', '2024-01-01 00:00:00+01:00', '1 days 02:00:00', '2024-01'],
+        ['NaT', '2024-07-01 00:00:00+02:00', '-1 days +23:59:59', '2024-02'],
+        ['2024-01-02 12:30:00.500000', 'NaT', 'NaT', '2024-03'],
+    ]
+
+
+def test_datetimelike_values_match_cell_by_cell_formatting():
+    df = pd.DataFrame.from_dict({
+        'datetime': pd.to_datetime([
+            pd.Timestamp('1900-05-06 01:02:03.000000004'),
+            pd.Timestamp('2024-01-01'),
+            None,
+            pd.Timestamp('1970-01-01 00:00:00.000001'),
+        ]),
+        'datetime_tz': pd.date_range('2024-03-31 00:30', periods=4, freq='37min', tz='Europe/Berlin'),
+        'timedelta': pd.to_timedelta([-1, 0, None, 10 ** 15 + 123]),
+        'period': pd.period_range('2024-01-01', periods=4, freq='W'),
+    })
+    ctx = FrameContext(df)
+    ctx.set_sort_criteria([0], [False])
+
+    result = ctx.get_table_frame_validator().validate(1, 1)
+    assert result.actual == result.expected
+
+    formatter = ValueFormatter()
+    vf = ctx.visible_frame
+    expected_cells = [[formatter.format_cell(df.iloc[r, c]) for c in vf.i_cols] for r in vf.i_rows]
+    actual = ctx.get_table_frame_generator().generate()
+    assert [[c.value for c in row] for row in actual.cells] == expected_cells
@@ -1,6 +1,11 @@
+import json
+import os
+
 import numpy as np
 from pandas import DataFrame, MultiIndex
 
+from cms_rendner_sdfv.base.transforms import to_json
+from cms_rendner_sdfv.base.types import QuickFilter, QuickFilterOp, Region
 from cms_rendner_sdfv.pandas.frame.frame_context import FrameContext
 from cms_rendner_sdfv.pandas.frame.table_source import TableSource
 
@@ -31,3 +36,156 @@ def test_get_org_indices_of_visible_columns():
     num_cols = 3
     actual = ts.get_org_indices_of_visible_columns(0, num_cols)
     assert actual == list(range(0, num_cols))
+
+
+def test_compute_chunk_table_frame_with_cell_max_str_len():
+    text_df = DataFrame({"a": ["a" * 300, "b"], "b": ["c" * 300, [1, "d" * 300]]})
+    ts = TableSource(FrameContext(text_df), "")
+
+    default = ts.compute_chunk_table_frame(0, 0, 2, 2)
+    assert [len(c.value) for c in default.cells[0]] == [200, 200]
+
+    short = ts.compute_chunk_table_frame(0, 0, 2, 2, cell_max_str_len=10, cell_max_str_len_per_column={1: 5})
+    assert [[c.value for c in row] for row in short.cells] == [["a" * 9 + "…", "cccc…"], ["b", "[1, …"]]
+    # the limit includes the "…"
+    assert [len(c.value) for c in short.cells[0]] == [10, 5]
+
+
+def test_get_cell_value():
+    text_df = DataFrame({"a": ["a" * 300, "b"], "b": [["c" * 300], 1.5]})
+    ts = TableSource(FrameContext(text_df), "")
+
+    assert ts.get_cell_value(0, 0) == "a" * 300
+    assert ts.get_cell_value(0, 0, 5) == "aaaa…"
+    assert len(ts.get_cell_value(0, 0, 10)) == 10
+    assert ts.get_cell_value(0, 1) == "[" + "c" * 300 + "]"
+    assert ts.get_cell_value(1, 1) == ts.compute_chunk_table_frame(1, 1, 1, 1).cells[0][0].value
+
+    ts.set_sort_criteria([0], [False])
+    assert ts.get_cell_value(0, 0) == "b"
+
+
+def test_get_memory_usage():
+    ts = TableSource(FrameContext(df), "")
+    # unsorted and unfiltered, the visible rows and columns are ranges
+    # (the source frame isn't included, it isn't owned by the table source)
+    assert ts.get_memory_usage() == 0
+
+    ts.set_sort_criteria([0], [False])
+    assert ts.get_memory_usage() == 6 * np.dtype(np.int32).itemsize
+
+
+def test_get_perf_stats():
+    ts = TableSource(FrameContext(df), "")
+    ts.set_sort_criteria([0], [False])
+    ts.compute_chunk_table_frame(0, 0, 2, 2)
+
+    stats = json.loads(ts.get_perf_stats())
+    # the filter is resolved once, not again for the sorting
+    for stage in ["filter", "sort", "compute_chunk_table_frame", "format_columns", "format_index", "format_cells"]:
+        assert stats[stage]["calls"] == 1
+
+
+def test_compute_chunk_table_frame_with_time_budget():
+    large_df = DataFrame(np.arange(200).reshape(100, 2))
+    ts = TableSource(FrameContext(large_df), "")
+    expected = ts.compute_chunk_table_frame(0, 0, 100, 2)
+
+    # a budget of 0 computes only the first step
+    partial = ts.compute_chunk_table_frame(0, 0, 100, 2, time_budget=0)
+    assert partial.remaining_region == Region(8, 0, 92, 2)
+    assert len(partial.cells) == len(partial.index_labels) == 8
+    assert partial.cells == expected.cells[:8]
+
+    # the same request resumes the computation
+    resumed = ts.compute_chunk_table_frame(0, 0, 100, 2, time_budget=0)
+    assert resumed.remaining_region == Region(16, 0, 84, 2)
+    assert resumed.cells == expected.cells[:16]
+
+    assert ts.compute_chunk_table_frame(0, 0, 100, 2, time_budget=60) == expected
+
+    # sorting discards the partial result
+    ts.compute_chunk_table_frame(0, 0, 100, 2, time_budget=0)
+    ts.set_sort_criteria([0], [False])
+    partial = ts.compute_chunk_table_frame(0, 0, 100, 2, time_budget=0)
+    assert partial.remaining_region == Region(8, 0, 92, 2)
+    assert partial.cells[0][0].value == "198"
+
+
+def test_compute_chunk_table_frame_with_prefetched_chunks():
+    large_df = DataFrame(np.arange(200).reshape(100, 2))
+    ts = TableSource(FrameContext(large_df), "")
+    expected_ts = TableSource(FrameContext(large_df), "")
+
+    ts.set_viewport(0, 0, 10, 2, "down", prefetch_depth=4)
+    ts._prefetcher.join()
+    assert json.loads(ts.get_perf_stats())["prefetch_chunk"]["calls"] == 4
+
+    exclude_headers = [(False, False), (True, False), (False, True), (True, True)]
+    for i, (exclude_row_header, exclude_col_header) in enumerate(exclude_headers):
+        args = (10 * (i + 1), 0, 10, 2, exclude_row_header, exclude_col_header)
+        assert ts.compute_chunk_table_frame(*args) == expected_ts.compute_chunk_table_frame(*args)
+    # all chunks were prefetched
+    assert "compute_chunk_table_frame" not in json.loads(ts.get_perf_stats())
+
+    # sorting discards the prefetched chunks
+    ts.set_viewport(0, 0, 10, 2, "down")
+    ts._prefetcher.join()
+    ts.set_sort_criteria([0], [False])
+    expected_ts.set_sort_criteria([0], [False])
+    assert ts.compute_chunk_table_frame(10, 0, 10, 2) == expected_ts.compute_chunk_table_frame(10, 0, 10, 2)
+
+
+def test_jsonify_to_buffer():
+    ts = TableSource(FrameContext(df), "")
+    table_frame = ts.compute_chunk_table_frame(0, 0, 2, 2)
+
+    location = json.loads(ts.jsonify_to_buffer(table_frame))
+    with open(location["path"], "rb") as f:
+        f.seek(location["offset"])
+        assert f.read(location["length"]).decode("utf-8") == ts.jsonify(table_frame)
+
+    ts.dispose()
+    assert not os.path.exists(location["path"])
+
+
+def test_detect_frame_change():
+    frame = DataFrame({"a": [1, 2, 3]})
+    ts = TableSource(FrameContext(frame), "")
+    assert ts.detect_frame_change() == "unchanged"
+    frame.iloc[0, 0] = 9
+    assert ts.detect_frame_change() == "values_changed"
+    assert ts.detect_frame_change() == "unchanged"
+
+    previous = json.loads(ts.jsonify(ts.get_frame_digest()))
+    frame["b"] = 1
+    assert ts.detect_frame_change(previous) == "structure_changed"
+
+
+def test_set_quick_filters():
+    frame = DataFrame({"a": [3, 1, 2, 5], "b": ["x", "y", "x", "z"]})
+    ts = TableSource(FrameContext(frame), "")
+    ts.set_column_index_budget(1024)
+
+    ts.set_quick_filters([{"column": 0, "op": "gt", "value": 1}, QuickFilter(1, QuickFilterOp.IN, ["x", "z"])])
+    assert ts.get_table_structure().rows_count == 3
+    ts.set_sort_criteria([0], [False])
+    assert [c.value for c in ts.compute_chunk_table_frame(0, 0, 3, 1).cells[0]] == ["5"]
+
+    ts.set_quick_filters([])
+    assert ts.get_table_structure().rows_count == 4
+
+
+def test_compute_chunk_delta():
+    frame = DataFrame({"a": [1, 2, 3], "b": [4, 5, 6]})
+    first = TableSource(FrameContext(frame), "").compute_chunk_delta(0, 0, 3, 2)
+    assert first.table_frame is not None
+
+    frame.iloc[1, 1] = 9
+    # re-created table source, as after a debugger step
+    delta = TableSource(FrameContext(frame), "").compute_chunk_delta(0, 0, 3, 2, json.loads(to_json(first.digest)))
+    assert delta.table_frame is None
+    assert [(c.row, c.col, c.cell.value) for c in delta.cells] == [(1, 1, "9")]
+    # the describe of the column changed
+    assert [c.col for c in delta.columns] == [1]
+    assert delta.index_labels == []
@@ -13,11 +13,97 @@
 #  limitations under the License.
 from typing import Any
 
+from pandas.core.dtypes.inference import is_sequence
 from pandas.errors import OptionError
 from pandas.io.formats.printing import pprint_thing, get_option
 
 from cms_rendner_sdfv.base.constants import CELL_MAX_STR_LEN
-from cms_rendner_sdfv.base.helpers import truncate_str
+from cms_rendner_sdfv.base.helpers import BoundedStrBuilder, truncate_str
+
+
+def bounded_pprint_thing(thing: Any, max_length: int, max_seq_items: int) -> str:
+    # Returns the same as 'truncate_str(pprint_thing(thing, max_seq_items=max_seq_items), max_length)'.
+    #
+    # Unlike "pprint_thing", the work is bounded by "max_length". Strings are sliced before they are
+    # added to the output and sequences/dicts are no longer iterated once "max_length" chars are emitted.
+    # Therefore, a cell with a huge string or a list with a lot of elements isn't fully rendered only
+    # to be truncated afterwards.
+    builder = BoundedStrBuilder(max_length)
+    _BoundedPrettyPrinter(builder, max_seq_items).print(thing, 0, False)
+    return builder.build()
+
+
+class _BoundedPrettyPrinter:
+    # Mirrors the output of "pandas.io.formats.printing.pprint_thing" (without "escape_chars").
+
+    def __init__(self, builder: BoundedStrBuilder, max_seq_items: int):
+        self._builder = builder
+        self._max_seq_items = max_seq_items
+        self._max_nest_depth = get_option("display.pprint_nest_depth")
+
+    def print(self, thing: Any, nest_lvl: int, quote_strings: bool):
+        builder = self._builder
+        if builder.is_full:
+            return
+        if hasattr(thing, "__next__"):
+            builder.append(str(thing))
+        elif isinstance(thing, dict) and nest_lvl < self._max_nest_depth:
+            self._print_dict(thing, nest_lvl)
+        elif is_sequence(thing) and nest_lvl < self._max_nest_depth:
+            self._print_seq(thing, nest_lvl, quote_strings)
+        elif isinstance(thing, str) and quote_strings:
+            builder.append("'")
+            builder.append(thing)
+            builder.append("'")
+        else:
+            builder.append(str(thing))
+
+    def _print_seq(self, seq: Any, nest_lvl: int, quote_strings: bool):
+        builder = self._builder
+        if isinstance(seq, set):
+            opening, closing = "{", "}"
+        elif hasattr(seq, "__setitem__"):
+            opening, closing = "[", "]"
+        else:
+            opening, closing = "(", ")"
+
+        seq_len = len(seq)
+        n_items = self._max_seq_items or seq_len
+
+        builder.append(opening)
+        items = iter(seq)
+        for i in range(min(n_items, seq_len)):
+            if builder.is_full:
+                break
+            if i > 0:
+                builder.append(", ")
+            self.print(next(items), nest_lvl + 1, quote_strings)
+
+        if n_items < seq_len:
+            builder.append(", ...")
+        elif isinstance(seq, tuple) and seq_len == 1:
+            builder.append(",")
+        builder.append(closing)
+
+    def _print_dict(self, d: dict, nest_lvl: int):
+        builder = self._builder
+        n_items = self._max_seq_items or len(d)
+
+        builder.append("{")
+        items = iter(d.items())
+        for i in range(min(n_items, len(d))):
+            if builder.is_full:
+                break
+            k, v = next(items)
+            if i > 0:
+                builder.append(", ")
+            self.print(k, nest_lvl + 1, True)
+            builder.append(": ")
+            self.print(v, nest_lvl + 1, True)
+
+        if n_items < len(d):
+            builder.append(", ...")
+        builder.append("}")
 
 
 class ValueFormatter:
@@ -31,13 +117,12 @@ class ValueFormatter:
         return value if isinstance(value, str) else pprint_thing(value)
 
     @staticmethod
-    def format_cell(value: Any) -> str:
-        v = value
-        if not isinstance(v, str):
-            max_seq_items = None
-            try:
-                max_seq_items = get_option("display.max_seq_items", True)
-            except OptionError:
-                pass
-            v = pprint_thing(v, max_seq_items=max_seq_items or 42)
-        return truncate_str(v, CELL_MAX_STR_LEN)
+    def format_cell(value: Any, max_length: int = CELL_MAX_STR_LEN) -> str:
+        if isinstance(value, str):
+            return truncate_str(value, max_length)
+        max_seq_items = None
+        try:
+            max_seq_items = get_option("display.max_seq_items", True)
+        except OptionError:
+            pass
+        return bounded_pprint_thing(value, max_length, max_seq_items or 42)
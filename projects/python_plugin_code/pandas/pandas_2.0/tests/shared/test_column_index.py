@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cms_rendner_sdfv.base.types import QuickFilter, QuickFilterOp
+from cms_rendner_sdfv.pandas.shared import column_index
+from cms_rendner_sdfv.pandas.shared.column_index import ColumnIndexes
+
+df = pd.DataFrame({
+    "f": [3.0, np.nan, 1.0, 2.0, 3.0, 0.5],
+    "i": [1, 2, 1, 3, 2, 1],
+    "s": ["b", "a", "c", "a", "d", "b"],
+    "d": pd.to_datetime(["2020-01-01", "2021-01-01", None, "2022-01-01", "2020-06-01", "2023-01-01"]),
+})
+
+QUICK_FILTERS = [
+    QuickFilter(0, QuickFilterOp.GT, 1.0),
+    QuickFilter(0, QuickFilterOp.GE, 1.0),
+    QuickFilter(0, QuickFilterOp.LT, 3.0),
+    QuickFilter(0, QuickFilterOp.LE, 3.0),
+    QuickFilter(0, QuickFilterOp.BETWEEN, [0.5, 2.0]),
+    QuickFilter(0, QuickFilterOp.EQ, 3.0),
+    QuickFilter(1, QuickFilterOp.EQ, 1),
+    QuickFilter(1, QuickFilterOp.IN, [3, 2, 3]),
+    QuickFilter(1, QuickFilterOp.GE, 1.5),
+    QuickFilter(1, QuickFilterOp.EQ, 9),
+    QuickFilter(2, QuickFilterOp.EQ, "a"),
+    QuickFilter(2, QuickFilterOp.GT, "a"),
+    QuickFilter(3, QuickFilterOp.GE, "2021-01-01"),
+    QuickFilter(3, QuickFilterOp.EQ, "2020-06-01"),
+]
+
+
+@pytest.mark.parametrize("quick_filter", QUICK_FILTERS)
+def test_indexed_positions_equal_scanned_positions(quick_filter: QuickFilter):
+    scanned = ColumnIndexes(df, max_bytes=0).find_positions(quick_filter.column, quick_filter)
+    indexes = ColumnIndexes(df, max_bytes=1024 * 1024)
+    indexed = indexes.find_positions(quick_filter.column, quick_filter)
+
+    assert list(indexed) == list(scanned)
+    assert indexes.nbytes > 0
+
+
+def _find_positions(indexes: ColumnIndexes, quick_filter: QuickFilter):
+    try:
+        return list(indexes.find_positions(quick_filter.column, quick_filter))
+    except Exception as e:
+        return type(e)
+
+
+ext_df = pd.DataFrame({
+    "ordered": pd.Categorical(
+        ["small", "medium", "large", "small", "medium"],
+        categories=["small", "medium", "large"],
+        ordered=True,
+    ),
+    "unordered": pd.Categorical(["b", "a", "c", "a", "b"]),
+    "nullable": pd.array([1, None, 3, 2, 1], dtype="Int64"),
+    "f": [3.0, np.nan, 1.0, 2.0, 0.5],
+    "string": pd.array(["b", None, "c", "a", "b"], dtype="string"),
+})
+
+
+@pytest.mark.parametrize("quick_filter", [
+    QuickFilter(0, QuickFilterOp.GT, "medium"),
+    QuickFilter(0, QuickFilterOp.LE, "medium"),
+    QuickFilter(0, QuickFilterOp.EQ, "small"),
+    QuickFilter(1, QuickFilterOp.GT, "a"),
+    QuickFilter(1, QuickFilterOp.IN, ["a", "c"]),
+    QuickFilter(2, QuickFilterOp.GT, 1),
+    QuickFilter(2, QuickFilterOp.EQ, 1),
+    QuickFilter(3, QuickFilterOp.LT, np.nan),
+    QuickFilter(3, QuickFilterOp.GE, np.nan),
+    QuickFilter(3, QuickFilterOp.BETWEEN, [np.nan, 2.0]),
+    QuickFilter(3, QuickFilterOp.EQ, np.nan),
+    QuickFilter(4, QuickFilterOp.GT, "a"),
+    QuickFilter(4, QuickFilterOp.IN, ["a", "b"]),
+])
+def test_indexed_positions_equal_scanned_positions_of_other_dtypes(quick_filter: QuickFilter):
+    scanned = _find_positions(ColumnIndexes(ext_df, max_bytes=0), quick_filter)
+    indexed = _find_positions(ColumnIndexes(ext_df, max_bytes=1024 * 1024), quick_filter)
+
+    assert indexed == scanned
+
+
+def test_indexes_are_evicted_if_they_exceed_the_budget():
+    frame = pd.DataFrame({"a": np.arange(100), "b": np.arange(100)})
+    indexes = ColumnIndexes(frame, max_bytes=2000)
+
+    indexes.find_positions(0, QuickFilter(0, QuickFilterOp.GT, 10))
+    a_bytes = indexes.nbytes
+    assert a_bytes > 0
+
+    indexes.find_positions(1, QuickFilter(1, QuickFilterOp.GT, 10))
+    assert indexes.nbytes == a_bytes
+
+    indexes.set_max_bytes(0)
+    assert indexes.nbytes == 0
+    assert list(indexes.find_positions(0, QuickFilter(0, QuickFilterOp.GT, 97))) == [98, 99]
+
+
+def test_indexes_exceeding_the_budget_are_built_only_once(monkeypatch):
+    builds = []
+
+    class CountingFactorizedValues(column_index._FactorizedValues):
+        def __init__(self, values):
+            builds.append(values)
+            super().__init__(values)
+
+    monkeypatch.setattr(column_index, "_FactorizedValues", CountingFactorizedValues)
+    frame = pd.DataFrame({"a": np.arange(100), "b": np.arange(100)})
+    # the sorted values of "b" fit into the budget, the factorized values of "a" (with 100 uniques) don't
+    indexes = ColumnIndexes(frame, max_bytes=1500)
+    indexes.find_positions(1, QuickFilter(1, QuickFilterOp.GT, 97))
+    b_bytes = indexes.nbytes
+    assert b_bytes > 0
+
+    for i in range(5):
+        assert list(indexes.find_positions(0, QuickFilter(0, QuickFilterOp.EQ, i))) == [i]
+    assert len(builds) == 1
+    # not evicted for an index which is dropped anyway
+    assert indexes.nbytes == b_bytes
+
+    indexes.set_max_bytes(1024 * 1024)
+    assert list(indexes.find_positions(0, QuickFilter(0, QuickFilterOp.EQ, 7))) == [7]
+    assert len(builds) == 2
+    assert indexes.nbytes > b_bytes
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from cms_rendner_sdfv.pandas.shared.formatted_labels_cache import FormattedLabelsCache
+
+
+class _CountingFormatter:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, value) -> str:
+        self.calls.append(value)
+        return f'<{value}>'
+
+
+def test_each_label_is_formatted_only_once():
+    cache = FormattedLabelsCache()
+    formatter = _CountingFormatter()
+    labels = pd.Index(['a', 'b', 'c'])
+
+    first = cache.format_codes('key', labels, np.array([0, 1, 0, 1]), formatter, lambda i: None)
+    second = cache.format_codes('key', labels, np.array([1, 0, 2]), formatter, lambda i: None)
+
+    assert first == ['<a>', '<b>', '<a>', '<b>']
+    assert second == ['<b>', '<a>', '<c>']
+    assert formatter.calls == ['a', 'b', 'c']
+
+
+def test_missing_values_are_formatted_from_boxed_value():
+    cache = FormattedLabelsCache()
+    formatter = _CountingFormatter()
+    labels = pd.Index(['a'])
+
+    actual = cache.format_codes('key', labels, np.array([-1, 0, -1]), formatter, lambda i: f'na@{i}')
+
+    assert actual == ['<na@0>', '<a>', '<na@0>']
+    assert formatter.calls == ['na@0', 'a']
+
+
+def test_changed_formatter_state_clears_cache():
+    cache = FormattedLabelsCache()
+    formatter = _CountingFormatter()
+    labels = pd.Index(['a'])
+
+    cache.sync_formatter_state(1)
+    cache.format_codes('key', labels, np.array([0]), formatter, lambda i: None)
+    cache.sync_formatter_state(1)
+    cache.format_codes('key', labels, np.array([0]), formatter, lambda i: None)
+    assert formatter.calls == ['a']
+
+    cache.sync_formatter_state(2)
+    cache.format_codes('key', labels, np.array([0]), formatter, lambda i: None)
+    assert formatter.calls == ['a', 'a']
+
+
+def test_replaced_labels_are_not_taken_from_cache():
+    cache = FormattedLabelsCache()
+    formatter = _CountingFormatter()
+
+    assert cache.format_codes('key', pd.Index(['a']), np.array([0]), formatter, lambda i: None) == ['<a>']
+    assert cache.format_codes('key', pd.Index(['b']), np.array([0]), formatter, lambda i: None) == ['<b>']
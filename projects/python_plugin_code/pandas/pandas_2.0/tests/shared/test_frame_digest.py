@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+from cms_rendner_sdfv.base.types import FrameChange
+from cms_rendner_sdfv.pandas.shared.frame_digest import create_frame_digest
+
+
+def _create_frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        "col_0": [4, 4, 4, 1, 4],
+        "col_1": [1.0, 4.5, 4.0, 1.0, 2.0],
+        "col_2": ["a", "b", "c", "d", "e"],
+    })
+
+
+def test_unmodified_frame_is_unchanged():
+    df = _create_frame()
+    assert create_frame_digest(df).compare(create_frame_digest(df)) == FrameChange.UNCHANGED
+
+
+def test_modified_value_is_detected():
+    df = _create_frame()
+    previous = create_frame_digest(df)
+    df.iloc[2, 1] = 42.0
+    assert create_frame_digest(df).compare(previous) == FrameChange.VALUES_CHANGED
+
+
+def test_changed_structure_is_detected():
+    df = _create_frame()
+    previous = create_frame_digest(df)
+    df["col_3"] = 1
+    assert create_frame_digest(df).compare(previous) == FrameChange.STRUCTURE_CHANGED
+
+
+def test_changed_dtype_is_detected():
+    df = _create_frame()
+    previous = create_frame_digest(df)
+    df["col_0"] = df["col_0"].astype(float)
+    assert create_frame_digest(df).compare(previous) == FrameChange.STRUCTURE_CHANGED
+
+
+def test_changed_index_is_detected():
+    df = _create_frame()
+    previous = create_frame_digest(df)
+    df.index = [5, 6, 7, 8, 9]
+    assert create_frame_digest(df).compare(previous) == FrameChange.STRUCTURE_CHANGED
+
+
+def test_different_frames_have_different_structure():
+    assert create_frame_digest(_create_frame()).compare(create_frame_digest(_create_frame())) == \
+           FrameChange.STRUCTURE_CHANGED
+
+
+def test_only_sampled_rows_are_hashed():
+    df = pd.DataFrame({"a": np.arange(1000)})
+    previous = create_frame_digest(df, max_sampled_cells=10)
+    # first and last row are always sampled
+    df.iloc[-1, 0] = -1
+    assert create_frame_digest(df, max_sampled_cells=10).compare(previous) == FrameChange.VALUES_CHANGED
+    previous = create_frame_digest(df, max_sampled_cells=10)
+    df.iloc[1, 0] = -1
+    assert create_frame_digest(df, max_sampled_cells=10).compare(previous) == FrameChange.UNCHANGED
+
+
+def test_unhashable_values():
+    df = pd.DataFrame({"a": [[1], [2]], "b": [{"x": 1}, {"x": 2}]})
+    previous = create_frame_digest(df)
+    assert create_frame_digest(df).compare(previous) == FrameChange.UNCHANGED
+    df.iloc[0, 0] = [3]
+    assert create_frame_digest(df).compare(previous) == FrameChange.VALUES_CHANGED
+
+
+def test_empty_frames():
+    for df in [pd.DataFrame(), pd.DataFrame(index=[1, 2]), pd.DataFrame(columns=["a"])]:
+        assert create_frame_digest(df).compare(create_frame_digest(df)) == FrameChange.UNCHANGED
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from cms_rendner_sdfv.base.types import Region
+from cms_rendner_sdfv.pandas.shared.visible_frame import VisibleFrame, create_compact_indexer
+
+df = pd.DataFrame(np.arange(30).reshape(6, 5), columns=list("abcde"))
+
+
+def test_contiguous_positions_are_compacted_to_range():
+    assert create_compact_indexer(np.array([2, 3, 4], dtype=np.intp)) == range(2, 5)
+    assert create_compact_indexer(np.array([], dtype=np.intp)) == range(0)
+
+
+def test_other_positions_are_compacted_to_int32():
+    indexer = create_compact_indexer(np.array([4, 0, 2], dtype=np.intp))
+    assert indexer.dtype == np.int32
+    assert list(indexer) == [4, 0, 2]
+
+
+def test_chunk_of_range_indexers_is_sliced():
+    vf = VisibleFrame(df, range(6), range(5))
+    chunk = vf.get_chunk(Region(1, 2, 3, 2))
+    assert chunk.row_indexer() == slice(1, 4, 1)
+    assert list(chunk.row_positions()) == [1, 2, 3]
+    assert chunk.to_frame().equals(df.iloc[1:4, 2:4])
+    assert chunk.cell_value_at(2, 1) == df.iloc[3, 3]
+    assert vf.get_column_indices(3, 5) == [3, 4]
+    assert vf.get_indexers_nbytes() == 0
+
+
+def test_chunk_of_array_indexers():
+    vf = VisibleFrame(df, np.array([5, 3, 1, 0], dtype=np.intp), np.array([4, 0], dtype=np.intp))
+    chunk = vf.get_chunk(Region(1, 0, 2, 2))
+    assert list(chunk.row_positions()) == [3, 1]
+    assert chunk.to_frame().equals(df.iloc[[3, 1], [4, 0]])
+    assert vf.get_column_indices(0, 2) == [4, 0]
+    assert vf.get_indexers_nbytes() == 6 * np.dtype(np.int32).itemsize
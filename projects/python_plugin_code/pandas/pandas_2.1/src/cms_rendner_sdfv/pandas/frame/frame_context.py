@@ -11,11 +11,21 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+from typing import Optional
+
+from pandas import DataFrame
+
 from cms_rendner_sdfv.base.table_source import AbstractTableFrameGenerator
 from cms_rendner_sdfv.pandas.frame.table_frame_generator import TableFrameGenerator
+from cms_rendner_sdfv.pandas.shared.formatted_labels_cache import FormattedLabelsCache
 from cms_rendner_sdfv.pandas.shared.pandas_table_source_context import PandasTableSourceContext
+from cms_rendner_sdfv.pandas.shared.types import FilterCriteria
 
 
 class FrameContext(PandasTableSourceContext):
+    def __init__(self, source_frame: DataFrame, filter_criteria: Optional[FilterCriteria] = None):
+        super().__init__(source_frame, filter_criteria)
+        self._labels_cache = FormattedLabelsCache()
+
     def get_table_frame_generator(self) -> AbstractTableFrameGenerator:
-        return TableFrameGenerator(self.visible_frame)
+        return TableFrameGenerator(self.visible_frame, self._labels_cache)
@@ -15,12 +15,13 @@ from typing import Any, Union
 
 from pandas import DataFrame
 
+from cms_rendner_sdfv.base.caller_namespace import CallerNamespace
 from cms_rendner_sdfv.base.table_source import AbstractTableSource, AbstractTableSourceFactory
 from cms_rendner_sdfv.base.types import CreateTableSourceConfig, CreateTableSourceFailure
 from cms_rendner_sdfv.pandas.frame.table_source import TableSource
 from cms_rendner_sdfv.pandas.frame.frame_context import FrameContext
 from cms_rendner_sdfv.pandas.shared.create_fingerprint import create_fingerprint
-from cms_rendner_sdfv.pandas.shared.types import FilterCriteria
+from cms_rendner_sdfv.pandas.shared.filter_engine import evaluate_filter_expr
 
 
 class TableSourceFactory(AbstractTableSourceFactory):
@@ -28,7 +29,7 @@ class TableSourceFactory(AbstractTableSourceFactory):
     def _create_internal(self,
                          data_source: Any,
                          config: CreateTableSourceConfig,
-                         caller_globals: dict,
+                         caller_namespace: CallerNamespace,
                          ) -> Union[AbstractTableSource, CreateTableSourceFailure]:
         ds_frame = None
         if isinstance(data_source, dict):
@@ -54,22 +55,25 @@ class TableSourceFactory(AbstractTableSourceFactory):
         if pre_fingerprint is not None and pre_fingerprint != cur_fingerprint:
             return CreateTableSourceFailure(error_kind="INVALID_FINGERPRINT", info=cur_fingerprint)
 
-        filter_frame = None
+        positional_filter = None
         filter_eval_expr = config.filter_eval_expr
         if filter_eval_expr is not None and filter_eval_expr != "":
-            try:
-                if config.filter_eval_expr_provide_frame:
-                    # add required data-frame to make it accessible for eval
-                    # "_df" is the synthetic identifier which should resolve to the data-frame
-                    caller_globals["_df"] = ds_frame
-                filter_frame = eval(filter_eval_expr, caller_globals)
-            except Exception as e:
-                return CreateTableSourceFailure(error_kind="FILTER_FRAME_EVAL_FAILED", info=repr(e))
-
-            if not isinstance(filter_frame, DataFrame):
-                return CreateTableSourceFailure(error_kind="FILTER_FRAME_OF_WRONG_TYPE", info=str(type(filter_frame)))
+            if config.filter_eval_expr_provide_frame:
+                # add required data-frame to make it accessible for eval
+                # "_df" is the synthetic identifier which should resolve to the data-frame
+                caller_namespace["_df"] = ds_frame
+            positional_filter = evaluate_filter_expr(
+                ds_frame,
+                cur_fingerprint,
+                filter_eval_expr,
+                caller_namespace,
+                data_source,
+                config.previous_filter_eval_expr,
+            )
+            if isinstance(positional_filter, CreateTableSourceFailure):
+                return positional_filter
 
         return TableSource(
-            FrameContext(ds_frame, FilterCriteria.from_frame(filter_frame)),
+            FrameContext(ds_frame, positional_filter),
             fingerprint=cur_fingerprint,
         )
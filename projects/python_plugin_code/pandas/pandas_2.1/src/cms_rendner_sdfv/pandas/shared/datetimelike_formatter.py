@@ -0,0 +1,138 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+from typing import Any, Optional
+
+import numpy as np
+from pandas.arrays import DatetimeArray, PeriodArray, TimedeltaArray
+
+_UNITS_PER_SECOND = {'s': 1, 'ms': 1_000, 'us': 1_000_000, 'ns': 1_000_000_000}
+_SECONDS_PER_DAY = 86_400
+_MIN_DATETIME = np.datetime64('0001-01-01T00:00:00', 's')
+_MAX_DATETIME = np.datetime64('9999-12-31T23:59:59', 's')
+
+
+def format_datetimelike_values(values: Any) -> Optional[list[str]]:
+    # Formats the values of a datetime64 (naive or tz-aware), timedelta64 or period array at once.
+    # The result is identical to the formatting of the boxed scalars (Timestamp, Timedelta, Period)
+    # via "pprint_thing". Returns None for unsupported arrays, in that case the values have to be
+    # formatted one by one.
+    if isinstance(values, DatetimeArray):
+        return _format_datetimes(values)
+    if isinstance(values, TimedeltaArray):
+        return _format_timedeltas(values)
+    if isinstance(values, PeriodArray):
+        return list(values._format_native_types(na_rep='NaT'))
+    return None
+
+
+def _get_units_per_second(values: np.ndarray) -> Optional[int]:
+    unit, count = np.datetime_data(values.dtype)
+    return _UNITS_PER_SECOND.get(unit, None) if count == 1 else None
+
+
+def _format_fractions(sub_second_ns: np.ndarray) -> list[str]:
+    # same as "Timestamp.isoformat" and "Timedelta.__str__":
+    # nanoseconds are only shown if there are any, otherwise microseconds are shown (also for milliseconds)
+    return [
+        '' if ns == 0 else (f'.{ns // 1000:06d}' if ns % 1000 == 0 else f'.{ns:09d}')
+        for ns in sub_second_ns.tolist()
+    ]
+
+
+def _format_datetimes(values: DatetimeArray) -> Optional[list[str]]:
+    # wall times of tz-aware values are the local times (without the UTC offset)
+    wall_times = values.to_numpy() if values.tz is None else values.tz_localize(None).to_numpy()
+    units_per_second = _get_units_per_second(wall_times)
+    if units_per_second is None:
+        return None
+
+    is_nat = np.isnat(wall_times)
+    seconds = wall_times.astype('datetime64[s]')
+    valid_seconds = seconds[~is_nat]
+    if len(valid_seconds) and (valid_seconds.min() < _MIN_DATETIME or valid_seconds.max() > _MAX_DATETIME):
+        # the years can't be represented by "datetime"
+        return None
+
+    # sub-second part of each value, "astype('datetime64[s]')" rounds towards negative infinity
+    sub_second = (wall_times.view('i8') - seconds.view('i8') * units_per_second) * (1_000_000_000 // units_per_second)
+    sub_second[is_nat] = 0
+    fractions = _format_fractions(sub_second)
+    date_times = np.datetime_as_string(seconds, unit='s').tolist()
+
+    suffixes = None
+    if values.tz is not None:
+        suffixes = _get_utc_offset_suffixes(values, wall_times, is_nat, date_times, fractions)
+        if suffixes is None:
+            return None
+
+    result = []
+    for i, (date_time, fraction) in enumerate(zip(date_times, fractions)):
+        if date_time == 'NaT':
+            result.append(date_time)
+            continue
+        formatted = f'{date_time[:10]} {date_time[11:]}{fraction}'
+        result.append(formatted if suffixes is None else formatted + suffixes[i])
+    return result
+
+
+def _get_utc_offset_suffixes(values: DatetimeArray,
+                             wall_times: np.ndarray,
+                             is_nat: np.ndarray,
+                             date_times: list[str],
+                             fractions: list[str],
+                             ) -> Optional[list[str]]:
+    # The text of a UTC offset (e.g. "+02:00") depends only on the offset itself. Therefore, only one boxed
+    # value per distinct offset has to be formatted to get the suffix for all values with the same offset.
+    offsets = wall_times.view('i8') - values.asi8
+    offsets[is_nat] = 0
+    distinct_offsets, inverse = np.unique(offsets, return_inverse=True)
+    suffix_per_offset = []
+    for offset in distinct_offsets:
+        positions = np.flatnonzero((offsets == offset) & ~is_nat)
+        if len(positions) == 0:
+            suffix_per_offset.append('')
+            continue
+        pos = int(positions[0])
+        date_time = date_times[pos]
+        prefix = f'{date_time[:10]} {date_time[11:]}{fractions[pos]}'
+        boxed = str(values[pos])
+        if not boxed.startswith(prefix):
+            return None
+        suffix_per_offset.append(boxed[len(prefix):])
+    return [suffix_per_offset[i] for i in inverse.tolist()]
+
+
+def _format_timedeltas(values: TimedeltaArray) -> Optional[list[str]]:
+    durations = values.to_numpy()
+    units_per_second = _get_units_per_second(durations)
+    if units_per_second is None:
+        return None
+
+    is_nat = np.isnat(durations)
+    i8 = durations.view('i8')
+    # days are rounded towards negative infinity, the remaining time of the day is always positive
+    days, remaining = np.divmod(i8, _SECONDS_PER_DAY * units_per_second)
+    seconds_of_day, sub_second = np.divmod(remaining, units_per_second)
+    sub_second *= 1_000_000_000 // units_per_second
+    sub_second[is_nat] = 0
+    fractions = _format_fractions(sub_second)
+
+    result = []
+    for d, s, fraction, nat in zip(days.tolist(), seconds_of_day.tolist(), fractions, is_nat.tolist()):
+        if nat:
+            result.append('NaT')
+            continue
+        sign = ' +' if d < 0 else ' '
+        result.append(f'{d} days{sign}{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}{fraction}')
+    return result
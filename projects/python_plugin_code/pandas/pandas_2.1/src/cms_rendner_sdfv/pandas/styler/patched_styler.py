@@ -19,6 +19,7 @@ from cms_rendner_sdfv.pandas.styler.patched_styler_context import PatchedStylerC
 from cms_rendner_sdfv.pandas.styler.style_function_name_resolver import StyleFunctionNameResolver
 from cms_rendner_sdfv.pandas.styler.style_functions_validator import StyleFunctionValidationProblem, \
     StyleFunctionsValidator, ValidationStrategyType
+from cms_rendner_sdfv.pandas.styler.table_frame_generator import TableFrameGenerator
 from cms_rendner_sdfv.pandas.styler.todos_patcher import TodosPatcher
 from cms_rendner_sdfv.pandas.styler.types import StyleFunctionInfo
 
@@ -27,6 +28,27 @@ class PatchedStyler(AbstractTableSource):
     def __init__(self, context: PatchedStylerContext, fingerprint: str):
         super().__init__(TableSourceKind.PATCHED_STYLER, context, fingerprint)
 
+    def set_deferred_styling(self, enabled: bool):
+        # If enabled, "compute_chunk_table_frame" returns only the formatted values, without running the
+        # styler todos. The css of a chunk is fetched afterwards via "compute_chunk_styles".
+        self._cancel_prefetch()
+        with self._lock:
+            self._partial_chunk = None
+            self._context.set_deferred_styling(enabled)
+
+    def compute_chunk_styles(self,
+                             first_row: int,
+                             first_col: int,
+                             rows: int,
+                             cols: int,
+                             ) -> list[list[Optional[dict[str, str]]]]:
+        # Returns the css of the cells of the chunk, row by row (None for cells without css).
+        perf_stats = self._context.perf_stats
+        with self._lock, perf_stats.measure("compute_chunk_styles"):
+            generator = TableFrameGenerator(self._context)
+            generator.set_perf_stats(perf_stats)
+            return generator.generate_styles(Region(first_row, first_col, rows, cols))
+
     def validate_style_functions(self,
                                  first_row: int,
                                  first_col: int,
@@ -35,14 +57,9 @@ class PatchedStyler(AbstractTableSource):
                                  strategy: Union[ValidationStrategyType, str, None] = None,
                                  ) -> list[StyleFunctionValidationProblem]:
         validation_strategy = ValidationStrategyType[strategy] if isinstance(strategy, str) else strategy
-        return StyleFunctionsValidator(self._context, validation_strategy)\
-            .validate(Region(first_row, first_col, rows, cols))
-
-    def set_sort_criteria(self,
-                          by_column_index: Optional[list[int]] = None,
-                          ascending: Optional[list[bool]] = None,
-                          ):
-        self._context.set_sort_criteria(by_column_index, ascending)
+        with self._lock:
+            return StyleFunctionsValidator(self._context, validation_strategy)\
+                .validate(Region(first_row, first_col, rows, cols))
 
     def get_style_function_info(self) -> list[StyleFunctionInfo]:
         result = []
@@ -1,8 +1,11 @@
+import json
+
 import pandas as pd
 import numpy as np
 import pytest
 from pandas import MultiIndex, DataFrame
 
+from cms_rendner_sdfv.base.types import Region
 from cms_rendner_sdfv.pandas.styler.patched_styler import PatchedStyler
 from cms_rendner_sdfv.pandas.styler.patched_styler_context import PatchedStylerContext, FilterCriteria
 from cms_rendner_sdfv.pandas.styler.types import StyleFunctionInfo
@@ -158,3 +161,96 @@ def test_get_org_indices_of_visible_columns():
     num_cols = 3
     actual = ps.get_org_indices_of_visible_columns(0, num_cols)
     assert actual == list(range(0, num_cols))
+
+
+def test_compute_chunk_table_frame_with_cell_max_str_len():
+    text_df = DataFrame({"a": ["a" * 300, "b"], "b": ["c" * 300, "d"]})
+    ps = PatchedStyler(PatchedStylerContext(text_df.style), "")
+
+    default = ps.compute_chunk_table_frame(0, 0, 2, 2)
+    assert [len(c.value) for c in default.cells[0]] == [200, 200]
+
+    short = ps.compute_chunk_table_frame(0, 0, 2, 2, cell_max_str_len=10, cell_max_str_len_per_column={1: 5})
+    assert [[c.value for c in row] for row in short.cells] == [["a" * 9 + "…", "cccc…"], ["b", "d"]]
+
+
+def test_get_cell_value():
+    text_df = DataFrame({"a": ["a" * 300, "b"]})
+    ps = PatchedStyler(PatchedStylerContext(text_df.style.format(lambda x: x.upper())), "")
+
+    assert ps.get_cell_value(0, 0) == "A" * 300
+    assert ps.get_cell_value(1, 0, 5) == "B"
+
+
+def test_get_perf_stats():
+    styler = df.style.bar().highlight_max().apply(lambda s: [""] * len(s))
+    ps = PatchedStyler(PatchedStylerContext(styler), "")
+    ps.jsonify(ps.compute_chunk_table_frame(0, 0, 2, 2))
+
+    stats = json.loads(ps.get_perf_stats())
+    # "bar" is not supported and therefore not executed
+    assert "styler_todo.0" not in stats
+    for stage in [
+        "compute_chunk_table_frame",
+        "styler_todo.1",
+        "styler_todo.2",
+        "styler_compute",
+        "styler_translate",
+        "format_cells",
+        "jsonify",
+    ]:
+        assert stats[stage]["calls"] == 1
+        assert stats[stage]["wall_total"] >= 0
+
+    ps.reset_perf_stats()
+    assert ps.get_perf_stats() == "{}"
+
+
+def test_compute_chunk_table_frame_with_time_budget():
+    large_df = DataFrame(np.arange(200).reshape(100, 2))
+    ps = PatchedStyler(PatchedStylerContext(large_df.style.highlight_max(axis=0).background_gradient()), "")
+    expected = ps.compute_chunk_table_frame(0, 0, 100, 2)
+
+    # a budget of 0 computes only the first step
+    partial = ps.compute_chunk_table_frame(0, 0, 100, 2, time_budget=0)
+    assert partial.remaining_region == Region(8, 0, 92, 2)
+    assert partial.cells == expected.cells[:8]
+
+    resumed = ps.compute_chunk_table_frame(0, 0, 100, 2, time_budget=0)
+    assert resumed.remaining_region == Region(16, 0, 84, 2)
+
+    assert ps.compute_chunk_table_frame(0, 0, 100, 2, time_budget=60) == expected
+
+
+def test_compute_chunk_table_frame_with_deferred_styling():
+    styler = df.style.highlight_max(axis=0).format("{:.1f}")
+    ps = PatchedStyler(PatchedStylerContext(styler), "")
+    expected = ps.compute_chunk_table_frame(0, 0, 6, 6)
+
+    ps.set_deferred_styling(True)
+    values = ps.compute_chunk_table_frame(0, 0, 6, 6)
+    assert values.columns == expected.columns
+    assert values.index_labels == expected.index_labels
+    assert [[c.value for c in row] for row in values.cells] == [[c.value for c in row] for row in expected.cells]
+    assert all(c.css is None for row in values.cells for c in row)
+
+    styles = ps.compute_chunk_styles(0, 0, 6, 6)
+    assert styles == [[c.css for c in row] for row in expected.cells]
+    assert ps.compute_chunk_styles(2, 1, 3, 2) == [row[1:3] for row in styles[2:5]]
+
+
+def test_compute_chunk_table_frame_with_prefetched_chunks():
+    large_df = DataFrame(np.arange(200).reshape(100, 2))
+    styler = large_df.style.highlight_max(axis=0).background_gradient()
+    ps = PatchedStyler(PatchedStylerContext(styler), "")
+    expected_ps = PatchedStyler(PatchedStylerContext(styler), "")
+
+    ps.set_viewport(0, 0, 10, 2, "down", prefetch_depth=4)
+    ps._prefetcher.join()
+
+    exclude_headers = [(False, False), (True, False), (False, True), (True, True)]
+    for i, (exclude_row_header, exclude_col_header) in enumerate(exclude_headers):
+        args = (10 * (i + 1), 0, 10, 2, exclude_row_header, exclude_col_header)
+        assert ps.compute_chunk_table_frame(*args) == expected_ps.compute_chunk_table_frame(*args)
+    # all chunks were prefetched
+    assert "compute_chunk_table_frame" not in json.loads(ps.get_perf_stats())
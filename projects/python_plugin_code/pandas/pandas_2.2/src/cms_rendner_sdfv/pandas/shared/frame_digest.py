@@ -0,0 +1,107 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+from hashlib import blake2b
+from typing import Any, Iterator, Union
+
+import numpy as np
+from pandas import DataFrame, Index, factorize
+from pandas.util import hash_array, hash_pandas_object
+
+from cms_rendner_sdfv.base.types import FrameDigest
+
+# number of cells (rows * columns) hashed to detect modified values
+DEFAULT_MAX_SAMPLED_CELLS = 100_000
+
+
+def create_frame_digest(frame: DataFrame,
+                        org_data_source: Any = None,
+                        max_sampled_cells: int = DEFAULT_MAX_SAMPLED_CELLS,
+                        ) -> FrameDigest:
+    # A cheap digest to detect if a frame was modified (for example between two debugger steps).
+    #
+    # The structure part covers the identity, shape, labels and dtypes of the frame. The values part covers the
+    # addresses and shapes of the buffers of the internal blocks and the hashes of a strided sample of rows.
+    # Replaced columns are detected by their buffer addresses, in-place modifications only if a sampled row
+    # is affected. A consolidation of the blocks changes the addresses without changing the values, which
+    # is reported as modification - a false positive is safe, a stale cache is not.
+    positions = _get_sample_positions(len(frame.index), len(frame.columns), max_sampled_cells)
+
+    # factorized, the string representation of the dtypes is slow for wide frames
+    dtype_codes, unique_dtypes = factorize(frame.dtypes.values)
+    structure = blake2b(digest_size=16)
+    structure.update(repr((
+        id(org_data_source if org_data_source is not None else frame),
+        frame.shape,
+        type(frame.index).__name__,
+        [str(d) for d in unique_dtypes],
+    )).encode())
+    structure.update(dtype_codes.tobytes())
+    structure.update(_hash_labels(frame.columns))
+    structure.update(_hash_labels(frame.index[positions]))
+
+    values = blake2b(digest_size=16)
+    values.update(repr(_get_block_buffers(frame)).encode())
+    for hashes in _hash_sample(frame.iloc[positions]):
+        values.update(hashes)
+
+    return FrameDigest(structure=structure.hexdigest(), values=values.hexdigest())
+
+
+def _get_sample_positions(rows: int, cols: int, max_sampled_cells: int) -> np.ndarray:
+    # evenly distributed rows, always including the first and last row
+    sample_size = min(rows, max(1, max_sampled_cells // max(cols, 1)))
+    if sample_size >= rows:
+        return np.arange(rows)
+    return np.unique(np.linspace(0, rows - 1, sample_size).astype(np.intp))
+
+
+def _hash_labels(labels: Index) -> bytes:
+    try:
+        return hash_pandas_object(labels).values.tobytes()
+    except TypeError:
+        return repr(labels.tolist()).encode()
+
+
+def _hash_sample(sample: DataFrame) -> Iterator[bytes]:
+    # Hashing the (2D) blocks is much faster than hashing column by column, as done by "hash_pandas_object"
+    # for frames, if a frame has many columns. The blocks are internal API, fall back to the columns if
+    # they are not accessible.
+    try:
+        arrays = [b.values.ravel() if b.values.ndim > 1 else b.values for b in sample._mgr.blocks]
+    except AttributeError:
+        arrays = [sample.iloc[:, i].array for i in range(len(sample.columns))]
+    for values in arrays:
+        try:
+            yield hash_array(values).tobytes()
+        except TypeError:
+            # unhashable values (lists, dicts, ...)
+            yield repr(list(values)).encode()
+
+
+def _get_buffer_address(values: Any) -> Union[int, None]:
+    # extension arrays store their data in an ndarray attribute
+    for candidate in (values, getattr(values, "_ndarray", None), getattr(values, "_data", None),
+                      getattr(values, "codes", None)):
+        if isinstance(candidate, np.ndarray):
+            return candidate.__array_interface__["data"][0]
+    return None
+
+
+def _get_block_buffers(frame: DataFrame) -> list:
+    # The blocks are internal API, no buffers are included if they are not accessible.
+    try:
+        blocks = frame._mgr.blocks
+    except AttributeError:
+        return []
+    return [(_get_buffer_address(b.values), b.shape) for b in blocks]
@@ -0,0 +1,59 @@
+import ast
+
+import pandas as pd
+import pytest
+
+from cms_rendner_sdfv.pandas.shared.filter_refinement import is_row_local_predicate, parse_filter_expr, \
+    split_refinement
+
+df = pd.DataFrame({
+    "a": [4, 1, 3],
+    "s": ["x", "yz", "abc"],
+    "d": pd.to_datetime(["2020-01-01", "2021-01-01", "2022-01-01"]),
+})
+
+
+def test_parse_filter_expr_combines_previous_expression():
+    expected = parse_filter_expr("(_df.a < 4) & (_df.a > 1)")
+    assert ast.dump(parse_filter_expr("_df.a > 1", "_df.a < 4")) == ast.dump(expected)
+
+
+def test_split_refinement():
+    previous, predicate = split_refinement(parse_filter_expr("(_df.a < 4) & (_df.a > 1)"))
+    assert ast.dump(previous) == ast.dump(parse_filter_expr("_df.a < 4"))
+    assert ast.dump(predicate) == ast.dump(parse_filter_expr("_df.a > 1"))
+
+    assert split_refinement(parse_filter_expr("(_df.a < 4) | (_df.a > 1)")) is None
+
+
+@pytest.mark.parametrize("predicate", [
+    "_df.a > 1",
+    "_df['a'] * 2 <= limit",
+    "~_df.a.isin([1, 2])",
+    "_df.a.isin(values)",
+    "_df.a.between(1, limit)",
+    "_df.s.str.contains('y')",
+    "_df.s.str.len() > 1",
+    "_df.d.dt.year == 2021",
+    "(_df.a > 1) | _df.a.isna()",
+])
+def test_row_local_predicates(predicate: str):
+    values = {"_df": df, "limit": 3, "values": [1, 2]}
+    assert is_row_local_predicate(parse_filter_expr(predicate), df, values)
+
+
+@pytest.mark.parametrize("predicate", [
+    "_df.a > _df.a.mean()",
+    "_df.a > other",
+    "_df.a.isin(other)",
+    "_df.a.shift(1) > 1",
+    "_df.shape[0] > 1",
+    "_df.unknown > 1",
+    "_df",
+    "1 < _df.a < 3",
+    "_df.a > unknown",
+    "(_df.a @ _df.a) > 1",
+])
+def test_not_row_local_predicates(predicate: str):
+    values = {"_df": df, "other": pd.Series([1, 2, 3])}
+    assert not is_row_local_predicate(parse_filter_expr(predicate), df, values)
@@ -0,0 +1,161 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import math
+from collections import OrderedDict
+from typing import Any, Optional, Set
+
+import polars as pl
+from polars import DataFrame
+
+from cms_rendner_sdfv.base.types import QuickFilter, QuickFilterOp
+
+# Quick filters select the rows of a single column by a range or by equality. Evaluating them requires a scan of
+# the whole column. Users often filter the same columns repeatedly with different values, the ColumnIndexes answer
+# these queries in O(log n + k) for k matching rows by a binary search in the sorted values of a column. Equal
+# values are adjacent in the sorted values, which therefore also map the values to the positions of their rows.
+#
+# The indexes are built on first use and are dropped, least recently used first, if they exceed the memory budget.
+# An index which exceeds the budget on its own isn't kept at all and the column is scanned.
+# Columns which can't be indexed (e.g. of type "Object" or "List") are scanned as before.
+
+
+class _SortedValues:
+    def __init__(self, series: pl.Series):
+        valid = len(series) - series.null_count()
+        # nulls are sorted to the end and excluded, they don't match any quick filter
+        self.order = series.arg_sort(nulls_last=True)
+        self.sorted_values = series.gather(self.order.head(valid))
+
+    @property
+    def nbytes(self) -> int:
+        return self.order.estimated_size() + self.sorted_values.estimated_size()
+
+    def find(self, op: QuickFilterOp, value: Any) -> pl.Series:
+        if op == QuickFilterOp.EQ or op == QuickFilterOp.IN:
+            values = [value] if op == QuickFilterOp.EQ else list(value)
+            ranges = [(self._search(v, "left"), self._search(v, "right")) for v in values]
+        elif op == QuickFilterOp.BETWEEN:
+            ranges = [(self._search(value[0], "left"), self._search(value[1], "right"))]
+        elif op == QuickFilterOp.GT:
+            ranges = [(self._search(value, "right"), len(self.sorted_values))]
+        elif op == QuickFilterOp.GE:
+            ranges = [(self._search(value, "left"), len(self.sorted_values))]
+        elif op == QuickFilterOp.LT:
+            ranges = [(0, self._search(value, "left"))]
+        else:
+            ranges = [(0, self._search(value, "right"))]
+        return pl.concat([self.order.slice(s, max(0, e - s)) for s, e in ranges]).unique().sort()
+
+    def _search(self, value: Any, side: str) -> int:
+        return self.sorted_values.search_sorted(_to_lookup_series(value, self.sorted_values.dtype), side=side)[0]
+
+
+def _to_lookup_series(value: Any, dtype: pl.PolarsDataType) -> pl.Series:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        raise TypeError("Missing values can't be looked up.")
+    s = pl.Series([value])
+    if s.dtype != dtype:
+        # only lossless conversions, "x >= 2.5" can't be looked up as "x >= 2" in an integer column
+        converted = s.cast(dtype)
+        if not converted.cast(s.dtype).equals(s):
+            raise TypeError(f"Value {value} can't be converted to {dtype}.")
+        s = converted
+    return s
+
+
+def _is_indexable(series: pl.Series) -> bool:
+    dtype = series.dtype
+    return dtype.is_numeric() or dtype.is_temporal() or dtype == pl.Utf8 or dtype == pl.Boolean
+
+
+class ColumnIndexes:
+    def __init__(self, source_frame: DataFrame, max_bytes: int = 0):
+        self._source_frame = source_frame
+        self._max_bytes = max_bytes
+        # position of column -> index or None if the index exceeds the budget
+        self._indexes: OrderedDict = OrderedDict()
+        # positions of the columns which can't be indexed because their indexes exceed the budget
+        self._too_large: Set[int] = set()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(0 if i is None else i.nbytes for i in self._indexes.values())
+
+    def set_max_bytes(self, max_bytes: int):
+        if max_bytes > self._max_bytes:
+            # retry the columns whose indexes didn't fit into the previous budget
+            for col in self._too_large:
+                self._indexes.pop(col, None)
+            self._too_large.clear()
+        self._max_bytes = max_bytes
+        self._evict(max_bytes)
+
+    def clear(self):
+        self._indexes.clear()
+        self._too_large.clear()
+
+    def find_positions(self, col: int, quick_filter: QuickFilter) -> pl.Series:
+        # Returns the sorted positions of the rows matching the quick filter.
+        series = self._source_frame.to_series(col)
+        index = self._get_index(col, series)
+        if index is not None:
+            try:
+                return index.find(quick_filter.op, quick_filter.value)
+            except (TypeError, pl.ComputeError, pl.InvalidOperationError):
+                # not comparable, the scan reports the error of polars
+                pass
+        return _scan(series, quick_filter.op, quick_filter.value).arg_true()
+
+    def _get_index(self, col: int, series: pl.Series) -> Optional[_SortedValues]:
+        if col in self._indexes:
+            self._indexes.move_to_end(col)
+            return self._indexes[col]
+        if not _is_indexable(series):
+            return None
+        index = None
+        # every index stores the positions of all rows, no need to build one if these don't fit
+        if 4 * len(series) <= self._max_bytes:
+            index = _SortedValues(series)
+        if index is not None and index.nbytes > self._max_bytes:
+            # remembered as not indexable, otherwise the index would be rebuilt by every query
+            self._too_large.add(col)
+            index = None
+        if index is not None:
+            self._evict(self._max_bytes - index.nbytes)
+        self._indexes[col] = index
+        return index
+
+    def _evict(self, max_bytes: int):
+        nbytes = self.nbytes
+        # only the built indexes, the columns which can't be indexed are kept
+        for col in [c for c, i in self._indexes.items() if i is not None]:
+            if nbytes <= max_bytes:
+                break
+            nbytes -= self._indexes.pop(col).nbytes
+
+
+def _scan(series: pl.Series, op: QuickFilterOp, value: Any) -> pl.Series:
+    if op == QuickFilterOp.EQ:
+        return series.is_in([value])
+    if op == QuickFilterOp.IN:
+        return series.is_in(list(value))
+    if op == QuickFilterOp.BETWEEN:
+        return (series >= value[0]) & (series <= value[1])
+    if op == QuickFilterOp.GT:
+        return series > value
+    if op == QuickFilterOp.GE:
+        return series >= value
+    if op == QuickFilterOp.LT:
+        return series < value
+    return series <= value
@@ -0,0 +1,45 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+from typing import Any, Dict, Hashable
+
+import polars as pl
+
+
+class FormattedLabelsCache:
+    # Caches the formatted values of categorical columns ("pl.Categorical" and "pl.Enum").
+    # A column with millions of rows can have only a handful of categories, each category is formatted
+    # at most once and the values of a chunk are resolved by looking up their physical codes.
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Dict[Any, str]] = {}
+        self._formatter_state: Any = None
+
+    def sync_formatter_state(self, state: Any):
+        # The formatted labels depend on the configured format options.
+        # In case the options were changed, all cached labels have to be discarded.
+        if state != self._formatter_state:
+            self._formatter_state = state
+            self._entries.clear()
+
+    def get_labels(self, key: Hashable) -> Dict[Any, str]:
+        # returns a mutable dict which maps a physical code to its formatted label
+        labels = self._entries.get(key, None)
+        if labels is None:
+            labels = self._entries[key] = {}
+        return labels
+
+    @staticmethod
+    def is_categorical(series: pl.Series) -> bool:
+        enum_type = getattr(pl, 'Enum', None)
+        return isinstance(series.dtype, pl.Categorical) or (enum_type is not None and isinstance(series.dtype, enum_type))
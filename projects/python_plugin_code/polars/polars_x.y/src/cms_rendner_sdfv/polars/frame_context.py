@@ -16,14 +16,21 @@ from typing import List, Optional
 from polars import DataFrame
 
 from cms_rendner_sdfv.base.table_source import AbstractTableFrameGenerator, AbstractTableSourceContext
-from cms_rendner_sdfv.base.types import SortCriteria, TableStructure
+from cms_rendner_sdfv.base.types import FrameDigest, QuickFilter, SortCriteria, TableStructure
+from cms_rendner_sdfv.polars.column_index import ColumnIndexes
+from cms_rendner_sdfv.polars.frame_digest import create_frame_digest
+from cms_rendner_sdfv.polars.formatted_labels_cache import FormattedLabelsCache
 from cms_rendner_sdfv.polars.visible_frame import VisibleFrame
 
 
 class FrameContext(AbstractTableSourceContext):
     def __init__(self, source_frame: DataFrame):
+        super().__init__()
         self._source_frame = source_frame
         self._sort_criteria: SortCriteria = SortCriteria()
+        self._quick_filters: List[QuickFilter] = []
+        self._column_indexes: ColumnIndexes = ColumnIndexes(source_frame)
+        self._labels_cache: FormattedLabelsCache = FormattedLabelsCache()
         self._visible_frame: VisibleFrame = self._recompute_visible_frame()
 
     @property
@@ -36,6 +43,17 @@ class FrameContext(AbstractTableSourceContext):
             self._sort_criteria = new_sort_criteria
             self._visible_frame = self._recompute_visible_frame()
 
+    def set_quick_filters(self, quick_filters: List[QuickFilter]):
+        if quick_filters != self._quick_filters:
+            self._quick_filters = list(quick_filters)
+            self._visible_frame = self._recompute_visible_frame()
+
+    def set_column_index_budget(self, max_bytes: int):
+        self._column_indexes.set_max_bytes(max_bytes)
+
+    def clear_caches(self):
+        self._column_indexes.clear()
+
     def get_table_structure(self, fingerprint: str) -> TableStructure:
         rows_count, columns_count = self._visible_frame.region.frame_shape
         org_rows_count, org_cols_count = self._source_frame.shape
@@ -49,13 +67,25 @@ class FrameContext(AbstractTableSourceContext):
             fingerprint=fingerprint,
         )
 
+    def get_memory_usage(self) -> int:
+        return self._visible_frame.get_memory_usage() + self._column_indexes.nbytes
+
+    def create_frame_digest(self) -> FrameDigest:
+        return create_frame_digest(self._source_frame)
+
     def get_table_frame_generator(self) -> AbstractTableFrameGenerator:
         # local import to resolve cyclic import
         from cms_rendner_sdfv.polars.table_frame_generator import TableFrameGenerator
-        return TableFrameGenerator(self._visible_frame)
+        return TableFrameGenerator(self._visible_frame, self._labels_cache)
 
     def _recompute_visible_frame(self) -> VisibleFrame:
         row_idx = None
+        if self._quick_filters:
+            with self._perf_stats.measure("quick_filter"):
+                for qf in self._quick_filters:
+                    positions = self._column_indexes.find_positions(qf.column, qf)
+                    row_idx = positions if row_idx is None else row_idx.filter(row_idx.is_in(positions))
+
         if not self._sort_criteria.is_empty():
             # get col names before we insert "with_row_count" col
             # otherwise we would have to translate all col idx by one
@@ -69,10 +99,13 @@ class FrameContext(AbstractTableSourceContext):
                 frame_with_index = self._source_frame.with_row_index(row_idx_col_name)
             else:
                 frame_with_index = self._source_frame.with_row_count(row_idx_col_name)
+            if row_idx is not None:
+                frame_with_index = frame_with_index[row_idx]
 
             by_names = [col_names[i] for i in self._sort_criteria.by_column]
-            row_idx = frame_with_index \
-                .sort(by_names, descending=[not asc for asc in self._sort_criteria.ascending]) \
-                .get_column(row_idx_col_name)
+            with self._perf_stats.measure("sort"):
+                row_idx = frame_with_index \
+                    .sort(by_names, descending=[not asc for asc in self._sort_criteria.ascending]) \
+                    .get_column(row_idx_col_name)
 
         return VisibleFrame(self._source_frame, row_idx)
@@ -0,0 +1,76 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+from array import array
+from hashlib import blake2b
+from typing import Any, List, Union
+
+import polars as pl
+from polars import DataFrame
+
+from cms_rendner_sdfv.base.types import FrameDigest
+
+# number of cells (rows * columns) hashed to detect modified values
+DEFAULT_MAX_SAMPLED_CELLS = 100_000
+
+
+def create_frame_digest(frame: DataFrame,
+                        org_data_source: Any = None,
+                        max_sampled_cells: int = DEFAULT_MAX_SAMPLED_CELLS,
+                        ) -> FrameDigest:
+    # A cheap digest to detect if a frame was modified (for example between two debugger steps).
+    #
+    # The structure part covers the identity, shape, column names and dtypes of the frame. The values part
+    # covers the addresses of the buffers of the columns and the hashes of a strided sample of rows.
+    # Replaced columns are detected by their buffer addresses, in-place modifications only if a sampled row
+    # is affected.
+    structure = blake2b(digest_size=16)
+    structure.update(repr((
+        id(org_data_source if org_data_source is not None else frame),
+        frame.shape,
+        frame.columns,
+        [str(d) for d in frame.dtypes],
+    )).encode())
+
+    values = blake2b(digest_size=16)
+    values.update(repr([(_get_buffer_address(s), s.n_chunks()) for s in frame.get_columns()]).encode())
+    positions = _get_sample_positions(frame.height, frame.width, max_sampled_cells)
+    if positions:
+        sample = frame[positions]
+        # "hash_rows" doesn't support columns of type "Object" (panics)
+        object_columns = [n for n, d in zip(sample.columns, sample.dtypes) if d == pl.Object]
+        hashable = sample.drop(object_columns)
+        if hashable.width > 0:
+            values.update(array("Q", hashable.hash_rows(seed=0).to_list()).tobytes())
+        for name in object_columns:
+            values.update(repr(sample.get_column(name).to_list()).encode())
+
+    return FrameDigest(structure=structure.hexdigest(), values=values.hexdigest())
+
+
+def _get_sample_positions(rows: int, cols: int, max_sampled_cells: int) -> List[int]:
+    # evenly distributed rows, always including the first and last row
+    sample_size = min(rows, max(1, max_sampled_cells // max(cols, 1)))
+    if sample_size >= rows:
+        return list(range(rows))
+    if sample_size == 1:
+        return [0]
+    return [i * (rows - 1) // (sample_size - 1) for i in range(sample_size)]
+
+
+def _get_buffer_address(series: pl.Series) -> Union[int, None]:
+    # only available for numeric types consisting of a single chunk
+    try:
+        return series._get_buffer_info()[0]
+    except Exception:
+        return None
@@ -12,19 +12,22 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 import os
-from typing import List
+from typing import Any, List, Optional
 
 import polars as pl
 
 from cms_rendner_sdfv.base.constants import CELL_MAX_STR_LEN
+from cms_rendner_sdfv.base.helpers import truncate_str
 from cms_rendner_sdfv.base.table_source import AbstractTableFrameGenerator
 from cms_rendner_sdfv.base.types import Region, TableFrame, TableFrameCell, TableFrameColumn
+from cms_rendner_sdfv.polars.formatted_labels_cache import FormattedLabelsCache
 from cms_rendner_sdfv.polars.visible_frame import VisibleFrame, Chunk
 
 
 class TableFrameGenerator(AbstractTableFrameGenerator):
-    def __init__(self, visible_frame: VisibleFrame):
+    def __init__(self, visible_frame: VisibleFrame, labels_cache: Optional[FormattedLabelsCache] = None):
         super().__init__(visible_frame)
+        self._labels_cache: FormattedLabelsCache = FormattedLabelsCache() if labels_cache is None else labels_cache
 
     def generate(self,
                  region: Region = None,
@@ -33,8 +36,10 @@ class TableFrameGenerator(AbstractTableFrameGenerator):
                  ) -> TableFrame:
         chunk = self._visible_frame.get_chunk(region)
 
-        columns = [] if exclude_col_header else self._extract_columns(chunk)
-        cells = self._extract_cells(chunk)
+        with self._perf_stats.measure("format_columns"):
+            columns = [] if exclude_col_header else self._extract_columns(chunk)
+        with self._perf_stats.measure("format_cells"):
+            cells = self._extract_cells(chunk)
 
         return TableFrame(
             index_labels=None,
@@ -58,21 +63,36 @@ class TableFrameGenerator(AbstractTableFrameGenerator):
 
         return result
 
-    @staticmethod
-    def _extract_cells(chunk: Chunk) -> List[List[TableFrameCell]]:
+    def _extract_cells(self, chunk: Chunk) -> List[List[TableFrameCell]]:
         result: List[List[TableFrameCell]] = []
 
         if chunk.region.is_empty():
             return result
 
         str_lengths = int(os.environ.get("POLARS_FMT_STR_LEN", str(CELL_MAX_STR_LEN)))
+        self._labels_cache.sync_formatter_state(str_lengths)
 
         for col_offset in range(chunk.region.cols):
             series = chunk.series_at(col_offset)
+            # A requested length is a hard limit (like "truncate_str"). Polars appends the "…" to the truncated
+            # value, the result of "get_fmt" can therefore be one char longer.
+            requested_length = self._get_cell_max_str_len(chunk.region.first_col + col_offset, None)
+            max_length = str_lengths if requested_length is None else requested_length
             is_string = isinstance(series.dtype, pl.Utf8)
+            # values of a categorical column are formatted once per category and looked up by their code
+            codes = series.to_physical() if FormattedLabelsCache.is_categorical(series) else None
+            labels = None if codes is None else self._labels_cache.get_labels((series.name, max_length))
+            nested_values = self._get_nested_values(series, chunk, max_length)
             should_create_row = not result
             for ri, sri in enumerate(chunk.row_idx_iter()):
-                if is_string:
+                if nested_values is not None:
+                    v = truncate_str(nested_values._s.get_fmt(ri, max_length), max_length)
+                elif codes is not None:
+                    code = codes[sri]
+                    v = labels.get(code, None)
+                    if v is None:
+                        v = labels[code] = series._s.get_fmt(sri, max_length)
+                elif is_string:
                     # 'series._s.get_fmt(...)' wraps strings with a leading '"' and a trailing '"'.
                     # If the wrapped string exceeds the configured string length, it gets truncated
                     # and the last char is replaced with a '…'.
@@ -84,13 +104,16 @@ class TableFrameGenerator(AbstractTableFrameGenerator):
                     #
                     # A printed DataFrame doesn't wrap strings with additional '"'.
                     # To get identical values for strings, the length is increased by two and altered afterwards.
-                    v = series._s.get_fmt(sri, str_lengths + 2)
+                    v = series._s.get_fmt(sri, max_length + 2)
                     if v[-1] == '"':
                         v = v[1:-1]
                     else:
                         v = v[1:-2] + v[-1]
                 else:
-                    v = series._s.get_fmt(sri, str_lengths)
+                    v = series._s.get_fmt(sri, max_length)
+
+                if requested_length is not None:
+                    v = truncate_str(v, requested_length)
 
                 if should_create_row:
                     result.append([TableFrameCell(v)])
@@ -98,3 +121,36 @@ class TableFrameGenerator(AbstractTableFrameGenerator):
                     result[ri].append(TableFrameCell(v))
 
         return result
+
+    @staticmethod
+    def _get_nested_values(series: pl.Series, chunk: Chunk, max_length: int) -> Optional[pl.Series]:
+        # Strings nested in a List or Struct are not truncated by 'series._s.get_fmt(...)', the formatted
+        # value of such a cell can be arbitrarily long. To bound the work, the nested strings of the rows of
+        # the chunk are sliced before formatting. A string sliced to "max_length + 1" chars still produces
+        # an output which exceeds "max_length" and gets truncated at the same position.
+        if not isinstance(series.dtype, (pl.List, pl.Struct, pl.Array)):
+            return None
+        values = series.gather(list(chunk.row_idx_iter()))
+        expr = TableFrameGenerator._slice_nested_strings(pl.col(values.name), values.dtype, max_length + 1)
+        return values if expr is None else values.to_frame().select(expr).to_series()
+
+    @staticmethod
+    def _slice_nested_strings(expr: pl.Expr, dtype: Any, max_length: int) -> Optional[pl.Expr]:
+        # returns None if the dtype doesn't contain strings which can be sliced
+        if dtype == pl.Utf8:
+            return expr.str.slice(0, max_length)
+        if isinstance(dtype, pl.List):
+            inner = TableFrameGenerator._slice_nested_strings(pl.element(), dtype.inner, max_length)
+            return None if inner is None else expr.list.eval(inner)
+        if isinstance(dtype, pl.Struct):
+            sliced_fields = [
+                TableFrameGenerator._slice_nested_strings(expr.struct.field(f.name), f.dtype, max_length)
+                for f in dtype.fields
+            ]
+            if all(sf is None for sf in sliced_fields):
+                return None
+            return pl.struct([
+                (expr.struct.field(f.name) if sf is None else sf).alias(f.name)
+                for f, sf in zip(dtype.fields, sliced_fields)
+            ])
+        return None
@@ -15,6 +15,7 @@ from typing import Any, Union
 
 import polars as pl
 
+from cms_rendner_sdfv.base.caller_namespace import CallerNamespace
 from cms_rendner_sdfv.base.table_source import AbstractTableSource, AbstractTableSourceFactory
 from cms_rendner_sdfv.base.types import CreateTableSourceConfig, CreateTableSourceFailure
 from cms_rendner_sdfv.polars.create_fingerprint import create_fingerprint
@@ -27,7 +28,7 @@ class TableSourceFactory(AbstractTableSourceFactory):
     def _create_internal(self,
                          data_source: Any,
                          config: CreateTableSourceConfig,
-                         caller_globals: dict,
+                         caller_namespace: CallerNamespace,
                          ) -> Union[AbstractTableSource, CreateTableSourceFailure]:
         ds_frame = None
         if isinstance(data_source, dict):
@@ -54,7 +54,8 @@ class VisibleFrame(AbstractVisibleFrame):
         self._source_frame = source_frame
         self._column_names = source_frame.columns
         self._row_idx = row_idx
-        self._region = Region.with_frame_shape(source_frame.shape)
+        rows = source_frame.height if row_idx is None else len(row_idx)
+        self._region = Region.with_frame_shape((rows, source_frame.width))
 
     @property
     def region(self) -> Region:
@@ -74,6 +75,10 @@ class VisibleFrame(AbstractVisibleFrame):
         name = self._column_names[self.region.first_col + offset]
         return self._source_frame.get_column(name)
 
+    def get_memory_usage(self) -> int:
+        # the source frame isn't included, it is owned by the caller
+        return 0 if self._row_idx is None else self._row_idx.estimated_size()
+
     def get_chunk(self, region: Region = None) -> Chunk:
         return Chunk(self, self._sanitized_region(region))
 
@@ -0,0 +1,89 @@
+import datetime
+
+import polars as pl
+import pytest
+
+from cms_rendner_sdfv.base.types import QuickFilter, QuickFilterOp
+from cms_rendner_sdfv.polars import column_index
+from cms_rendner_sdfv.polars.column_index import ColumnIndexes
+
+df = pl.DataFrame({
+    "f": [3.0, None, 1.0, 2.0, 3.0, 0.5],
+    "i": [1, 2, 1, 3, 2, 1],
+    "s": ["b", "a", "c", "a", None, "b"],
+    "d": [
+        datetime.datetime(2020, 1, 1),
+        datetime.datetime(2021, 1, 1),
+        None,
+        datetime.datetime(2022, 1, 1),
+        datetime.datetime(2020, 6, 1),
+        datetime.datetime(2023, 1, 1),
+    ],
+})
+
+QUICK_FILTERS = [
+    QuickFilter(0, QuickFilterOp.GT, 1.0),
+    QuickFilter(0, QuickFilterOp.GE, 1.0),
+    QuickFilter(0, QuickFilterOp.LT, 3.0),
+    QuickFilter(0, QuickFilterOp.LE, 3.0),
+    QuickFilter(0, QuickFilterOp.BETWEEN, [0.5, 2.0]),
+    QuickFilter(0, QuickFilterOp.EQ, 3.0),
+    QuickFilter(1, QuickFilterOp.EQ, 1),
+    QuickFilter(1, QuickFilterOp.IN, [3, 2, 3]),
+    QuickFilter(1, QuickFilterOp.GE, 1.5),
+    QuickFilter(1, QuickFilterOp.EQ, 9),
+    QuickFilter(2, QuickFilterOp.EQ, "a"),
+    QuickFilter(2, QuickFilterOp.GT, "a"),
+    QuickFilter(3, QuickFilterOp.GE, datetime.datetime(2021, 1, 1)),
+    QuickFilter(3, QuickFilterOp.EQ, datetime.datetime(2020, 6, 1)),
+]
+
+
+@pytest.mark.parametrize("quick_filter", QUICK_FILTERS)
+def test_indexed_positions_equal_scanned_positions(quick_filter: QuickFilter):
+    scanned = ColumnIndexes(df, max_bytes=0).find_positions(quick_filter.column, quick_filter)
+    indexes = ColumnIndexes(df, max_bytes=1024 * 1024)
+    indexed = indexes.find_positions(quick_filter.column, quick_filter)
+
+    assert indexed.to_list() == scanned.to_list()
+    assert indexes.nbytes > 0
+
+
+def test_indexes_are_evicted_if_they_exceed_the_budget():
+    frame = pl.DataFrame({"a": list(range(100)), "b": list(range(100))})
+    indexes = ColumnIndexes(frame, max_bytes=2000)
+
+    indexes.find_positions(0, QuickFilter(0, QuickFilterOp.GT, 10))
+    a_bytes = indexes.nbytes
+    assert a_bytes > 0
+
+    indexes.find_positions(1, QuickFilter(1, QuickFilterOp.GT, 10))
+    assert indexes.nbytes == a_bytes
+
+    indexes.set_max_bytes(0)
+    assert indexes.nbytes == 0
+    assert indexes.find_positions(0, QuickFilter(0, QuickFilterOp.GT, 97)).to_list() == [98, 99]
+
+
+def test_indexes_exceeding_the_budget_are_built_only_once(monkeypatch):
+    builds = []
+
+    class CountingSortedValues(column_index._SortedValues):
+        def __init__(self, series):
+            builds.append(series)
+            super().__init__(series)
+
+    monkeypatch.setattr(column_index, "_SortedValues", CountingSortedValues)
+    frame = pl.DataFrame({"a": list(range(100)), "b": list(range(100))})
+    # the positions fit into the budget, the positions and the sorted values don't
+    indexes = ColumnIndexes(frame, max_bytes=1000)
+
+    for i in range(5):
+        assert indexes.find_positions(0, QuickFilter(0, QuickFilterOp.EQ, i)).to_list() == [i]
+    assert len(builds) == 1
+    assert indexes.nbytes == 0
+
+    indexes.set_max_bytes(1024 * 1024)
+    assert indexes.find_positions(0, QuickFilter(0, QuickFilterOp.EQ, 7)).to_list() == [7]
+    assert len(builds) == 2
+    assert indexes.nbytes > 0
@@ -0,0 +1,57 @@
+import polars as pl
+
+from cms_rendner_sdfv.base.types import FrameChange
+from cms_rendner_sdfv.polars.frame_digest import create_frame_digest
+
+
+def _create_frame() -> pl.DataFrame:
+    return pl.DataFrame({
+        "col_0": [4, 4, 4, 1, 4],
+        "col_1": [1.0, 4.5, 4.0, 1.0, 2.0],
+        "col_2": ["a", "b", "c", "d", "e"],
+    })
+
+
+def test_unmodified_frame_is_unchanged():
+    df = _create_frame()
+    assert create_frame_digest(df).compare(create_frame_digest(df)) == FrameChange.UNCHANGED
+
+
+def test_modified_value_is_detected():
+    df = _create_frame()
+    previous = create_frame_digest(df)
+    df[2, "col_2"] = "x"
+    assert create_frame_digest(df).compare(previous) == FrameChange.VALUES_CHANGED
+
+
+def test_changed_structure_is_detected():
+    df = _create_frame()
+    previous = create_frame_digest(df)
+    df = df.with_columns(pl.lit(1).alias("col_3"))
+    assert create_frame_digest(df).compare(previous) == FrameChange.STRUCTURE_CHANGED
+
+
+def test_different_frames_have_different_structure():
+    assert create_frame_digest(_create_frame()).compare(create_frame_digest(_create_frame())) == \
+           FrameChange.STRUCTURE_CHANGED
+
+
+def test_only_sampled_rows_are_hashed():
+    df = pl.DataFrame({"a": [str(i) for i in range(1000)]})
+    previous = create_frame_digest(df, max_sampled_cells=10)
+    # first and last row are always sampled
+    df[999, "a"] = "x"
+    assert create_frame_digest(df, max_sampled_cells=10).compare(previous) == FrameChange.VALUES_CHANGED
+    previous = create_frame_digest(df, max_sampled_cells=10)
+    df[1, "a"] = "x"
+    assert create_frame_digest(df, max_sampled_cells=10).compare(previous) == FrameChange.UNCHANGED
+
+
+def test_object_columns():
+    df = pl.DataFrame({"a": [1, 2], "o": pl.Series([object(), object()], dtype=pl.Object)})
+    assert create_frame_digest(df).compare(create_frame_digest(df)) == FrameChange.UNCHANGED
+
+
+def test_empty_frame():
+    df = pl.DataFrame()
+    assert create_frame_digest(df).compare(create_frame_digest(df)) == FrameChange.UNCHANGED
@@ -1,6 +1,8 @@
 import polars as pl
 import pytest
 
+from cms_rendner_sdfv.base.constants import CELL_MAX_STR_LEN
+from cms_rendner_sdfv.base.helpers import truncate_str
 from cms_rendner_sdfv.base.types import TableFrame, TableFrameCell, TableFrameColumn
 from cms_rendner_sdfv.polars.frame_context import FrameContext
 from tests.helpers.asserts.assert_table_frames import assert_table_frames
@@ -116,3 +118,47 @@ def test_describe():
         ),
         include_column_describe=True,
     )
+
+
+def test_categorical_values():
+    df = pl.DataFrame({
+        "cat": pl.Series(["b", None, "a", "b"], dtype=pl.Categorical),
+        "enum": pl.Series(["x", "y", None, "x"], dtype=pl.Enum(["y", "x"])),
+    })
+
+    ctx = FrameContext(df)
+    ctx.set_sort_criteria([1], [True])
+    expected = [[df.get_column(c)._s.get_fmt(r, 200) for c in df.columns] for r in [2, 1, 0, 3]]
+
+    actual = ctx.get_table_frame_generator().generate_by_combining_chunks(3, 1)
+    assert [[c.value for c in row] for row in actual.cells] == expected
+    assert expected[0] == ['"a"', 'null']
+
+
+def test_categorical_values_respect_configured_string_length():
+    df = pl.DataFrame({"cat": pl.Series(["12345"], dtype=pl.Categorical)})
+    ctx = FrameContext(df)
+
+    with pl.Config() as cfg:
+        cfg.set_fmt_str_lengths(3)
+        short_value = ctx.get_table_frame_generator().generate().cells[0][0].value
+
+    assert short_value != ctx.get_table_frame_generator().generate().cells[0][0].value
+
+
+def test_nested_values_with_long_strings_are_truncated():
+    df = pl.DataFrame({
+        "list": [["a" * 1000, None], None, ["b"]],
+        "struct": [{"x": "c" * 1000, "y": 1}, None, {"x": "d", "y": 2}],
+        "nested": [[{"x": ["e" * 1000]}], [], None],
+    })
+
+    ctx = FrameContext(df)
+    actual = ctx.get_table_frame_generator().generate()
+    expected = [
+        [truncate_str(df.get_column(c)._s.get_fmt(r, CELL_MAX_STR_LEN), CELL_MAX_STR_LEN) for c in df.columns]
+        for r in range(3)
+    ]
+    assert [[c.value for c in row] for row in actual.cells] == expected
+    assert expected[0][0] == '["' + 'a' * (CELL_MAX_STR_LEN - 3) + '…'
+    assert expected[2] == ['["b"]', '{"d",2}', 'null']
@@ -86,3 +86,15 @@ def test_create_fails_on_invalid_fingerprint():
 
     assert isinstance(failure, CreateTableSourceFailure)
     assert failure.error_kind == "INVALID_FINGERPRINT"
+
+
+def test_create_with_profiling():
+    table_source = _create_table_source(df, CreateTableSourceConfig(profiling=True))
+    assert isinstance(table_source, TableSource)
+
+    _get_table_frame(table_source)
+
+    records = json.loads(table_source.get_profile_records())
+    assert [r["call"] for r in records] == ["create", "get_table_structure", "compute_chunk_table_frame"]
+    assert "generate" in records[2]["stats"]
+    assert records[2]["peak_memory"] is None
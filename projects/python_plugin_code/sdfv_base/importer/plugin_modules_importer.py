@@ -33,36 +33,156 @@ def inject_plugin_modules_importer(root_package_name: str):
             return spec
 
         def exec_module(self, module):
-            packages: dict = {}
+            # flat index of all registered modules: fq_name => (dump_id, source)
+            # the source is either a str or a tuple (blob, start, end) which is decoded on first import
+            modules: dict = {}
+            # fq_names of all (namespace) packages of the registered modules
+            packages: set = set()
+            # registered but not yet indexed dumps
+            pending_dumps: list = []
             packaged_dump_ids = []
+            # directory of the bytecode cache, caching is disabled if None
+            bytecode_cache_dir: Optional[str] = None
 
-            def _add_non_existing_entries(target: dict, update: dict):
-                for key in update:
-                    if key not in target:
-                        target[key] = update[key]
-                    elif isinstance(target[key], dict) and isinstance(update[key], dict):
-                        _add_non_existing_entries(target[key], update[key])
-
-            def _get_package_entry(fq_name: str) -> Union[dict, str, None]:
+            def _add_module(dump_id: str, fq_name: str, source: Union[str, tuple]):
+                # entries of previously registered dumps are not overwritten
+                if fq_name in modules or fq_name in packages:
+                    return
+                modules[fq_name] = (dump_id, source)
                 parts = fq_name.split('.')
-                parent_package = packages
-                for p in parts[:-1]:
-                    parent_package = parent_package.get(p, None)
-                    if parent_package is None or not isinstance(parent_package, dict):
-                        return None
-                return parent_package.get(parts[-1], None)
-
-            def register_package_dump(dumb_id: str, package_dumb: Union[str, dict]):
-                if dumb_id not in packaged_dump_ids:
-                    if isinstance(package_dumb, str):
+                for i in range(1, len(parts)):
+                    packages.add('.'.join(parts[:i]))
+
+            def _add_nested_entries(dump_id: str, package: str, entries: dict):
+                for key, value in entries.items():
+                    fq_name = f"{package}.{key}" if package else key
+                    if isinstance(value, dict):
+                        _add_nested_entries(dump_id, fq_name, value)
+                    elif isinstance(value, str):
+                        _add_module(dump_id, fq_name, value)
+
+            def _add_compressed_entries(dump_id: str, package_dump: Union[str, bytes]):
+                # format: base64(zlib(<json index: {fq_name: [start, end]}> + "\n" + <utf8 encoded sources>))
+                import base64
+                import json
+                import zlib
+                payload = zlib.decompress(base64.b64decode(package_dump))
+                header_end = payload.index(b'\n')
+                blob = memoryview(payload)[header_end + 1:]
+                for fq_name, (start, end) in json.loads(payload[:header_end].decode('utf8')).items():
+                    _add_module(dump_id, fq_name, (blob, start, end))
+
+            def _index_pending_dumps():
+                while pending_dumps:
+                    dump_id, package_dump = pending_dumps.pop(0)
+                    if isinstance(package_dump, dict):
+                        _add_nested_entries(dump_id, "", package_dump)
+                    elif isinstance(package_dump, str) and package_dump.lstrip().startswith('{'):
                         import json
-                        package_dumb = json.loads(package_dumb)
+                        _add_nested_entries(dump_id, "", json.loads(package_dump))
+                    else:
+                        _add_compressed_entries(dump_id, package_dump)
+
+            def register_package_dump(dumb_id: str, package_dumb: Union[str, bytes, dict]):
+                # "package_dumb" is a nested dict (or its JSON string) or a compressed dump,
+                # dumps are only parsed when a module is looked up for the first time
+                if dumb_id not in packaged_dump_ids:
                     packaged_dump_ids.append(dumb_id)
-                    _add_non_existing_entries(packages, package_dumb)
+                    pending_dumps.append((dumb_id, package_dumb))
+
+            def enable_bytecode_cache(enable: bool = True, cache_dir: Optional[str] = None):
+                # Opt-in: compiled modules are stored as marshalled code objects in "cache_dir"
+                # (default: a per-user directory in the temp dir) and reused by later sessions.
+                # The cached code is executed in the debugged process, therefore the cache is only
+                # used if "cache_dir" is a directory which can't be modified by other users.
+                nonlocal bytecode_cache_dir
+                bytecode_cache_dir = None
+                if not enable:
+                    return
+                import os
+                if cache_dir is None:
+                    import tempfile
+                    name = "cms_rendner_sdfv_bytecode_cache"
+                    if hasattr(os, "getuid"):
+                        # the temp dir is shared by all users on most posix systems
+                        name = f"{name}_{os.getuid()}"
+                    cache_dir = os.path.join(tempfile.gettempdir(), name)
+                try:
+                    os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+                except OSError:
+                    return
+                if _is_private_dir(cache_dir):
+                    bytecode_cache_dir = cache_dir
+
+            def _is_private_dir(path: str) -> bool:
+                import os
+                import stat
+                try:
+                    st = os.lstat(path)
+                except OSError:
+                    return False
+                if not stat.S_ISDIR(st.st_mode):
+                    # also rejects symlinks, which could point to a directory of another user
+                    return False
+                if hasattr(os, "getuid"):
+                    # posix: owned by the current user and not accessible by group or others
+                    return st.st_uid == os.getuid() and (st.st_mode & 0o077) == 0
+                return True
+
+            def _get_entry(fq_name: str) -> Optional[tuple]:
+                _index_pending_dumps()
+                entry = modules.get(fq_name, None)
+                if entry is not None and isinstance(entry[1], tuple):
+                    blob, start, end = entry[1]
+                    entry = modules[fq_name] = (entry[0], str(blob[start:end], 'utf8'))
+                return entry
 
-            def _get_file_content(fq_name: str) -> Optional[str]:
-                entry = _get_package_entry(fq_name)
-                return entry if isinstance(entry, str) else None
+            def _get_cache_file_path(cache_dir: str, dump_id: str, fq_name: str, source_hash: str) -> str:
+                import os
+                import re
+                return os.path.join(
+                    cache_dir,
+                    sys.implementation.cache_tag or "no_cache_tag",
+                    re.sub(r'[^\w.-]', '_', dump_id),
+                    f"{fq_name}.{source_hash}.bin",
+                )
+
+            def _get_code(fq_name: str):
+                entry = _get_entry(fq_name)
+                if entry is None:
+                    return None
+                dump_id, source = entry
+                # re-checked, the directory could have been replaced since the cache was enabled
+                if bytecode_cache_dir is None or not _is_private_dir(bytecode_cache_dir):
+                    return compile(source, "<string>", "exec")
+
+                import hashlib
+                import marshal
+                import os
+                from importlib.util import MAGIC_NUMBER
+                source_hash = hashlib.sha1(source.encode('utf8')).hexdigest()
+                # the header is validated on load, to not use a corrupt or foreign file
+                header = MAGIC_NUMBER + source_hash.encode('ascii')
+                path = _get_cache_file_path(bytecode_cache_dir, dump_id, fq_name, source_hash)
+                try:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                    if data.startswith(header):
+                        return marshal.loads(data[len(header):])
+                except Exception:
+                    pass
+
+                code = compile(source, "<string>", "exec")
+                try:
+                    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+                    # write into a temp file first, to never expose a partially written file to other processes
+                    tmp_path = f"{path}.{os.getpid()}.tmp"
+                    with open(tmp_path, 'wb') as f:
+                        f.write(header + marshal.dumps(code))
+                    os.replace(tmp_path, path)
+                except OSError:
+                    pass
+                return code
 
             def get_registered_dump_ids() -> List[str]:
                 return list(packaged_dump_ids)
@@ -70,26 +190,25 @@ def inject_plugin_modules_importer(root_package_name: str):
             class _MyVirtualPackageFileLoader(Loader):
                 def exec_module(self, module):
                     name = module.__name__
-                    code = _get_file_content(name)
+                    code = _get_code(name)
                     if code is None:
                         raise ImportError(f'cannot load module {name}, no content', name=name)
                     exec(code, module.__dict__)
 
             def get_module_spec_for_entry(fq_name: str):
-                entry = _get_package_entry(fq_name)
-                if entry is None:
-                    return None
+                _index_pending_dumps()
                 from importlib import util
-                if isinstance(entry, dict):
+                if fq_name in modules:
+                    return util.spec_from_loader(fq_name, _MyVirtualPackageFileLoader(), is_package=False)
+                elif fq_name in packages:
                     # namespace package
                     return util.spec_from_loader(fq_name, None, is_package=True)
-                elif isinstance(entry, str):
-                    return util.spec_from_loader(fq_name, _MyVirtualPackageFileLoader(), is_package=False)
                 return None
 
             module.__dict__['register_package_dump'] = register_package_dump
             module.__dict__['get_registered_dump_ids'] = get_registered_dump_ids
             module.__dict__['get_module_spec_for_entry'] = get_module_spec_for_entry
+            module.__dict__['enable_bytecode_cache'] = enable_bytecode_cache
 
     sys.meta_path.append(SDFVPluginModulesImporter())
 
@@ -0,0 +1,87 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+from collections import ChainMap
+from functools import lru_cache
+from types import CodeType
+from typing import Any, Dict, Iterator, Mapping, Tuple, Union
+
+
+@lru_cache(maxsize=64)
+def _compile(expression: str) -> CodeType:
+    return compile(expression, "<expression>", "eval")
+
+
+def compile_expression(expression: Union[str, CodeType]) -> CodeType:
+    return expression if isinstance(expression, CodeType) else _compile(expression)
+
+
+def _iterate_names(code: CodeType) -> Iterator[str]:
+    yield from code.co_names
+    yield from code.co_varnames
+    yield from code.co_freevars
+    for const in code.co_consts:
+        # code of nested scopes (lambdas, comprehensions)
+        if isinstance(const, CodeType):
+            yield from _iterate_names(const)
+
+
+def _has_nested_scopes(code: CodeType) -> bool:
+    return any(isinstance(const, CodeType) for const in code.co_consts)
+
+
+class CallerNamespace:
+    # The names visible in the frame of the caller, to evaluate expressions like the caller would do.
+    #
+    # The globals and locals of the caller are not copied (the globals of a notebook can be huge), the locals
+    # and the additionally defined names are chained in front of the globals instead.
+
+    def __init__(self, frame_globals: Dict[str, Any], frame_locals: Mapping[str, Any]):
+        self._globals = frame_globals
+        self._locals = ChainMap({}, frame_locals)
+
+    def __setitem__(self, name: str, value: Any):
+        # defines an additional name, the globals and locals of the caller are not modified
+        self._locals.maps[0][name] = value
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self._locals:
+            return self._locals[name]
+        return self._globals[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._locals or name in self._globals
+
+    def get_globals(self) -> Dict[str, Any]:
+        return self._globals
+
+    def get_locals(self) -> Dict[str, Any]:
+        # a merged copy of the locals and the additionally defined names (both are small compared to the globals)
+        return dict(self._locals)
+
+    def eval(self, expression: Union[str, CodeType]) -> Any:
+        code = compile_expression(expression)
+        if not _has_nested_scopes(code):
+            return eval(code, self._globals, self._locals)
+        # Nested scopes (lambdas, comprehensions) resolve free names only via the globals, which don't contain
+        # the locals. The referenced names are therefore merged into a new namespace, instead of copying all globals.
+        return eval(code, {name: self[name] for name in set(_iterate_names(code)) if name in self})
+
+    def get_referenced_values(self, expression: Union[str, CodeType]) -> Tuple[Tuple[str, Any], ...]:
+        # Returns the names, and their values, referenced by the expression (sorted by name). Allows to detect if
+        # an expression would be evaluated against other objects (for example a re-assigned threshold variable).
+        result = {}
+        for name in _iterate_names(compile_expression(expression)):
+            if name not in result and name in self:
+                result[name] = self[name]
+        return tuple(sorted(result.items(), key=lambda item: item[0]))
@@ -0,0 +1,105 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+from hashlib import blake2b
+from typing import Any, List, Optional, Union
+
+from cms_rendner_sdfv.base.types import ChunkDigest, Region, TableFrame, TableFrameCell, TableFrameCellChange, \
+    TableFrameColumn, TableFrameColumnChange, TableFrameDelta, TableFrameIndexLabelsChange
+
+# A chunk, which was already displayed by the IDE, can be refreshed by sending only the changed parts.
+#
+# The digest of a chunk contains a digest per row and per column of cells, a cell is sent if the digests of its
+# row and its column differ. A single modified cell changes exactly one row and one column digest. The digests
+# of the headers (index labels and columns) are compared separately.
+
+
+def _digest(value: Any) -> str:
+    return blake2b(repr(value).encode(), digest_size=8).hexdigest()
+
+
+def _cell_key(cell: TableFrameCell) -> tuple:
+    return cell.value, None if cell.css is None else tuple(sorted(cell.css.items()))
+
+
+def _column_key(column: TableFrameColumn) -> tuple:
+    return column.dtype, column.labels, None if column.describe is None else tuple(sorted(column.describe.items()))
+
+
+def create_chunk_digest(region: Region, table_frame: TableFrame) -> ChunkDigest:
+    cell_keys = [[_cell_key(c) for c in row] for row in table_frame.cells]
+    cols = len(cell_keys[0]) if cell_keys else 0
+    return ChunkDigest(
+        region=region,
+        index_labels=None if table_frame.index_labels is None else [_digest(x) for x in table_frame.index_labels],
+        columns=None if table_frame.columns is None else [_digest(_column_key(c)) for c in table_frame.columns],
+        rows=[_digest(row) for row in cell_keys],
+        cols=[_digest([row[c] for row in cell_keys]) for c in range(cols)],
+        legend=None if table_frame.legend is None else _digest(table_frame.legend),
+    )
+
+
+def to_chunk_digest(value: Union[ChunkDigest, dict, None]) -> Optional[ChunkDigest]:
+    # The IDE passes the digest, received with the previous delta, back as dict.
+    if isinstance(value, dict):
+        region = value.get("region", None)
+        value = ChunkDigest(**{**value, "region": Region(**region) if isinstance(region, dict) else region})
+    return value
+
+
+def _changed_positions(previous: Optional[List[str]], current: Optional[List[str]]) -> List[int]:
+    if current is None:
+        return []
+    if previous is None:
+        return list(range(len(current)))
+    return [i for i, (p, c) in enumerate(zip(previous, current)) if p != c]
+
+
+def _has_same_layout(previous: ChunkDigest, current: ChunkDigest) -> bool:
+    return previous.region == current.region \
+        and len(previous.rows) == len(current.rows) \
+        and len(previous.cols) == len(current.cols) \
+        and (previous.index_labels is None or current.index_labels is None
+             or len(previous.index_labels) == len(current.index_labels)) \
+        and (previous.columns is None or current.columns is None or len(previous.columns) == len(current.columns)) \
+        and previous.legend == current.legend
+
+
+def create_table_frame_delta(region: Region,
+                             table_frame: TableFrame,
+                             previous_digest: Union[ChunkDigest, dict, None] = None,
+                             ) -> TableFrameDelta:
+    # Returns the complete table frame if there is no previous digest of a chunk with the same layout
+    # (region, number of rows and columns, legend).
+    digest = create_chunk_digest(region, table_frame)
+    previous = to_chunk_digest(previous_digest)
+    if previous is None or not _has_same_layout(previous, digest):
+        return TableFrameDelta(digest=digest, table_frame=table_frame)
+
+    changed_cols = _changed_positions(previous.cols, digest.cols)
+    return TableFrameDelta(
+        digest=digest,
+        index_labels=[
+            TableFrameIndexLabelsChange(row=r, labels=table_frame.index_labels[r])
+            for r in _changed_positions(previous.index_labels, digest.index_labels)
+        ],
+        columns=[
+            TableFrameColumnChange(col=c, column=table_frame.columns[c])
+            for c in _changed_positions(previous.columns, digest.columns)
+        ],
+        cells=[
+            TableFrameCellChange(row=r, col=c, cell=table_frame.cells[r][c])
+            for r in _changed_positions(previous.rows, digest.rows)
+            for c in changed_cols
+        ],
+    )
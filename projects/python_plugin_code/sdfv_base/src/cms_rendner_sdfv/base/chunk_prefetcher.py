@@ -0,0 +1,117 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from cms_rendner_sdfv.base.helpers import create_background_thread
+from cms_rendner_sdfv.base.types import Region, ScrollDirection, TableFrame
+
+
+def get_prefetch_regions(viewport: Region,
+                         bounds: Region,
+                         scroll_direction: Optional[ScrollDirection],
+                         depth: int,
+                         ) -> List[Region]:
+    # Returns the regions next to the viewport, which have the same size as the viewport, ordered by their distance.
+    # Without a scroll direction, the regions below and above the viewport are returned.
+    if viewport.is_empty():
+        return []
+
+    if scroll_direction is None:
+        directions = [ScrollDirection.DOWN, ScrollDirection.UP]
+    else:
+        directions = [scroll_direction]
+
+    result = []
+    for distance in range(1, depth + 1):
+        for direction in directions:
+            first_row = viewport.first_row
+            first_col = viewport.first_col
+            if direction == ScrollDirection.DOWN:
+                first_row += distance * viewport.rows
+            elif direction == ScrollDirection.UP:
+                first_row -= distance * viewport.rows
+            elif direction == ScrollDirection.RIGHT:
+                first_col += distance * viewport.cols
+            else:
+                first_col -= distance * viewport.cols
+            if 0 <= first_row < bounds.rows and 0 <= first_col < bounds.cols:
+                result.append(Region(first_row, first_col, viewport.rows, viewport.cols))
+    return result
+
+
+class ChunkPrefetcher:
+    # Computes the table frames of regions on a background thread and keeps them until they are requested.
+    #
+    # A running computation of a chunk can't be interrupted, a cancellation only prevents the computation
+    # of the following chunks. Chunks, which were in progress while the prefetch was cancelled, are discarded.
+
+    def __init__(self, compute_chunk: Callable[[Region], TableFrame], max_cached_chunks: int = 16):
+        self._compute_chunk = compute_chunk
+        self._max_cached_chunks = max_cached_chunks
+        self._cache: Dict[Region, TableFrame] = OrderedDict()
+        self._lock = threading.Lock()
+        # incremented on each change, to detect outdated prefetches
+        self._generation = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def prefetch(self, regions: List[Region]):
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            # drop chunks which are no longer next to the viewport
+            for region in [r for r in self._cache if r not in regions]:
+                del self._cache[region]
+
+        if not regions:
+            return
+
+        thread = create_background_thread(self._prefetch_regions, "sdfv-chunk-prefetch", (regions, generation))
+        self._thread = thread
+        thread.start()
+
+    def pop(self, region: Region) -> Optional[TableFrame]:
+        with self._lock:
+            return self._cache.pop(region, None)
+
+    def cancel(self):
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+
+    def join(self, timeout: Optional[float] = None):
+        # Waits until the last started prefetch is finished.
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _prefetch_regions(self, regions: List[Region], generation: int):
+        for region in regions:
+            with self._lock:
+                if generation != self._generation:
+                    return
+                if region in self._cache:
+                    continue
+            try:
+                table_frame = self._compute_chunk(region)
+            except Exception:
+                # the error is reported when the IDE requests the chunk
+                return
+            with self._lock:
+                if generation != self._generation:
+                    return
+                self._cache[region] = table_frame
+                while len(self._cache) > self._max_cached_chunks:
+                    self._cache.popitem(last=False)
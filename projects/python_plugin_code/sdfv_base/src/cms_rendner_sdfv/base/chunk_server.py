@@ -0,0 +1,223 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import hmac
+import json
+import os
+import secrets
+import socket
+import socketserver
+import struct
+from collections.abc import MutableMapping
+from dataclasses import dataclass
+from typing import Optional
+
+from cms_rendner_sdfv.base.helpers import create_background_thread
+from cms_rendner_sdfv.base.table_source import TEMP_VARS
+from cms_rendner_sdfv.base.temp_vars_registry import EvictedSlotError
+from cms_rendner_sdfv.base.transforms import to_json
+
+# A side-channel to transfer the (large) payloads of the registered table sources without the debugger.
+#
+# The debugger is only required to start the server and to fetch its address. All messages are frames,
+# prefixed with their length (4 bytes, unsigned, big-endian). The first frame sent by a client has to
+# be the token of the server, the server closes the connection if the token doesn't match.
+#
+# Each following frame is a request, encoded as UTF-8 JSON:
+#   {"id": 1, "slot_id": "...", "method": "compute_chunk_table_frame", "args": [0, 0, 60, 40], "kwargs": {}}
+#
+# The server answers each request, in order, with a frame:
+#   {"id": 1, "result": <JSON of the result>} or {"id": 1, "error": "..."}
+
+_FRAME_HEADER = struct.Struct(">I")
+
+# requests are small, larger frames indicate a broken client
+MAX_REQUEST_FRAME_SIZE = 1024 * 1024
+
+# methods of the table sources which can be called via the server
+ALLOWED_METHODS = frozenset([
+    "compute_chunk_delta",
+    "compute_chunk_styles",
+    "compute_chunk_table_frame",
+    "detect_frame_change",
+    "get_cell_value",
+    "get_frame_digest",
+    "get_org_indices_of_visible_columns",
+    "get_perf_stats",
+    "get_style_function_info",
+    "get_table_structure",
+    "set_column_index_budget",
+    "set_quick_filters",
+    "set_sort_criteria",
+    "set_viewport",
+    "validate_style_functions",
+])
+
+
+def write_frame(sock: socket.socket, payload: bytes):
+    sock.sendall(_FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def read_frame(sock: socket.socket, max_size: Optional[int] = None) -> Optional[bytes]:
+    # Returns None if the connection was closed before a new frame started.
+    header = _read_exactly(sock, _FRAME_HEADER.size)
+    if header is None:
+        return None
+    size, = _FRAME_HEADER.unpack(header)
+    if max_size is not None and size > max_size:
+        raise ValueError(f"Frame of {size} bytes exceeds the limit of {max_size} bytes.")
+    payload = _read_exactly(sock, size)
+    if payload is None:
+        raise ConnectionError("Connection closed within a frame.")
+    return payload
+
+
+def _read_exactly(sock: socket.socket, size: int) -> Optional[bytes]:
+    buffer = bytearray()
+    while len(buffer) < size:
+        part = sock.recv(min(size - len(buffer), 1024 * 1024))
+        if not part:
+            if buffer:
+                raise ConnectionError("Connection closed within a frame.")
+            return None
+        buffer.extend(part)
+    return bytes(buffer)
+
+
+@dataclass(frozen=True)
+class ChunkServerAddress:
+    token: str
+    # set for a loopback socket
+    host: Optional[str] = None
+    port: Optional[int] = None
+    # set for a Unix domain socket
+    path: Optional[str] = None
+
+
+class _ThreadingServerMixIn(socketserver.ThreadingMixIn):
+    daemon_threads = True
+
+    def process_request(self, request, client_address):
+        create_background_thread(
+            self.process_request_thread,
+            "sdfv-chunk-server-connection",
+            (request, client_address),
+        ).start()
+
+
+class _TCPServer(_ThreadingServerMixIn, socketserver.TCPServer):
+    pass
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+    class _UnixStreamServer(_ThreadingServerMixIn, socketserver.UnixStreamServer):
+        pass
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        chunk_server: ChunkServer = self.server.chunk_server
+        token = read_frame(self.request, max_size=MAX_REQUEST_FRAME_SIZE)
+        if token is None or not chunk_server.is_valid_token(token):
+            return
+        while True:
+            payload = read_frame(self.request, max_size=MAX_REQUEST_FRAME_SIZE)
+            if payload is None:
+                return
+            write_frame(self.request, chunk_server.handle_request(payload))
+
+
+class ChunkServer:
+    # Serves the table sources of a registry (by default "TEMP_VARS") over a loopback or Unix domain socket.
+
+    def __init__(self, registry: MutableMapping, unix_socket_path: Optional[str] = None):
+        self._registry = registry
+        self._unix_socket_path = unix_socket_path
+        self._token = secrets.token_hex(16)
+        self._server: Optional[socketserver.BaseServer] = None
+
+    @property
+    def address(self) -> Optional[ChunkServerAddress]:
+        if self._server is None:
+            return None
+        if self._unix_socket_path is not None:
+            return ChunkServerAddress(token=self._token, path=self._unix_socket_path)
+        host, port = self._server.server_address[:2]
+        return ChunkServerAddress(token=self._token, host=host, port=port)
+
+    def start(self) -> ChunkServerAddress:
+        if self._server is None:
+            if self._unix_socket_path is not None:
+                if not hasattr(socketserver, "UnixStreamServer"):
+                    raise ValueError("Unix domain sockets are not supported on this platform.")
+                server = _UnixStreamServer(self._unix_socket_path, _RequestHandler)
+            else:
+                server = _TCPServer(("127.0.0.1", 0), _RequestHandler)
+            server.chunk_server = self
+            self._server = server
+            # a short poll interval, "stop" waits up to one interval
+            create_background_thread(server.serve_forever, "sdfv-chunk-server", (0.1,)).start()
+        return self.address
+
+    def stop(self):
+        server = self._server
+        if server is None:
+            return
+        self._server = None
+        server.shutdown()
+        server.server_close()
+        if self._unix_socket_path is not None and os.path.exists(self._unix_socket_path):
+            os.remove(self._unix_socket_path)
+
+    def is_valid_token(self, token: bytes) -> bool:
+        return hmac.compare_digest(token, self._token.encode("utf-8"))
+
+    def handle_request(self, payload: bytes) -> bytes:
+        request_id = None
+        try:
+            request = json.loads(payload.decode("utf-8"))
+            request_id = request.get("id", None)
+            method = request["method"]
+            if method not in ALLOWED_METHODS:
+                raise ValueError(f"Method '{method}' can't be called via the chunk server.")
+            try:
+                table_source = self._registry[request["slot_id"]]
+            except EvictedSlotError:
+                # reported as is, the IDE recreates the table source
+                raise
+            except KeyError:
+                raise KeyError(f"No table source registered for slot id '{request['slot_id']}'.") from None
+            result = getattr(table_source, method)(*request.get("args", []), **request.get("kwargs", {}))
+            # the result is embedded as is, to not encode it twice
+            response = f'{{"id": {json.dumps(request_id)}, "result": {table_source.jsonify(result)}}}'
+        except Exception as e:
+            response = to_json({"id": request_id, "error": repr(e)})
+        return response.encode("utf-8")
+
+
+_CHUNK_SERVER: Optional[ChunkServer] = None
+
+
+def start_chunk_server(unix_socket_path: Optional[str] = None) -> str:
+    # Starts the server for the "TEMP_VARS" (if not already running) and returns its address as JSON.
+    global _CHUNK_SERVER
+    if _CHUNK_SERVER is None:
+        _CHUNK_SERVER = ChunkServer(TEMP_VARS, unix_socket_path)
+    return to_json(_CHUNK_SERVER.start())
+
+
+def stop_chunk_server():
+    global _CHUNK_SERVER
+    if _CHUNK_SERVER is not None:
+        _CHUNK_SERVER.stop()
+        _CHUNK_SERVER = None
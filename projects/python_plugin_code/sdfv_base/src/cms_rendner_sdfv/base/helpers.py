@@ -11,7 +11,45 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+import threading
+from typing import Any, Callable, List, Tuple
+
+
+def create_background_thread(target: Callable, name: str, args: Tuple[Any, ...] = ()) -> threading.Thread:
+    # Returns a not started daemon thread.
+    # The thread is marked as internal thread of the debugger (pydevd), such threads are neither traced nor
+    # suspended by the debugger. For example a breakpoint in a style function doesn't stop the thread.
+    thread = threading.Thread(target=target, name=name, args=args, daemon=True)
+    thread.is_pydev_daemon_thread = True
+    return thread
 
 
 def truncate_str(s: str, max_length: int) -> str:
     return s if len(s) <= max_length else s[:max_length - 1] + '…'
+
+
+class BoundedStrBuilder:
+    # Collects the parts of a string until more than "max_length" chars are collected, all further parts are
+    # ignored. The result is identical to "truncate_str" applied to the concatenation of all parts.
+    #
+    # Allows to stop the formatting of a large object as soon as the output budget is used up.
+    def __init__(self, max_length: int):
+        self._max_length = max_length
+        # one more char than allowed is required to decide if the result has to be truncated
+        self._remaining = max_length + 1
+        self._parts: List[str] = []
+
+    @property
+    def is_full(self) -> bool:
+        return self._remaining <= 0
+
+    def append(self, s: str):
+        if self._remaining <= 0:
+            return
+        if len(s) > self._remaining:
+            s = s[:self._remaining]
+        self._parts.append(s)
+        self._remaining -= len(s)
+
+    def build(self) -> str:
+        return truncate_str(''.join(self._parts), self._max_length)
@@ -0,0 +1,161 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import mmap
+import os
+import tempfile
+import uuid
+import weakref
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Large payloads (encoded table frames) can be written into memory-mapped files instead of returning them as
+# string through the debugger. The consumer reads the bytes directly from the file at the returned location.
+#
+# The files are named "<prefix><pid>-<ring-id>-<index>" to be able to remove the files of crashed processes.
+BUFFER_FILE_PREFIX = "sdfv-payload-"
+
+
+@dataclass(frozen=True)
+class PayloadLocation:
+    path: str
+    offset: int
+    length: int
+
+
+def get_default_buffer_directory() -> str:
+    # "/dev/shm" is a memory-backed filesystem on Linux, the files are never written to a disk
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+def remove_stale_buffers(directory: str) -> int:
+    # Removes the buffer files of processes which are no longer running, returns the number of removed files.
+    removed = 0
+    try:
+        file_names = os.listdir(directory)
+    except OSError:
+        return removed
+    for file_name in file_names:
+        if not file_name.startswith(BUFFER_FILE_PREFIX):
+            continue
+        pid = file_name[len(BUFFER_FILE_PREFIX):].split("-", 1)[0]
+        if pid.isdigit() and not _is_process_alive(int(pid)):
+            try:
+                os.remove(os.path.join(directory, file_name))
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def _is_process_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    if os.name == "nt":
+        # "os.kill" with signal 0 terminates the process on Windows, assume the process is alive
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # exists but belongs to another user
+        return True
+    return True
+
+
+class _MappedBuffer:
+    def __init__(self, path: str, size: int):
+        self.path = path
+        # the directory is usually shared by all users ("/dev/shm"), the payloads are only readable by the owner,
+        # an existing file (e.g. planted by another user) isn't reused
+        flags = os.O_CREAT | os.O_EXCL | os.O_RDWR | getattr(os, "O_BINARY", 0)
+        self._file = os.fdopen(os.open(path, flags, 0o600), "w+b")
+        self._map: Optional[mmap.mmap] = None
+        self._resize(size)
+
+    @property
+    def size(self) -> int:
+        return len(self._map)
+
+    def write(self, payload: bytes):
+        if len(payload) > self.size:
+            self._resize(max(len(payload), 2 * self.size))
+        self._map[:len(payload)] = payload
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _resize(self, size: int):
+        if self._map is not None:
+            self._map.close()
+        self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+
+
+def _close_buffers(buffers: List[_MappedBuffer]):
+    for buffer in buffers:
+        buffer.close()
+    buffers.clear()
+
+
+class MappedPayloadRing:
+    # A ring of memory-mapped files, each payload is written into the next file of the ring.
+    #
+    # A written payload stays valid until "buffer_count" further payloads were written, the consumer
+    # has to read it before. The files are removed on "close", at the latest when the process exits.
+
+    def __init__(self,
+                 directory: Optional[str] = None,
+                 buffer_count: int = 4,
+                 initial_buffer_size: int = 1024 * 1024,
+                 ):
+        if buffer_count < 1:
+            raise ValueError(f"buffer_count ({buffer_count}) must be > 0")
+        self._directory = get_default_buffer_directory() if directory is None else directory
+        self._buffer_count = buffer_count
+        self._initial_buffer_size = initial_buffer_size
+        self._ring_id = uuid.uuid4().hex[:12]
+        self._buffers: List[_MappedBuffer] = []
+        self._next_index = 0
+        remove_stale_buffers(self._directory)
+        # the list of buffers is passed instead of "self", a finalizer must not reference the object
+        self._finalizer = weakref.finalize(self, _close_buffers, self._buffers)
+
+    @property
+    def paths(self) -> List[str]:
+        return [b.path for b in self._buffers]
+
+    def write(self, payload: bytes) -> PayloadLocation:
+        if not self._finalizer.alive:
+            raise ValueError("The ring was closed.")
+        index = self._next_index
+        self._next_index = (index + 1) % self._buffer_count
+        if index == len(self._buffers):
+            file_name = f"{BUFFER_FILE_PREFIX}{os.getpid()}-{self._ring_id}-{index}"
+            self._buffers.append(_MappedBuffer(os.path.join(self._directory, file_name), self._initial_buffer_size))
+        buffer = self._buffers[index]
+        buffer.write(payload)
+        return PayloadLocation(path=buffer.path, offset=0, length=len(payload))
+
+    def close(self):
+        self._finalizer()
@@ -0,0 +1,70 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator
+
+
+@dataclass
+class StageTimes:
+    # All times are in seconds.
+    # The CPU time is the time of the calling thread (the debugger evaluates the requests of the IDE
+    # in a thread which runs parallel to other threads of the debugged process).
+    calls: int = 0
+    wall_total: float = 0.0
+    cpu_total: float = 0.0
+    wall_max: float = 0.0
+    wall_last: float = 0.0
+    cpu_last: float = 0.0
+
+    def add(self, wall: float, cpu: float):
+        self.calls += 1
+        self.wall_total += wall
+        self.cpu_total += cpu
+        self.wall_max = max(self.wall_max, wall)
+        self.wall_last = wall
+        self.cpu_last = cpu
+
+
+class PerfStats:
+    # Records the wall and CPU time spent in the stages of a table source (sort, filter, styling, formatting, ...).
+    # Stages can be nested, the time of a nested stage is also included in the time of the enclosing stage.
+
+    def __init__(self):
+        self._stages: Dict[str, StageTimes] = {}
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - wall_start, time.thread_time() - cpu_start)
+
+    def record(self, stage: str, wall: float, cpu: float):
+        times = self._stages.get(stage, None)
+        if times is None:
+            times = self._stages[stage] = StageTimes()
+        times.add(wall, cpu)
+
+    def get(self, stage: str) -> StageTimes:
+        return self._stages.get(stage, StageTimes())
+
+    def reset(self):
+        self._stages.clear()
+
+    def to_dict(self) -> Dict[str, StageTimes]:
+        return dict(self._stages)
@@ -0,0 +1,143 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import cProfile
+import pstats
+import threading
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass
+from io import StringIO
+from typing import Any, Callable, List, Optional
+
+
+@dataclass(frozen=True)
+class ProfileRecord:
+    call: str
+    # output of "pstats", sorted by the cumulative time
+    stats: str
+    # only available if memory tracing was enabled,
+    # the peak only if the tracing session was started by the profiler
+    peak_memory: Optional[int] = None
+    top_allocations: Optional[List[str]] = None
+
+
+class _MemoryTracing:
+    # "tracemalloc" is process-wide. A tracing session is only started if no other session (for example one of
+    # the user) is active, and stopped when the last profiled call which uses it has finished. A session of
+    # another owner is never reset or stopped.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active_calls = 0
+        self._owns_session = False
+
+    def enter(self) -> bool:
+        # Returns True if the session is owned by the profiler.
+        with self._lock:
+            if self._active_calls == 0:
+                self._owns_session = not tracemalloc.is_tracing()
+                if self._owns_session:
+                    tracemalloc.start()
+            self._active_calls += 1
+            return self._owns_session
+
+    def exit(self):
+        with self._lock:
+            self._active_calls -= 1
+            if self._active_calls == 0 and self._owns_session:
+                tracemalloc.stop()
+                self._owns_session = False
+
+
+_MEMORY_TRACING = _MemoryTracing()
+
+
+class CallProfiler:
+    # Profiles calls with "cProfile" (and optionally "tracemalloc").
+    # Only the records of the last "max_records" calls are kept.
+    #
+    # The methods of a table source are also called from background threads (see "ChunkPrefetcher"),
+    # therefore the detection of nested calls is done per thread.
+
+    def __init__(self,
+                 trace_memory: bool = False,
+                 max_records: int = 20,
+                 max_stats_lines: int = 40,
+                 max_allocations: int = 10,
+                 ):
+        self._trace_memory = trace_memory
+        self._records = deque(maxlen=max_records)
+        self._max_stats_lines = max_stats_lines
+        self._max_allocations = max_allocations
+        self._thread_state = threading.local()
+
+    @property
+    def records(self) -> List[ProfileRecord]:
+        return list(self._records)
+
+    def wrap(self, call: str, func: Callable) -> Callable:
+        def profiled(*args, **kwargs):
+            return self.run(call, func, *args, **kwargs)
+
+        return profiled
+
+    def run(self, call: str, func: Callable, *args, **kwargs) -> Any:
+        if getattr(self._thread_state, "is_profiling", False):
+            # nested calls are already part of the profile of the outer call
+            return func(*args, **kwargs)
+
+        owns_tracing = _MEMORY_TRACING.enter() if self._trace_memory else False
+
+        profile: Optional[cProfile.Profile] = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # another profiler is already active
+            profile = None
+
+        self._thread_state.is_profiling = True
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._thread_state.is_profiling = False
+            if profile is not None:
+                profile.disable()
+            peak_memory = None
+            top_allocations = None
+            if self._trace_memory:
+                try:
+                    if owns_tracing:
+                        # the peak of a foreign session isn't related to this call
+                        peak_memory = tracemalloc.get_traced_memory()[1]
+                    if tracemalloc.is_tracing():
+                        top_allocations = self._get_top_allocations(tracemalloc.take_snapshot())
+                finally:
+                    _MEMORY_TRACING.exit()
+            self._records.append(
+                ProfileRecord(
+                    call=call,
+                    stats="" if profile is None else self._format_stats(profile),
+                    peak_memory=peak_memory,
+                    top_allocations=top_allocations,
+                )
+            )
+
+    def _format_stats(self, profile: cProfile.Profile) -> str:
+        output = StringIO()
+        pstats.Stats(profile, stream=output).sort_stats("cumulative").print_stats(self._max_stats_lines)
+        return output.getvalue()
+
+    def _get_top_allocations(self, snapshot: tracemalloc.Snapshot) -> List[str]:
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        return [str(s) for s in snapshot.statistics("lineno")[:self._max_allocations]]
@@ -12,12 +12,24 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 import inspect
+import sys
+import threading
+import time
 import typing
 from abc import ABC, abstractmethod
-from typing import Any, List, Optional, Union
-
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from cms_rendner_sdfv.base.caller_namespace import CallerNamespace
+from cms_rendner_sdfv.base.chunk_delta import create_table_frame_delta
+from cms_rendner_sdfv.base.chunk_prefetcher import ChunkPrefetcher, get_prefetch_regions
+from cms_rendner_sdfv.base.payload_buffers import MappedPayloadRing
+from cms_rendner_sdfv.base.perf_stats import PerfStats
+from cms_rendner_sdfv.base.profiler import CallProfiler
+from cms_rendner_sdfv.base.temp_vars_registry import TempVarsRegistry
 from cms_rendner_sdfv.base.transforms import to_json
-from cms_rendner_sdfv.base.types import CreateTableSourceConfig, CreateTableSourceFailure, Region, TableFrame, \
+from cms_rendner_sdfv.base.types import ChunkDigest, CreateTableSourceConfig, CreateTableSourceFailure, FrameChange, \
+    FrameDigest, QuickFilter, QuickFilterOp, Region, ScrollDirection, TableFrame, TableFrameDelta, \
     TableFrameValidationResult, TableSourceKind, TableStructure
 
 
@@ -35,11 +47,17 @@ class AbstractVisibleFrame(ABC):
 
 VF = typing.TypeVar('VF', bound=AbstractVisibleFrame)
 
+# number of rows generated by the first step of "generate_until_deadline"
+_MIN_ROWS_PER_STEP = 8
+
 
 class AbstractTableFrameGenerator(ABC):
     def __init__(self, visible_frame: VF):
         self._visible_frame: VF = visible_frame
         self._exclude_column_describe: bool = False
+        self._cell_max_str_len: Optional[int] = None
+        self._cell_max_str_len_per_column: Dict[int, int] = {}
+        self._perf_stats: PerfStats = PerfStats()
 
     @abstractmethod
     def generate(self,
@@ -52,6 +70,22 @@ class AbstractTableFrameGenerator(ABC):
     def exclude_column_describe(self, exclude: bool):
         self._exclude_column_describe = exclude
 
+    def set_perf_stats(self, perf_stats: PerfStats):
+        # The stages of the generator are recorded into "perf_stats".
+        self._perf_stats = perf_stats
+
+    def set_cell_max_str_len(self, max_str_len: Optional[int], per_column: Optional[Dict[int, int]] = None):
+        # Limits the length of the formatted cell values (a truncated value ends with "…", which is included).
+        # The keys of "per_column" are the indices of the visible columns. A value of None uses the
+        # default length of the generator.
+        self._cell_max_str_len = max_str_len
+        self._cell_max_str_len_per_column = {} if per_column is None else per_column
+
+    def _get_cell_max_str_len(self, col: int, default: int) -> int:
+        # "col" is the index of a visible column
+        max_str_len = self._cell_max_str_len_per_column.get(col, self._cell_max_str_len)
+        return default if max_str_len is None else max_str_len
+
     def generate_by_combining_chunks(self,
                                      rows_per_chunk: int,
                                      cols_per_chunk: int,
@@ -95,6 +129,61 @@ class AbstractTableFrameGenerator(ABC):
 
         return result if result is not None else TableFrame(index_labels=[], columns=[], legend=None, cells=[])
 
+    def generate_until_deadline(self,
+                                deadline: float,
+                                region: Region = None,
+                                exclude_row_header: bool = False,
+                                exclude_col_header: bool = False,
+                                resume_from: Optional[TableFrame] = None,
+                                ) -> TableFrame:
+        # Generates the region in steps of rows until the "deadline" (a value of "time.perf_counter()") is reached.
+        # At least one step is generated. If the region isn't completed, the returned frame contains the rows
+        # generated so far and the "remaining_region". Passing such a frame as "resume_from" continues the generation
+        # with the remaining region ("region" is ignored in that case).
+        if resume_from is None:
+            result = None
+            remaining = self._visible_frame.region.get_bounded_region(
+                self._visible_frame.region if region is None else region,
+            )
+        else:
+            # copy, the lists are extended by the following steps
+            result = replace(
+                resume_from,
+                index_labels=None if resume_from.index_labels is None else list(resume_from.index_labels),
+                cells=list(resume_from.cells),
+            )
+            remaining = resume_from.remaining_region
+
+        rows_per_step = _MIN_ROWS_PER_STEP
+        while True:
+            step_start = time.perf_counter()
+            rows = min(rows_per_step, remaining.rows)
+            step_table = self.generate(
+                region=Region(remaining.first_row, remaining.first_col, rows, remaining.cols),
+                exclude_row_header=exclude_row_header,
+                # request column headers only once
+                exclude_col_header=exclude_col_header or result is not None,
+            )
+            if result is None:
+                result = step_table
+            else:
+                if result.index_labels is not None and step_table.index_labels:
+                    result.index_labels.extend(step_table.index_labels)
+                result.cells.extend(step_table.cells)
+            remaining = Region(remaining.first_row + rows, remaining.first_col, remaining.rows - rows, remaining.cols)
+
+            now = time.perf_counter()
+            if remaining.rows <= 0 or now >= deadline:
+                break
+            # size the next step to use about half of the remaining time
+            seconds_per_row = (now - step_start) / max(rows, 1)
+            if seconds_per_row > 0:
+                rows_per_step = max(_MIN_ROWS_PER_STEP, int((deadline - now) / 2 / seconds_per_row))
+            else:
+                rows_per_step = remaining.rows
+
+        return replace(result, remaining_region=remaining if remaining.rows > 0 else None)
+
 
 class TableFrameValidator:
     def __init__(self, frame_region: Region, generator: AbstractTableFrameGenerator):
@@ -121,9 +210,26 @@ class TableFrameValidator:
 
 
 class AbstractTableSourceContext(ABC):
+    def __init__(self):
+        self._perf_stats: PerfStats = PerfStats()
+
+    @property
+    def perf_stats(self) -> PerfStats:
+        return self._perf_stats
+
     def set_sort_criteria(self, sort_by_column_index: Optional[List[int]], sort_ascending: Optional[List[bool]]):
         pass
 
+    def set_quick_filters(self, quick_filters: List[QuickFilter]):
+        pass
+
+    def set_column_index_budget(self, max_bytes: int):
+        pass
+
+    def clear_caches(self):
+        # called if the values of the source frame have been modified
+        pass
+
     @property
     @abstractmethod
     def visible_frame(self) -> AbstractVisibleFrame:
@@ -137,6 +243,15 @@ class AbstractTableSourceContext(ABC):
     def get_table_frame_generator(self) -> AbstractTableFrameGenerator:
         pass
 
+    def get_memory_usage(self) -> int:
+        # Returns the estimated number of bytes allocated by the context (e.g. cached intermediate results).
+        # The source data isn't included, it is owned by the caller and not freed when the context is dropped.
+        return 0
+
+    def create_frame_digest(self) -> Optional[FrameDigest]:
+        # Returns a digest of the current state of the source data, None if changes can't be detected.
+        return None
+
     def get_table_frame_validator(self) -> TableFrameValidator:
         generator = self.get_table_frame_generator()
         generator.exclude_column_describe(True)
@@ -145,19 +260,67 @@ class AbstractTableSourceContext(ABC):
 
 T = typing.TypeVar('T', bound=AbstractTableSourceContext)
 
+# number of chunks prefetched per direction, if not specified otherwise
+DEFAULT_PREFETCH_DEPTH = 2
+
+# methods used to inspect a table source, "get_memory_usage" and "dispose" are also called by the TEMP_VARS registry
+_NOT_PROFILED_METHODS = (
+    "dispose",
+    "enable_profiling",
+    "get_profile_records",
+    "get_memory_usage",
+    "get_perf_stats",
+    "reset_perf_stats",
+)
+
 
 class AbstractTableSource(ABC):
     def __init__(self, kind: TableSourceKind, context: T, fingerprint: str):
         self._kind = kind
         self._context = context
         self._fingerprint = fingerprint
+        self._profiler: Optional[CallProfiler] = None
+        # request args and result of the last chunk computation which exceeded its time budget
+        self._partial_chunk: Optional[Tuple[tuple, TableFrame]] = None
+        # the context isn't thread-safe, all computations which use it have to hold the lock
+        # (chunks can be computed on a background thread, see "set_viewport")
+        self._lock = threading.RLock()
+        self._prefetcher: Optional[ChunkPrefetcher] = None
+        self._payload_ring: Optional[MappedPayloadRing] = None
+        # digest of the data at the time of the last change detection (see "detect_frame_change")
+        self._frame_digest: Optional[FrameDigest] = None
+
+    def enable_profiling(self, profiler: CallProfiler):
+        # Profiles all following calls of the public methods of the table source.
+        self._profiler = profiler
+        for name in dir(type(self)):
+            if name.startswith("_") or name in _NOT_PROFILED_METHODS:
+                continue
+            method = getattr(self, name)
+            if callable(method):
+                setattr(self, name, profiler.wrap(name, method))
+
+    def get_profile_records(self) -> str:
+        # Returns the records of the last profiled calls as JSON (an empty list if profiling isn't enabled).
+        return to_json([] if self._profiler is None else self._profiler.records)
 
     def get_kind(self) -> TableSourceKind:
         return self._kind
 
-    @staticmethod
-    def jsonify(data: Any) -> str:
-        return to_json(data)
+    def jsonify(self, data: Any) -> str:
+        with self._context.perf_stats.measure("jsonify"):
+            return to_json(data)
+
+    def jsonify_to_buffer(self, data: Any) -> str:
+        # Writes the JSON of "data" (UTF-8 encoded) into a memory-mapped file, instead of returning it as a string,
+        # and returns the location of the payload as JSON: {path, offset, length}.
+        # The payload has to be read before further payloads overwrite the buffer (see "MappedPayloadRing").
+        with self._context.perf_stats.measure("jsonify"):
+            payload = to_json(data).encode("utf-8")
+        with self._context.perf_stats.measure("write_payload_buffer"):
+            if self._payload_ring is None:
+                self._payload_ring = MappedPayloadRing()
+            return to_json(self._payload_ring.write(payload))
 
     def get_org_indices_of_visible_columns(self, part_start: int, max_columns: int) -> List[int]:
         return self._context.visible_frame.get_column_indices(part_start, max_columns)
@@ -165,11 +328,115 @@ class AbstractTableSource(ABC):
     def get_table_structure(self) -> TableStructure:
         return self._context.get_table_structure(self._fingerprint)
 
+    def get_memory_usage(self) -> int:
+        return self._context.get_memory_usage()
+
+    def dispose(self):
+        # Called when the table source is removed from the TEMP_VARS registry.
+        self._cancel_prefetch()
+        if self._payload_ring is not None:
+            self._payload_ring.close()
+            self._payload_ring = None
+
+    def get_frame_digest(self) -> Optional[FrameDigest]:
+        with self._lock, self._context.perf_stats.measure("frame_digest"):
+            return self._context.create_frame_digest()
+
+    def detect_frame_change(self, previous_digest: Union[FrameDigest, dict, None] = None) -> str:
+        # Detects if the source data was modified in the meantime, for example by the code executed between two
+        # debugger steps, and returns one of the values of "FrameChange". The current digest is compared with
+        # "previous_digest" or, if not specified, with the digest of the previous call (the first call records
+        # the digest and reports "unchanged").
+        #
+        # The values are only sampled, a modification of a single not sampled cell can stay undetected.
+        # Prefetched and partially computed chunks are discarded if a change is detected.
+        current = self.get_frame_digest()
+        if current is None:
+            return FrameChange.STRUCTURE_CHANGED.value
+        if isinstance(previous_digest, dict):
+            previous_digest = FrameDigest(**previous_digest)
+        elif previous_digest is None:
+            previous_digest = current if self._frame_digest is None else self._frame_digest
+        self._frame_digest = current
+        change = current.compare(previous_digest)
+        if change != FrameChange.UNCHANGED:
+            self._cancel_prefetch()
+            with self._lock:
+                self._partial_chunk = None
+                self._context.clear_caches()
+        return change.value
+
+    def set_viewport(self,
+                     first_row: int,
+                     first_col: int,
+                     rows: int,
+                     cols: int,
+                     scroll_direction: Union[ScrollDirection, str, None] = None,
+                     prefetch_depth: int = DEFAULT_PREFETCH_DEPTH,
+                     ):
+        # Hint about the region displayed by the IDE. The table frames of the next "prefetch_depth" regions,
+        # of the same size, in scroll direction are computed on a background thread. A following
+        # "compute_chunk_table_frame" for one of these regions returns the already computed table frame.
+        #
+        # Without a scroll direction the regions above and below the viewport are prefetched.
+        # A "prefetch_depth" of 0 cancels the prefetching.
+        direction = ScrollDirection[scroll_direction.upper()] if isinstance(scroll_direction, str) else scroll_direction
+        regions = get_prefetch_regions(
+            Region(first_row, first_col, rows, cols),
+            self._context.visible_frame.region,
+            direction,
+            prefetch_depth,
+        )
+        if self._prefetcher is None:
+            if not regions:
+                return
+            self._prefetcher = ChunkPrefetcher(self._compute_prefetched_chunk, max(16, 4 * prefetch_depth))
+        self._prefetcher.prefetch(regions)
+
+    def _compute_prefetched_chunk(self, region: Region) -> TableFrame:
+        # runs on the background thread of the prefetcher
+        with self._lock:
+            with self._context.perf_stats.measure("prefetch_chunk"):
+                return self._context.get_table_frame_generator().generate(region=region)
+
+    def _cancel_prefetch(self):
+        if self._prefetcher is not None:
+            self._prefetcher.cancel()
+
+    def get_perf_stats(self) -> str:
+        # Returns the recorded times (in seconds) per stage as JSON:
+        # {stage: {calls, wall_total, cpu_total, wall_max, wall_last, cpu_last}}
+        return to_json(self._context.perf_stats.to_dict())
+
+    def reset_perf_stats(self):
+        self._context.perf_stats.reset()
+
     def set_sort_criteria(self,
                           by_column_index: Optional[List[int]] = None,
                           ascending: Optional[List[bool]] = None,
                           ):
-        self._context.set_sort_criteria(by_column_index, ascending)
+        self._cancel_prefetch()
+        with self._lock:
+            self._partial_chunk = None
+            self._context.set_sort_criteria(by_column_index, ascending)
+
+    def set_quick_filters(self, quick_filters: Optional[List[Union[QuickFilter, dict]]] = None):
+        filters = []
+        for qf in quick_filters or []:
+            if isinstance(qf, dict):
+                op = qf.get("op", None)
+                qf = QuickFilter(**{**qf, "op": QuickFilterOp[op.upper()] if isinstance(op, str) else op})
+            filters.append(qf)
+        self._cancel_prefetch()
+        with self._lock:
+            self._partial_chunk = None
+            self._context.set_quick_filters(filters)
+
+    def set_column_index_budget(self, max_bytes: int):
+        # Quick filters are answered by sorted per-column indexes, as long as the indexes fit into the budget.
+        # The indexes are opt-in (the default budget is 0), they are built on first use.
+        with self._lock:
+            self._context.set_column_index_budget(max_bytes)
 
     def compute_chunk_table_frame(self,
                                   first_row: int,
@@ -177,16 +444,94 @@ class AbstractTableSource(ABC):
                                   rows: int,
                                   cols: int,
                                   exclude_row_header: bool = False,
-                                  exclude_col_header: bool = False
+                                  exclude_col_header: bool = False,
+                                  cell_max_str_len: Optional[int] = None,
+                                  cell_max_str_len_per_column: Optional[Dict[int, int]] = None,
+                                  time_budget: Optional[float] = None,
                                   ) -> TableFrame:
-        return self._context.get_table_frame_generator().generate(
-            region=Region(first_row, first_col, rows, cols),
-            exclude_row_header=exclude_row_header,
-            exclude_col_header=exclude_col_header,
+        # "cell_max_str_len" and "cell_max_str_len_per_column" allow to request shorter previews of the cell values,
+        # for example only as many chars as fit into the displayed column. The full value of a single cell can be
+        # fetched afterwards via "get_cell_value".
+        #
+        # "time_budget" limits the time (in seconds) spent to compute the chunk. If the budget is exceeded, the
+        # returned frame contains only the rows computed so far and the "remaining_region". Repeating the same
+        # request continues the computation, the already computed rows are not computed again.
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        region = Region(first_row, first_col, rows, cols)
+        if self._prefetcher is not None and cell_max_str_len is None and cell_max_str_len_per_column is None:
+            prefetched = self._prefetcher.pop(region)
+            if prefetched is not None:
+                return self._exclude_headers(prefetched, exclude_row_header, exclude_col_header)
+
+        perf_stats = self._context.perf_stats
+        with self._lock, perf_stats.measure("compute_chunk_table_frame"):
+            generator = self._context.get_table_frame_generator()
+            generator.set_perf_stats(perf_stats)
+            generator.set_cell_max_str_len(cell_max_str_len, cell_max_str_len_per_column)
+            if deadline is None:
+                return generator.generate(
+                    region=region,
+                    exclude_row_header=exclude_row_header,
+                    exclude_col_header=exclude_col_header,
+                )
+
+            request = (region, exclude_row_header, exclude_col_header, cell_max_str_len, cell_max_str_len_per_column)
+            resume_from = None
+            if self._partial_chunk is not None and self._partial_chunk[0] == request:
+                resume_from = self._partial_chunk[1]
+            result = generator.generate_until_deadline(
+                deadline,
+                region=region,
+                exclude_row_header=exclude_row_header,
+                exclude_col_header=exclude_col_header,
+                resume_from=resume_from,
+            )
+            self._partial_chunk = None if result.remaining_region is None else (request, result)
+            return result
+
+    def compute_chunk_delta(self,
+                            first_row: int,
+                            first_col: int,
+                            rows: int,
+                            cols: int,
+                            previous_digest: Union[ChunkDigest, dict, None] = None,
+                            ) -> TableFrameDelta:
+        # Computes the chunk and returns only the index labels, columns and cells which differ from the chunk
+        # described by "previous_digest" (the digest of a previous delta of the same region). For example, to
+        # refresh the displayed chunks of a table source which was re-created after a debugger step.
+        #
+        # The returned delta contains the complete table frame if no previous digest of the same region is given.
+        table_frame = self.compute_chunk_table_frame(first_row, first_col, rows, cols)
+        with self._context.perf_stats.measure("compute_chunk_delta"):
+            return create_table_frame_delta(Region(first_row, first_col, rows, cols), table_frame, previous_digest)
+
+    @staticmethod
+    def _exclude_headers(table_frame: TableFrame, exclude_row_header: bool, exclude_col_header: bool) -> TableFrame:
+        # same result as generating the table frame with the excluded headers
+        return replace(
+            table_frame,
+            index_labels=[] if exclude_row_header and table_frame.index_labels is not None else table_frame.index_labels,
+            columns=[] if exclude_col_header else table_frame.columns,
+            legend=None if exclude_row_header and exclude_col_header else table_frame.legend,
         )
 
+    def get_cell_value(self, row: int, col: int, max_len: Optional[int] = None) -> str:
+        # Returns the formatted value of a visible cell, "max_len" of None returns the untruncated value.
+        with self._lock:
+            generator = self._context.get_table_frame_generator()
+            generator.exclude_column_describe(True)
+            generator.set_cell_max_str_len(sys.maxsize if max_len is None else max_len)
+            table_frame = generator.generate(
+                region=Region(row, col, 1, 1),
+                exclude_row_header=True,
+                exclude_col_header=True,
+            )
+        if not table_frame.cells or not table_frame.cells[0]:
+            raise IndexError(f"Cell ({row}, {col}) is out of bounds.")
+        return table_frame.cells[0][0].value
+
 
-TEMP_VARS = {}
+TEMP_VARS = TempVarsRegistry()
 
 
 class AbstractTableSourceFactory(ABC):
@@ -203,13 +548,18 @@ class AbstractTableSourceFactory(ABC):
                 config = CreateTableSourceConfig()
 
             # use globals and locals of previous frame (caller frame)
-            caller_globals = {}
             caller_frame = inspect.currentframe().f_back
-            if caller_frame:
-                caller_globals.update(caller_frame.f_globals)
-                caller_globals.update(caller_frame.f_locals)
+            caller_namespace = CallerNamespace(
+                caller_frame.f_globals if caller_frame else {},
+                caller_frame.f_locals if caller_frame else {},
+            )
 
-            table_source = self._create_internal(data_source, config, caller_globals)
+            profiler = None
+            if config.profiling:
+                profiler = CallProfiler(trace_memory=bool(config.profiling_trace_memory))
+                table_source = profiler.run("create", self._create_internal, data_source, config, caller_namespace)
+            else:
+                table_source = self._create_internal(data_source, config, caller_namespace)
             if not isinstance(table_source, AbstractTableSource):
                 if isinstance(table_source, CreateTableSourceFailure):
                     return to_json(table_source)
@@ -219,6 +569,9 @@ class AbstractTableSourceFactory(ABC):
                     f"Created table_source is of type: {actual_type}, expected: ${expected_type}."
                 )
 
+            if profiler is not None:
+                table_source.enable_profiling(profiler)
+
             if config.temp_var_slot_id is not None:
                 TEMP_VARS[config.temp_var_slot_id] = table_source
 
@@ -230,6 +583,6 @@ class AbstractTableSourceFactory(ABC):
     def _create_internal(self,
                          data_source: Any,
                          config: CreateTableSourceConfig,
-                         caller_globals: dict,
+                         caller_namespace: CallerNamespace,
                          ) -> Union[AbstractTableSource, CreateTableSourceFailure]:
         pass
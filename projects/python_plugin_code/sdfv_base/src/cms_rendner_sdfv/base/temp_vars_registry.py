@@ -0,0 +1,155 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Optional
+
+# number of evicted slot ids which are remembered to report the eviction
+_MAX_EVICTED_SLOT_IDS = 1000
+
+
+class EvictedSlotError(KeyError):
+    # Raised when an evicted entry is accessed. The IDE can recover from it by creating a new table source for the
+    # slot (the data of the evicted table source is gone).
+    pass
+
+
+def get_memory_usage(value: Any) -> int:
+    # Returns the estimated number of bytes held by a registered value.
+    # Table sources report only the memory allocated by themselves (see "AbstractTableSource.get_memory_usage"),
+    # the data of the caller isn't freed by an eviction. Values without such a method are not taken into account.
+    get_usage = getattr(value, "get_memory_usage", None)
+    return 0 if get_usage is None else int(get_usage())
+
+
+def dispose(value: Any):
+    # Releases the resources of a removed value, for example stops the background work of a table source
+    # (see "AbstractTableSource.dispose").
+    dispose_value = getattr(value, "dispose", None)
+    if dispose_value is not None:
+        dispose_value()
+
+
+class TempVarsRegistry(MutableMapping):
+    # Holds the values (table sources) created for the IDE by their slot id.
+    #
+    # The IDE removes an entry, via "pop(slot_id, None)", when the corresponding dialog is closed.
+    # In case this never happens (for example if the dialog crashed) the entry, and through it the
+    # data of the table source, would be kept alive until the debug session ends.
+    #
+    # The registry can't hold weak references to the entries because it is often the only owner of
+    # a table source. Instead, if a budget is set via "max_bytes" (opt-in), the least-recently-used entries
+    # are evicted as soon as the memory held by all entries exceeds the budget. The most recently used entry
+    # is never evicted. Accessing an evicted entry raises an "EvictedSlotError", to distinguish it from an
+    # unknown slot id.
+    #
+    # The memory of the entries is re-measured on each eviction check, because a table source
+    # can allocate additional memory during its lifetime (e.g. the permutation of a sorted frame).
+    #
+    # Removed values (deleted, replaced or evicted) are disposed.
+    #
+    # The registry is accessed by the debugger thread and the threads of the chunk server at the same time,
+    # all accesses to the entries are guarded by a lock.
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self._entries: Dict[str, Any] = OrderedDict()
+        self._max_bytes = max_bytes
+        self._evicted_count = 0
+        # slot id -> None, the most recently evicted slot ids
+        self._evicted_slot_ids: Dict[str, None] = OrderedDict()
+        # reentrant, "dispose" and "get_memory_usage" of an entry could access the registry
+        self._lock = threading.RLock()
+
+    @property
+    def max_bytes(self) -> Optional[int]:
+        return self._max_bytes
+
+    def set_max_bytes(self, max_bytes: Optional[int]):
+        # A value of None disables the eviction.
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._evict()
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            if key not in self._entries and key in self._evicted_slot_ids:
+                raise EvictedSlotError(f"The table source of slot '{key}' was evicted to free memory.")
+            value = self._entries[key]
+            self._entries.move_to_end(key)
+            return value
+
+    def __setitem__(self, key: str, value: Any):
+        with self._lock:
+            previous = self._entries.get(key, None)
+            if previous is not None and previous is not value:
+                dispose(previous)
+            self._evicted_slot_ids.pop(key, None)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def __delitem__(self, key: str):
+        with self._lock:
+            self._evicted_slot_ids.pop(key, None)
+            dispose(self._entries.pop(key))
+
+    def pop(self, key: str, *args) -> Any:
+        # the IDE removes the entry of a closed dialog, an evicted entry doesn't have to be reported anymore
+        with self._lock:
+            self._evicted_slot_ids.pop(key, None)
+            return super().pop(key, *args)
+
+    def is_evicted(self, key: str) -> bool:
+        with self._lock:
+            return key in self._evicted_slot_ids
+
+    def __iter__(self) -> Iterator[str]:
+        # iterates over a copy, the entries can be modified by other threads
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Any) -> bool:
+        # doesn't count as usage of the entry
+        return key in self._entries
+
+    def stats(self) -> Dict[str, Any]:
+        # The entries are listed from least to most recently used.
+        with self._lock:
+            entries = [{"slot_id": k, "bytes": get_memory_usage(v)} for k, v in self._entries.items()]
+            return {
+                "entries": entries,
+                "total_bytes": sum(e["bytes"] for e in entries),
+                "max_bytes": self._max_bytes,
+                "evicted_count": self._evicted_count,
+                "evicted_slot_ids": list(self._evicted_slot_ids),
+            }
+
+    def _evict(self):
+        # the caller holds the lock
+        if self._max_bytes is None or len(self._entries) < 2:
+            return
+        usage = {k: get_memory_usage(v) for k, v in list(self._entries.items())}
+        total_bytes = sum(usage.values())
+        while total_bytes > self._max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            dispose(self._entries.pop(key))
+            total_bytes -= usage.get(key, 0)
+            self._evicted_count += 1
+            self._evicted_slot_ids[key] = None
+            if len(self._evicted_slot_ids) > _MAX_EVICTED_SLOT_IDS:
+                self._evicted_slot_ids.popitem(last=False)
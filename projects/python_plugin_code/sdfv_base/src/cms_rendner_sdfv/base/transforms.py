@@ -12,8 +12,13 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 import json
+import struct
+import sys
+from array import array
 from dataclasses import asdict, is_dataclass
-from typing import Any
+from typing import Any, Dict, Iterable, List, Optional
+
+from cms_rendner_sdfv.base.types import Region, TableFrame, TableFrameCell, TableFrameColumn, TableFrameLegend
 
 
 class _CustomJSONEncoder(json.JSONEncoder):
@@ -25,3 +30,249 @@ class _CustomJSONEncoder(json.JSONEncoder):
 
 def to_json(data: Any, **kwargs) -> str:
     return json.dumps(data, **kwargs, cls=_CustomJSONEncoder)
+
+
+# Compact binary encoding of a TableFrame.
+#
+# All strings are stored once in a string table and referenced by their index, the css of the cells is
+# deduplicated in the same way (a cell references its style by id). Everything except the UTF-8 bytes of
+# the strings is encoded as unsigned 32-bit ints (little-endian):
+#
+#   magic "SDFB", version (1 byte)
+#   string table: count, byte length of each string, concatenated UTF-8 bytes
+#   ints: count, ints
+#
+# The ints describe the TableFrame (NONE marks a missing value, a str_list is: count, string refs):
+#   index_labels:     NONE | rows, str_list per row
+#   columns:          NONE | count, per column: dtype ref, str_list of labels, describe (NONE | count, key/value refs)
+#   legend:           NONE | str_list of index, str_list of column
+#   remaining_region: NONE | first_row, first_col, rows, cols
+#   styles:           count, per style: count, key/value refs
+#   cells:            rows, per row: cols, per cell: value ref, style id or NONE
+_BINARY_MAGIC = b"SDFB"
+_BINARY_VERSION = 1
+_NONE = 0xFFFFFFFF
+_U32 = struct.Struct("<I")
+
+
+def _create_u32_array(values: Iterable[int] = ()) -> array:
+    # the size of "I" is platform dependent (at least 2 bytes), it is 4 bytes on all supported platforms
+    result = array("I", values)
+    if result.itemsize != 4:
+        raise ValueError("Unsupported platform, array of type 'I' doesn't have 4 bytes per item.")
+    return result
+
+
+def _u32_array_to_bytes(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array("I", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _u32_array_from_bytes(data: bytes) -> array:
+    result = _create_u32_array()
+    result.frombytes(data)
+    if sys.byteorder == "big":
+        result.byteswap()
+    return result
+
+
+class _BinaryWriter:
+    def __init__(self):
+        self._strings: Dict[str, int] = {}
+        self._styles: Dict[tuple, int] = {}
+        self.ints = _create_u32_array()
+
+    def ref(self, s: Any) -> int:
+        if not isinstance(s, str):
+            s = str(s)
+        index = self._strings.get(s, None)
+        if index is None:
+            index = self._strings[s] = len(self._strings)
+        return index
+
+    def style_id(self, css: Optional[Dict[str, str]]) -> int:
+        if css is None:
+            return _NONE
+        key = tuple(css.items())
+        style_id = self._styles.get(key, None)
+        if style_id is None:
+            style_id = self._styles[key] = len(self._styles)
+        return style_id
+
+    def write_str_list(self, values: Optional[List[str]]):
+        if values is None:
+            self.ints.append(_NONE)
+        else:
+            self.ints.append(len(values))
+            self.ints.extend(self.ref(v) for v in values)
+
+    def write_styles(self):
+        self.ints.append(len(self._styles))
+        for key in self._styles:
+            self.ints.append(len(key))
+            for k, v in key:
+                self.ints.append(self.ref(k))
+                self.ints.append(self.ref(v))
+
+    def to_bytes(self) -> bytes:
+        encoded_strings = [s.encode("utf-8") for s in self._strings]
+        string_lengths = _create_u32_array(len(s) for s in encoded_strings)
+        return b"".join([
+            _BINARY_MAGIC,
+            bytes([_BINARY_VERSION]),
+            _U32.pack(len(encoded_strings)),
+            _u32_array_to_bytes(string_lengths),
+            b"".join(encoded_strings),
+            _U32.pack(len(self.ints)),
+            _u32_array_to_bytes(self.ints),
+        ])
+
+
+def to_binary(table_frame: TableFrame) -> bytes:
+    writer = _BinaryWriter()
+    ints = writer.ints
+
+    if table_frame.index_labels is None:
+        ints.append(_NONE)
+    else:
+        ints.append(len(table_frame.index_labels))
+        for labels in table_frame.index_labels:
+            writer.write_str_list(labels)
+
+    if table_frame.columns is None:
+        ints.append(_NONE)
+    else:
+        ints.append(len(table_frame.columns))
+        for column in table_frame.columns:
+            ints.append(writer.ref(column.dtype))
+            writer.write_str_list(column.labels)
+            if column.describe is None:
+                ints.append(_NONE)
+            else:
+                ints.append(len(column.describe))
+                for k, v in column.describe.items():
+                    ints.append(writer.ref(k))
+                    ints.append(writer.ref(v))
+
+    if table_frame.legend is None:
+        ints.append(_NONE)
+    else:
+        # the count is written by "write_str_list", a legend always has both lists
+        writer.write_str_list(table_frame.legend.index)
+        writer.write_str_list(table_frame.legend.column)
+
+    region = table_frame.remaining_region
+    if region is None:
+        ints.append(_NONE)
+    else:
+        ints.extend((region.first_row, region.first_col, region.rows, region.cols))
+
+    # the styles are written before the cells, therefore the cells are encoded into a separate array first
+    cell_ints = _create_u32_array([len(table_frame.cells)])
+    for row in table_frame.cells:
+        cell_ints.append(len(row))
+        for cell in row:
+            cell_ints.append(writer.ref(cell.value))
+            cell_ints.append(writer.style_id(cell.css))
+    writer.write_styles()
+    ints.extend(cell_ints)
+
+    return writer.to_bytes()
+
+
+class _BinaryReader:
+    def __init__(self, data: bytes):
+        if data[:len(_BINARY_MAGIC)] != _BINARY_MAGIC:
+            raise ValueError("Data is not a binary encoded TableFrame.")
+        version = data[len(_BINARY_MAGIC)]
+        if version != _BINARY_VERSION:
+            raise ValueError(f"Unsupported version: {version}")
+        offset = len(_BINARY_MAGIC) + 1
+
+        string_count, = _U32.unpack_from(data, offset)
+        offset += _U32.size
+        string_lengths = _u32_array_from_bytes(data[offset:offset + string_count * 4])
+        offset += string_count * 4
+        self._strings: List[str] = []
+        for length in string_lengths:
+            self._strings.append(data[offset:offset + length].decode("utf-8"))
+            offset += length
+
+        int_count, = _U32.unpack_from(data, offset)
+        offset += _U32.size
+        self._ints = _u32_array_from_bytes(data[offset:offset + int_count * 4])
+        self._position = 0
+
+    def next_int(self) -> int:
+        value = self._ints[self._position]
+        self._position += 1
+        return value
+
+    def next_str(self) -> str:
+        return self._strings[self.next_int()]
+
+    def next_str_list(self, count: Optional[int] = None) -> Optional[List[str]]:
+        if count is None:
+            count = self.next_int()
+            if count == _NONE:
+                return None
+        return [self.next_str() for _ in range(count)]
+
+    def next_str_dict(self, count: int) -> Dict[str, str]:
+        result = {}
+        for _ in range(count):
+            # not as dict comprehension, Python 3.7 evaluates the value before the key
+            key = self.next_str()
+            result[key] = self.next_str()
+        return result
+
+
+def from_binary(data: bytes) -> TableFrame:
+    reader = _BinaryReader(data)
+
+    index_labels = None
+    rows = reader.next_int()
+    if rows != _NONE:
+        index_labels = [reader.next_str_list() for _ in range(rows)]
+
+    columns = None
+    count = reader.next_int()
+    if count != _NONE:
+        columns = []
+        for _ in range(count):
+            dtype = reader.next_str()
+            labels = reader.next_str_list()
+            describe_count = reader.next_int()
+            describe = None if describe_count == _NONE else reader.next_str_dict(describe_count)
+            columns.append(TableFrameColumn(dtype=dtype, labels=labels, describe=describe))
+
+    legend = None
+    count = reader.next_int()
+    if count != _NONE:
+        legend = TableFrameLegend(index=reader.next_str_list(count), column=reader.next_str_list())
+
+    remaining_region = None
+    first_row = reader.next_int()
+    if first_row != _NONE:
+        remaining_region = Region(first_row, reader.next_int(), reader.next_int(), reader.next_int())
+
+    styles = [reader.next_str_dict(reader.next_int()) for _ in range(reader.next_int())]
+
+    cells = []
+    for _ in range(reader.next_int()):
+        row = []
+        for _ in range(reader.next_int()):
+            value = reader.next_str()
+            style_id = reader.next_int()
+            row.append(TableFrameCell(value=value, css=None if style_id == _NONE else styles[style_id]))
+        cells.append(row)
+
+    return TableFrame(
+        index_labels=index_labels,
+        columns=columns,
+        cells=cells,
+        legend=legend,
+        remaining_region=remaining_region,
+    )
@@ -50,6 +50,51 @@ class TableFrame:
     columns: Union[None, List[TableFrameColumn]]
     cells: List[List[TableFrameCell]]
     legend: Union[None, TableFrameLegend] = None
+    # only set if the computation of the requested region was interrupted (time budget exceeded),
+    # contains the part of the region which wasn't computed yet
+    remaining_region: Union[None, 'Region'] = None
+
+
+@dataclass(frozen=True)
+class ChunkDigest:
+    # digests of the content of a computed chunk, per row and per column (see "chunk_delta.py")
+    region: 'Region'
+    index_labels: Optional[List[str]]
+    columns: Optional[List[str]]
+    rows: List[str]
+    cols: List[str]
+    legend: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class TableFrameCellChange:
+    # "row" and "col" are relative to the region of the chunk
+    row: int
+    col: int
+    cell: TableFrameCell
+
+
+@dataclass(frozen=True)
+class TableFrameColumnChange:
+    col: int
+    column: TableFrameColumn
+
+
+@dataclass(frozen=True)
+class TableFrameIndexLabelsChange:
+    row: int
+    labels: List[str]
+
+
+@dataclass(frozen=True)
+class TableFrameDelta:
+    digest: ChunkDigest
+    # the complete table frame, if the previous digest doesn't describe a chunk of the same region and size
+    table_frame: Optional[TableFrame] = None
+    # only set if "table_frame" is None
+    index_labels: Optional[List[TableFrameIndexLabelsChange]] = None
+    columns: Optional[List[TableFrameColumnChange]] = None
+    cells: Optional[List[TableFrameCellChange]] = None
 
 
 @dataclass(frozen=True)
@@ -132,6 +177,25 @@ class SortCriteria:
         return False
 
 
+class QuickFilterOp(Enum):
+    EQ = "eq"
+    IN = "in"
+    LT = "lt"
+    LE = "le"
+    GT = "gt"
+    GE = "ge"
+    BETWEEN = "between"
+
+
+@dataclass(frozen=True)
+class QuickFilter:
+    # index of a column of the visible frame (like the columns of the "SortCriteria")
+    column: int
+    op: QuickFilterOp
+    # a list of values for "IN", a list of the lower and upper bound (inclusive) for "BETWEEN"
+    value: Any = None
+
+
 @dataclass(frozen=True)
 class CreateTableSourceConfig:
     temp_var_slot_id: Optional[str] = None
@@ -139,6 +203,13 @@ class CreateTableSourceConfig:
     previous_fingerprint: Optional[str] = None
     filter_eval_expr: Optional[str] = None
     filter_eval_expr_provide_frame: Optional[bool] = None
+    # a previously used filter expression which is narrowed by "filter_eval_expr",
+    # the resulting filter is the one of the expression "(previous_filter_eval_expr) & (filter_eval_expr)"
+    previous_filter_eval_expr: Optional[str] = None
+    # profiles the creation and all following calls of the created table source (see "CallProfiler")
+    profiling: Optional[bool] = None
+    # additionally records the peak memory and the top allocations of each profiled call
+    profiling_trace_memory: Optional[bool] = None
 
 
 @dataclass(frozen=True)
@@ -151,3 +222,30 @@ class TableSourceKind(Enum):
     TABLE_SOURCE = 1
     PATCHED_STYLER = 2
 
+
+class ScrollDirection(Enum):
+    UP = "up"
+    DOWN = "down"
+    LEFT = "left"
+    RIGHT = "right"
+
+
+class FrameChange(Enum):
+    UNCHANGED = "unchanged"
+    # same structure, but (sampled) values or the underlying buffers differ
+    VALUES_CHANGED = "values_changed"
+    # identity, shape, labels or dtypes differ
+    STRUCTURE_CHANGED = "structure_changed"
+
+
+@dataclass(frozen=True)
+class FrameDigest:
+    structure: str
+    values: str
+
+    def compare(self, previous: Optional['FrameDigest']) -> FrameChange:
+        if previous is None or previous.structure != self.structure:
+            return FrameChange.STRUCTURE_CHANGED
+        if previous.values != self.values:
+            return FrameChange.VALUES_CHANGED
+        return FrameChange.UNCHANGED
@@ -0,0 +1,56 @@
+import pytest
+
+from cms_rendner_sdfv.base.caller_namespace import CallerNamespace, compile_expression
+
+
+def test_eval_resolves_locals_before_globals():
+    ns = CallerNamespace({"a": 1, "b": 2}, {"a": 10})
+    assert ns.eval("a + b") == 12
+
+
+def test_setitem_does_not_modify_caller_namespaces():
+    frame_globals = {"a": 1}
+    frame_locals = {"b": 2}
+    ns = CallerNamespace(frame_globals, frame_locals)
+    ns["_df"] = 3
+
+    assert ns.eval("_df + a + b") == 6
+    assert "_df" not in frame_globals
+    assert "_df" not in frame_locals
+
+
+def test_eval_resolves_locals_in_nested_scopes():
+    ns = CallerNamespace({}, {"limit": 2})
+    assert ns.eval("[x for x in range(5) if x < limit]") == [0, 1]
+
+
+def test_eval_with_nested_scopes_evaluates_expression_once():
+    calls = []
+    ns = CallerNamespace({"f": lambda: calls.append(1)}, {"x": 1})
+
+    assert ns.eval("(f(), [x for _ in range(1)])") == (None, [1])
+    assert len(calls) == 1
+
+    with pytest.raises(NameError):
+        ns.eval("(f(), [unknown for _ in range(1)])")
+    assert len(calls) == 2
+
+
+def test_eval_fails_on_unknown_name():
+    with pytest.raises(NameError):
+        CallerNamespace({}, {}).eval("unknown")
+
+
+def test_compiled_expressions_are_cached():
+    assert compile_expression("a > 1") is compile_expression("a > 1")
+
+
+def test_get_referenced_values():
+    threshold = 5
+    values = [1, 2]
+    ns = CallerNamespace({"threshold": threshold}, {"values": values})
+
+    referenced = ns.get_referenced_values("[v for v in values if v < threshold]")
+    assert [name for name, _ in referenced] == ["threshold", "values"]
+    assert referenced[0][1] is threshold
+    assert referenced[1][1] is values
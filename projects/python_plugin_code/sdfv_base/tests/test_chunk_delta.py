@@ -0,0 +1,77 @@
+import json
+from dataclasses import replace
+
+from cms_rendner_sdfv.base.chunk_delta import create_chunk_digest, create_table_frame_delta
+from cms_rendner_sdfv.base.transforms import to_json
+from cms_rendner_sdfv.base.types import Region, TableFrame, TableFrameCell, TableFrameCellChange, TableFrameColumn, \
+    TableFrameColumnChange, TableFrameIndexLabelsChange
+
+region = Region(0, 0, 3, 2)
+
+
+def _create_table_frame(values=None, css=None, labels=None, describe=None) -> TableFrame:
+    values = values if values is not None else [["1", "2"], ["3", "4"], ["5", "6"]]
+    return TableFrame(
+        index_labels=labels if labels is not None else [["a"], ["b"], ["c"]],
+        columns=[
+            TableFrameColumn(dtype="int64", labels=["col_0"], describe=describe),
+            TableFrameColumn(dtype="int64", labels=["col_1"]),
+        ],
+        cells=[[TableFrameCell(v, css=css) for v in row] for row in values],
+    )
+
+
+def test_without_previous_digest_the_complete_table_frame_is_returned():
+    table_frame = _create_table_frame()
+    delta = create_table_frame_delta(region, table_frame)
+    assert delta.table_frame == table_frame
+    assert delta.digest == create_chunk_digest(region, table_frame)
+
+
+def test_unchanged_chunk_has_empty_delta():
+    previous = create_chunk_digest(region, _create_table_frame())
+    delta = create_table_frame_delta(region, _create_table_frame(), previous)
+    assert delta.table_frame is None
+    assert delta.index_labels == []
+    assert delta.columns == []
+    assert delta.cells == []
+
+
+def test_only_changed_cells_are_returned():
+    previous = create_chunk_digest(region, _create_table_frame())
+    delta = create_table_frame_delta(region, _create_table_frame([["1", "2"], ["3", "x"], ["5", "6"]]), previous)
+    assert delta.table_frame is None
+    assert delta.cells == [TableFrameCellChange(row=1, col=1, cell=TableFrameCell("x"))]
+
+
+def test_changed_styles_are_returned():
+    previous = create_chunk_digest(region, _create_table_frame())
+    delta = create_table_frame_delta(region, _create_table_frame(css={"color": "red"}), previous)
+    assert len(delta.cells) == 6
+
+
+def test_changed_headers_are_returned():
+    previous = create_chunk_digest(region, _create_table_frame())
+    table_frame = _create_table_frame(labels=[["a"], ["x"], ["c"]], describe={"count": "3"})
+    delta = create_table_frame_delta(region, table_frame, previous)
+    assert delta.index_labels == [TableFrameIndexLabelsChange(row=1, labels=["x"])]
+    assert delta.columns == [TableFrameColumnChange(col=0, column=table_frame.columns[0])]
+    assert delta.cells == []
+
+
+def test_previous_digest_of_other_region_returns_complete_table_frame():
+    previous = create_chunk_digest(replace(region, first_row=3), _create_table_frame())
+    table_frame = _create_table_frame()
+    assert create_table_frame_delta(region, table_frame, previous).table_frame == table_frame
+
+
+def test_previous_digest_with_other_size_returns_complete_table_frame():
+    previous = create_chunk_digest(region, _create_table_frame([["1", "2"], ["3", "4"]], labels=[["a"], ["b"]]))
+    table_frame = _create_table_frame()
+    assert create_table_frame_delta(region, table_frame, previous).table_frame == table_frame
+
+
+def test_previous_digest_as_dict():
+    previous = json.loads(to_json(create_chunk_digest(region, _create_table_frame())))
+    delta = create_table_frame_delta(region, _create_table_frame([["1", "2"], ["3", "4"], ["x", "6"]]), previous)
+    assert delta.cells == [TableFrameCellChange(row=2, col=0, cell=TableFrameCell("x"))]
@@ -0,0 +1,61 @@
+import threading
+
+from cms_rendner_sdfv.base.chunk_prefetcher import ChunkPrefetcher, get_prefetch_regions
+from cms_rendner_sdfv.base.types import Region, ScrollDirection, TableFrame
+
+
+def _create_table_frame(region: Region) -> TableFrame:
+    return TableFrame(index_labels=None, columns=[], cells=[], legend=None, remaining_region=region)
+
+
+def test_get_prefetch_regions():
+    bounds = Region(0, 0, 100, 20)
+    viewport = Region(40, 10, 20, 5)
+
+    assert get_prefetch_regions(viewport, bounds, ScrollDirection.DOWN, 3) == [
+        Region(60, 10, 20, 5),
+        Region(80, 10, 20, 5),
+    ]
+    assert get_prefetch_regions(viewport, bounds, ScrollDirection.LEFT, 3) == [
+        Region(40, 5, 20, 5),
+        Region(40, 0, 20, 5),
+    ]
+    assert get_prefetch_regions(viewport, bounds, None, 2) == [
+        Region(60, 10, 20, 5),
+        Region(20, 10, 20, 5),
+        Region(80, 10, 20, 5),
+        Region(0, 10, 20, 5),
+    ]
+    assert get_prefetch_regions(viewport, bounds, ScrollDirection.RIGHT, 0) == []
+    assert get_prefetch_regions(Region(0, 0, 0, 0), bounds, None, 2) == []
+
+
+def test_prefetched_chunks_can_be_popped_once():
+    prefetcher = ChunkPrefetcher(_create_table_frame)
+
+    prefetcher.prefetch([Region(0, 0, 1, 1), Region(1, 0, 1, 1)])
+    prefetcher.join()
+
+    assert prefetcher.pop(Region(1, 0, 1, 1)) == _create_table_frame(Region(1, 0, 1, 1))
+    assert prefetcher.pop(Region(1, 0, 1, 1)) is None
+    assert prefetcher.pop(Region(5, 0, 1, 1)) is None
+
+
+def test_cancel_discards_chunk_in_progress():
+    started = threading.Event()
+    proceed = threading.Event()
+
+    def compute_chunk(region: Region) -> TableFrame:
+        started.set()
+        proceed.wait(5)
+        return _create_table_frame(region)
+
+    prefetcher = ChunkPrefetcher(compute_chunk)
+    prefetcher.prefetch([Region(0, 0, 1, 1), Region(1, 0, 1, 1)])
+    assert started.wait(5)
+    prefetcher.cancel()
+    proceed.set()
+    prefetcher.join()
+
+    assert prefetcher.pop(Region(0, 0, 1, 1)) is None
+    assert prefetcher.pop(Region(1, 0, 1, 1)) is None
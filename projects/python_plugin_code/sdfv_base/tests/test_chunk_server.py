@@ -0,0 +1,96 @@
+import json
+import os
+import socket
+import tempfile
+
+import pytest
+
+from cms_rendner_sdfv.base.chunk_server import ChunkServer, read_frame, write_frame
+from cms_rendner_sdfv.base.transforms import to_json
+from cms_rendner_sdfv.base.types import TableFrame, TableFrameCell
+
+
+class FakeTableSource:
+    def compute_chunk_table_frame(self, first_row: int, first_col: int, rows: int, cols: int) -> TableFrame:
+        return TableFrame(
+            index_labels=None,
+            columns=[],
+            cells=[[TableFrameCell(f"{r}/{c}") for c in range(first_col, first_col + cols)]
+                   for r in range(first_row, first_row + rows)],
+        )
+
+    def get_cell_value(self, row: int, col: int) -> str:
+        raise IndexError(f"Cell ({row}, {col}) is out of bounds.")
+
+    def jsonify(self, data) -> str:
+        return to_json(data)
+
+
+class ClientStub:
+    def __init__(self, sock: socket.socket, token: str):
+        self._sock = sock
+        self._next_id = 0
+        write_frame(sock, token.encode("utf-8"))
+
+    def call(self, slot_id: str, method: str, *args) -> dict:
+        self._next_id += 1
+        request = {"id": self._next_id, "slot_id": slot_id, "method": method, "args": args}
+        write_frame(self._sock, json.dumps(request).encode("utf-8"))
+        response = json.loads(read_frame(self._sock).decode("utf-8"))
+        assert response["id"] == self._next_id
+        return response
+
+
+@pytest.fixture
+def server():
+    chunk_server = ChunkServer({"slot": FakeTableSource()})
+    yield chunk_server
+    chunk_server.stop()
+
+
+def _connect(server: ChunkServer) -> socket.socket:
+    address = server.start()
+    return socket.create_connection((address.host, address.port), timeout=5)
+
+
+def test_serves_table_frames_of_registered_table_sources(server):
+    with _connect(server) as sock:
+        client = ClientStub(sock, server.address.token)
+
+        response = client.call("slot", "compute_chunk_table_frame", 1, 2, 2, 1)
+        assert response["result"] == json.loads(to_json(FakeTableSource().compute_chunk_table_frame(1, 2, 2, 1)))
+
+        # a connection can be used for multiple requests
+        response = client.call("slot", "compute_chunk_table_frame", 5, 0, 1, 1)
+        assert response["result"]["cells"] == [[{"value": "5/0", "css": None}]]
+
+
+def test_reports_errors(server):
+    with _connect(server) as sock:
+        client = ClientStub(sock, server.address.token)
+
+        assert "IndexError" in client.call("slot", "get_cell_value", 10, 10)["error"]
+        assert "KeyError" in client.call("unknown", "compute_chunk_table_frame", 0, 0, 1, 1)["error"]
+        assert "can't be called" in client.call("slot", "jsonify", {})["error"]
+
+
+def test_closes_connection_on_invalid_token(server):
+    with _connect(server) as sock:
+        write_frame(sock, b"invalid")
+        assert read_frame(sock) is None
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets are not supported")
+def test_serves_over_unix_domain_socket():
+    path = os.path.join(tempfile.mkdtemp(), "chunks.sock")
+    chunk_server = ChunkServer({"slot": FakeTableSource()}, unix_socket_path=path)
+    try:
+        address = chunk_server.start()
+        assert address.path == path
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(path)
+            response = ClientStub(sock, address.token).call("slot", "compute_chunk_table_frame", 0, 0, 1, 1)
+            assert response["result"]["cells"] == [[{"value": "0/0", "css": None}]]
+    finally:
+        chunk_server.stop()
+    assert not os.path.exists(path)
@@ -0,0 +1,18 @@
+from cms_rendner_sdfv.base.helpers import BoundedStrBuilder, truncate_str
+
+
+def test_bounded_str_builder_without_truncation():
+    builder = BoundedStrBuilder(5)
+    builder.append('ab')
+    builder.append('cde')
+    assert not builder.is_full
+    assert builder.build() == 'abcde'
+
+
+def test_bounded_str_builder_with_truncation():
+    builder = BoundedStrBuilder(5)
+    builder.append('abc')
+    builder.append('defghijk')
+    assert builder.is_full
+    builder.append('ignored')
+    assert builder.build() == truncate_str('abcdefghijk', 5)
@@ -1,6 +1,10 @@
+import hashlib
 import json
+import os
 import textwrap
 
+import pytest
+
 
 def test_importer_can_resolve_registered_plugin_modules():
     # generate dumps
@@ -51,3 +55,107 @@ def test_importer_can_resolve_registered_plugin_modules():
     a = ClassA()
     assert a.type() == type(a)
     assert isinstance(a.b(), ClassB)
+
+
+def test_importer_can_resolve_modules_of_compressed_dump(tmp_path):
+    package_dir = tmp_path / "cms_rendner_sdfv" / "package_c"
+    package_dir.mkdir(parents=True)
+    (package_dir / "class_c.py").write_text(textwrap.dedent("""
+        # comments are removed
+        class ClassC:
+            name = "ä-c"
+        """), encoding="utf8")
+    (package_dir / "nested").mkdir()
+    (package_dir / "nested" / "class_d.py").write_text("from cms_rendner_sdfv.package_c.class_c import ClassC\n")
+
+    from tools.generate_plugin_modules_dump import PackageStructureDumper
+    compressed_dump = PackageStructureDumper.to_compressed(str(tmp_path), "cms_rendner_sdfv")
+
+    # required to register the importer
+    # noinspection PyUnresolvedReferences
+    import importer.plugin_modules_importer
+
+    from cms_rendner_sdfv import package_registry
+    package_registry.register_package_dump("dump_package_c", compressed_dump)
+    assert "dump_package_c" in package_registry.get_registered_dump_ids()
+
+    from cms_rendner_sdfv.package_c.nested.class_d import ClassC
+    assert ClassC.name == "ä-c"
+
+
+def test_importer_uses_bytecode_cache(tmp_path):
+    import importlib
+    import marshal
+    import sys
+    from importlib.util import MAGIC_NUMBER
+
+    # required to register the importer
+    # noinspection PyUnresolvedReferences
+    import importer.plugin_modules_importer
+
+    from cms_rendner_sdfv import package_registry
+    package_registry.register_package_dump("dump_package_e", {
+        "cms_rendner_sdfv": {"package_e": {"module_e": "value = 'compiled'\n"}},
+    })
+    cache_dir = tmp_path / "cache"
+    package_registry.enable_bytecode_cache(cache_dir=str(cache_dir))
+    try:
+        from cms_rendner_sdfv.package_e import module_e
+        assert module_e.value == 'compiled'
+
+        cache_files = list(cache_dir.rglob("cms_rendner_sdfv.package_e.module_e.*.bin"))
+        assert len(cache_files) == 1
+        assert cache_files[0].parent.name == "dump_package_e"
+        assert cache_files[0].parent.parent.name == sys.implementation.cache_tag
+
+        # a valid cache entry is used instead of compiling the source
+        data = cache_files[0].read_bytes()
+        # header: magic number + sha1 hex digest of the source
+        header = data[:len(MAGIC_NUMBER) + 40]
+        cache_files[0].write_bytes(header + marshal.dumps(compile("value = 'cached'", "<string>", "exec")))
+        del sys.modules["cms_rendner_sdfv.package_e.module_e"]
+        module_e = importlib.import_module("cms_rendner_sdfv.package_e.module_e")
+        assert module_e.value == 'cached'
+
+        # an invalid cache entry is replaced
+        cache_files[0].write_bytes(b"corrupt")
+        del sys.modules["cms_rendner_sdfv.package_e.module_e"]
+        module_e = importlib.import_module("cms_rendner_sdfv.package_e.module_e")
+        assert module_e.value == 'compiled'
+        assert cache_files[0].read_bytes() == data
+    finally:
+        package_registry.enable_bytecode_cache(False)
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="requires posix permissions")
+def test_importer_ignores_bytecode_cache_accessible_by_others(tmp_path):
+    import marshal
+    import sys
+    from importlib.util import MAGIC_NUMBER
+
+    # required to register the importer
+    # noinspection PyUnresolvedReferences
+    import importer.plugin_modules_importer
+
+    from cms_rendner_sdfv import package_registry
+    source = "value = 'compiled'\n"
+    package_registry.register_package_dump("dump_package_f", {
+        "cms_rendner_sdfv": {"package_f": {"module_f": source}},
+    })
+
+    # a planted cache entry in a directory writable by others
+    cache_dir = tmp_path / "cache"
+    source_hash = hashlib.sha1(source.encode('utf8')).hexdigest()
+    entry = cache_dir / sys.implementation.cache_tag / "dump_package_f"
+    entry = entry / f"cms_rendner_sdfv.package_f.module_f.{source_hash}.bin"
+    entry.parent.mkdir(parents=True)
+    planted = marshal.dumps(compile("value = 'planted'", "<string>", "exec"))
+    entry.write_bytes(MAGIC_NUMBER + source_hash.encode('ascii') + planted)
+    cache_dir.chmod(0o777)
+
+    package_registry.enable_bytecode_cache(cache_dir=str(cache_dir))
+    try:
+        from cms_rendner_sdfv.package_f import module_f
+        assert module_f.value == 'compiled'
+    finally:
+        package_registry.enable_bytecode_cache(False)
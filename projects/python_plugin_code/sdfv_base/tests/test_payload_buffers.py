@@ -0,0 +1,55 @@
+import os
+import stat
+
+import pytest
+
+from cms_rendner_sdfv.base.payload_buffers import BUFFER_FILE_PREFIX, MappedPayloadRing, PayloadLocation, \
+    remove_stale_buffers
+
+
+def _read(location: PayloadLocation) -> bytes:
+    with open(location.path, "rb") as f:
+        f.seek(location.offset)
+        return f.read(location.length)
+
+
+def test_write_payloads_into_ring_of_buffers(tmp_path):
+    ring = MappedPayloadRing(directory=str(tmp_path), buffer_count=2, initial_buffer_size=8)
+
+    first = ring.write(b"first")
+    assert _read(first) == b"first"
+    second = ring.write(b"second payload exceeds the initial size")
+    assert _read(second) == b"second payload exceeds the initial size"
+    assert second.path != first.path
+
+    # the first buffer is reused
+    third = ring.write(b"third")
+    assert third.path == first.path
+    assert _read(third) == b"third"
+    assert len(ring.paths) == 2
+
+    ring.close()
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_remove_stale_buffers(tmp_path):
+    ring = MappedPayloadRing(directory=str(tmp_path))
+    location = ring.write(b"payload")
+    # a process with this pid can't exist
+    stale_file = tmp_path / f"{BUFFER_FILE_PREFIX}999999999-abc-0"
+    stale_file.write_bytes(b"stale")
+    other_file = tmp_path / "other"
+    other_file.write_bytes(b"other")
+
+    assert remove_stale_buffers(str(tmp_path)) == 1
+    assert sorted(os.listdir(str(tmp_path))) == sorted([os.path.basename(location.path), "other"])
+    ring.close()
+
+
+@pytest.mark.skipif(os.name == "nt", reason="requires posix permissions")
+def test_buffers_are_only_accessible_by_owner(tmp_path):
+    ring = MappedPayloadRing(directory=str(tmp_path))
+    location = ring.write(b"payload")
+
+    assert stat.S_IMODE(os.stat(location.path).st_mode) == 0o600
+    ring.close()
@@ -0,0 +1,35 @@
+import pytest
+
+from cms_rendner_sdfv.base.perf_stats import PerfStats, StageTimes
+
+
+def test_record_aggregates_calls_per_stage():
+    stats = PerfStats()
+
+    stats.record("sort", 0.5, 0.25)
+    stats.record("sort", 1.5, 1.0)
+
+    assert stats.get("sort") == StageTimes(
+        calls=2,
+        wall_total=2.0,
+        cpu_total=1.25,
+        wall_max=1.5,
+        wall_last=1.5,
+        cpu_last=1.0,
+    )
+    assert stats.get("unknown").calls == 0
+
+
+def test_measure_records_also_on_error():
+    stats = PerfStats()
+
+    with stats.measure("outer"):
+        with pytest.raises(ValueError):
+            with stats.measure("inner"):
+                raise ValueError()
+
+    assert list(stats.to_dict().keys()) == ["inner", "outer"]
+    assert stats.get("outer").wall_total >= stats.get("inner").wall_total
+
+    stats.reset()
+    assert stats.to_dict() == {}
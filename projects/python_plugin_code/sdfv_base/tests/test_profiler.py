@@ -0,0 +1,79 @@
+import threading
+import tracemalloc
+
+import pytest
+
+from cms_rendner_sdfv.base.profiler import CallProfiler
+
+
+def _allocate(size: int) -> int:
+    return len(bytearray(size))
+
+
+def test_profiler_keeps_only_the_last_records():
+    profiler = CallProfiler(max_records=2)
+
+    for size in range(3):
+        assert profiler.run(f"call_{size}", _allocate, size) == size
+
+    records = profiler.records
+    assert [r.call for r in records] == ["call_1", "call_2"]
+    assert "_allocate" in records[0].stats
+    assert records[0].peak_memory is None
+    assert records[0].top_allocations is None
+
+
+def test_profiler_traces_memory():
+    profiler = CallProfiler(trace_memory=True)
+
+    profiler.wrap("allocate", _allocate)(10_000_000)
+
+    record = profiler.records[0]
+    assert record.peak_memory >= 10_000_000
+    assert isinstance(record.top_allocations, list)
+
+
+def test_profiler_records_failed_calls():
+    profiler = CallProfiler()
+
+    def fail():
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        profiler.run("fail", fail)
+
+    assert profiler.records[0].call == "fail"
+
+
+def test_profiler_does_not_modify_foreign_tracing_session():
+    profiler = CallProfiler(trace_memory=True)
+
+    tracemalloc.start()
+    try:
+        _allocate(10_000_000)
+        peak = tracemalloc.get_traced_memory()[1]
+
+        profiler.run("allocate", _allocate, 10)
+
+        assert tracemalloc.is_tracing()
+        assert tracemalloc.get_traced_memory()[1] >= peak
+        assert profiler.records[0].peak_memory is None
+        assert isinstance(profiler.records[0].top_allocations, list)
+    finally:
+        tracemalloc.stop()
+
+
+def test_profiler_records_concurrent_calls():
+    profiler = CallProfiler()
+    barrier = threading.Barrier(2, timeout=5)
+
+    def call():
+        # both calls are active at the same time
+        barrier.wait()
+
+    thread = threading.Thread(target=profiler.run, args=("background", call))
+    thread.start()
+    profiler.run("main", call)
+    thread.join()
+
+    assert sorted(r.call for r in profiler.records) == ["background", "main"]
@@ -0,0 +1,63 @@
+import sys
+import textwrap
+
+import pytest
+
+from tools.source_minifier import minify_source, tree_shake
+
+
+@pytest.mark.skipif(sys.version_info < (3, 9), reason="minifying requires Python 3.9 or higher")
+def test_minify_source_removes_docstrings_and_annotations():
+    source = textwrap.dedent('''
+        """module docstring"""
+        from dataclasses import dataclass
+        from typing import List
+
+
+        @dataclass
+        class Point:
+            """class docstring"""
+            x: int
+            y: int = 0
+
+
+        def add(values: List[int], offset: int = 1) -> List[int]:
+            """function docstring"""
+            # a comment
+            result: List[int] = []
+            unused: int
+            for v in values:
+                result.append(v + offset)
+            return result
+
+
+        def empty_function():
+            """function docstring"""
+        ''')
+
+    minified = minify_source(source)
+
+    assert "docstring" not in minified
+    assert "comment" not in minified
+    assert "def add(values, offset=1):" in minified
+    assert "unused" not in minified
+    # annotations in class bodies are required by dataclasses
+    assert "x: int" in minified
+
+    namespace = {}
+    exec(minified, namespace)
+    assert namespace["add"]([1, 2]) == [2, 3]
+    assert namespace["Point"](1).y == 0
+    assert namespace["empty_function"]() is None
+
+
+def test_tree_shake_keeps_only_reachable_modules():
+    sources = {
+        "pkg.entry": "from pkg.a import A\n",
+        "pkg.a": "from . import b\nclass A: pass\n",
+        "pkg.b": "def f():\n    from pkg.sub.c import C\n",
+        "pkg.sub.c": "class C: pass\n",
+        "pkg.unused": "from pkg.a import A\n",
+    }
+
+    assert set(tree_shake(sources, ["pkg.entry"])) == {"pkg.entry", "pkg.a", "pkg.b", "pkg.sub.c"}
@@ -0,0 +1,156 @@
+import threading
+
+import pytest
+
+from cms_rendner_sdfv.base.temp_vars_registry import EvictedSlotError, TempVarsRegistry
+
+
+class FakeTableSource:
+    def __init__(self, memory_usage: int):
+        self.memory_usage = memory_usage
+        self.disposed = False
+
+    def get_memory_usage(self) -> int:
+        return self.memory_usage
+
+    def dispose(self):
+        self.disposed = True
+
+
+def test_registry_behaves_like_a_dict():
+    registry = TempVarsRegistry()
+    source = FakeTableSource(10)
+
+    registry["a"] = source
+    assert registry["a"] is source
+    assert "a" in registry
+    assert registry.pop("a", None) is source
+    assert registry.pop("a", None) is None
+    assert len(registry) == 0
+
+
+def test_registry_evicts_least_recently_used_entries():
+    registry = TempVarsRegistry(max_bytes=100)
+
+    registry["a"] = FakeTableSource(40)
+    registry["b"] = FakeTableSource(40)
+    # mark "a" as recently used
+    assert registry["a"] is not None
+    registry["c"] = FakeTableSource(40)
+
+    assert list(registry) == ["a", "c"]
+    assert registry.stats() == {
+        "entries": [{"slot_id": "a", "bytes": 40}, {"slot_id": "c", "bytes": 40}],
+        "total_bytes": 80,
+        "max_bytes": 100,
+        "evicted_count": 1,
+        "evicted_slot_ids": ["b"],
+    }
+
+
+def test_registry_keeps_most_recently_used_entry_even_if_over_budget():
+    registry = TempVarsRegistry(max_bytes=100)
+
+    registry["a"] = FakeTableSource(10)
+    registry["b"] = FakeTableSource(500)
+
+    assert list(registry) == ["b"]
+
+
+def test_registry_measures_memory_on_each_eviction_check():
+    registry = TempVarsRegistry(max_bytes=100)
+    source = FakeTableSource(10)
+
+    registry["a"] = source
+    registry["b"] = FakeTableSource(10)
+    # e.g. a table source allocated memory for a sort permutation
+    source.memory_usage = 95
+    registry.set_max_bytes(100)
+
+    assert list(registry) == ["b"]
+
+
+def test_registry_without_budget_never_evicts():
+    # no budget by default
+    registry = TempVarsRegistry()
+
+    registry["a"] = FakeTableSource(10 ** 12)
+    registry["b"] = FakeTableSource(10 ** 12)
+
+    assert list(registry) == ["a", "b"]
+
+
+def test_registry_disposes_removed_entries():
+    registry = TempVarsRegistry(max_bytes=100)
+    popped = FakeTableSource(10)
+    replaced = FakeTableSource(10)
+    evicted = FakeTableSource(80)
+
+    registry["a"] = popped
+    registry.pop("a", None)
+    assert popped.disposed
+
+    registry["a"] = replaced
+    registry["a"] = replaced
+    assert not replaced.disposed
+    registry["a"] = evicted
+    assert replaced.disposed
+
+    registry["b"] = FakeTableSource(80)
+    assert evicted.disposed
+    assert list(registry) == ["b"]
+
+
+def test_registry_reports_access_of_evicted_entries():
+    registry = TempVarsRegistry(max_bytes=100)
+
+    registry["a"] = FakeTableSource(80)
+    registry["b"] = FakeTableSource(80)
+
+    assert registry.is_evicted("a")
+    with pytest.raises(EvictedSlotError):
+        registry["a"].get_memory_usage()
+    # unknown slot ids are not reported as evicted
+    with pytest.raises(KeyError) as e:
+        registry["c"].get_memory_usage()
+    assert not isinstance(e.value, EvictedSlotError)
+
+    # the IDE closed the dialog
+    assert registry.pop("a", None) is None
+    assert not registry.is_evicted("a")
+
+    registry["a"] = FakeTableSource(80)
+    assert registry.is_evicted("b")
+    # the IDE recreated the table source
+    registry["b"] = FakeTableSource(80)
+    assert not registry.is_evicted("b")
+    assert registry.is_evicted("a")
+
+
+def test_registry_can_be_accessed_concurrently():
+    registry = TempVarsRegistry(max_bytes=10 ** 6)
+    for i in range(20):
+        registry[str(i)] = FakeTableSource(10)
+    errors = []
+    stop = threading.Event()
+
+    def read():
+        # like the threads of the chunk server
+        try:
+            while not stop.is_set():
+                for i in range(20):
+                    assert registry[str(i)] is not None
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=read)
+    thread.start()
+    try:
+        for _ in range(2000):
+            registry.stats()
+            registry.set_max_bytes(10 ** 6)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert errors == []
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from cms_rendner_sdfv.base.transforms import from_binary, to_binary, to_json
+from cms_rendner_sdfv.base.types import Region, TableFrame, TableFrameCell, TableFrameColumn, TableFrameLegend
+
+
+def test_to_json_of_dataclasses():
+    assert json.loads(to_json(Region(1, 2, 3, 4))) == {"first_row": 1, "first_col": 2, "rows": 3, "cols": 4}
+
+
+def test_binary_round_trip():
+    red = {"color": "red", "background-color": "#fff"}
+    table_frame = TableFrame(
+        index_labels=[["a", "x"], ["a", "y"]],
+        columns=[
+            TableFrameColumn(dtype="int64", labels=["col_0"], describe={"count": "2", "mean": "1.5"}),
+            TableFrameColumn(dtype="object", labels=["col_1 ✓"], describe=None),
+        ],
+        cells=[
+            [TableFrameCell("1", css=red), TableFrameCell("über")],
+            [TableFrameCell("2", css=dict(red)), TableFrameCell("", css={"color": "blue"})],
+        ],
+        legend=TableFrameLegend(index=["lev0", "lev1"], column=[]),
+        remaining_region=Region(2, 0, 8, 2),
+    )
+
+    assert from_binary(to_binary(table_frame)) == table_frame
+
+
+def test_binary_round_trip_of_empty_table_frame():
+    table_frame = TableFrame(index_labels=None, columns=None, cells=[])
+    assert from_binary(to_binary(table_frame)) == table_frame
+
+
+def test_binary_encoding_deduplicates_strings_and_styles():
+    css = {"color": "red"}
+    cells = [[TableFrameCell("same value", css=css) for _ in range(10)] for _ in range(100)]
+    table_frame = TableFrame(index_labels=[], columns=[], cells=cells)
+
+    encoded = to_binary(table_frame)
+    assert encoded.count(b"same value") == 1
+    assert encoded.count(b"color") == 1
+    assert len(encoded) < len(to_json(table_frame)) / 5
+
+
+def test_from_binary_rejects_other_data():
+    with pytest.raises(ValueError):
+        from_binary(b'{"cells": []}')
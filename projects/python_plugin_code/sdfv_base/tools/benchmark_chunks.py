@@ -0,0 +1,265 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Measures the latency and memory of the table source operations used by the plugin
+# ("create", "get_table_structure", "set_sort_criteria" and "compute_chunk_table_frame")
+# for synthetic frames of different shapes and dtypes.
+#
+# The report is written as JSON, reports of different projects (pandas/polars versions) can be compared
+# with "--compare".
+#
+# usage (run from the directory of a pandas or polars project, in the environment of its Pipfile):
+#   python ../../sdfv_base/tools/benchmark_chunks.py [--runs 5] [--scale 1.0] [--output report.json]
+#   python ../../sdfv_base/tools/benchmark_chunks.py --compare report_a.json report_b.json
+#
+# The peak memory is measured with "tracemalloc", allocations which are not made through the
+# Python memory allocators (e.g. the ones of polars) are not included.
+
+_SDFV_BASE_DIR = Path(__file__).resolve().parents[1]
+
+# rows and cols of a chunk requested by the plugin (roughly one screen)
+_CHUNK_ROWS = 60
+_CHUNK_COLS = 40
+
+
+def _create_pandas_frames(scale: float) -> Dict[str, Any]:
+    import numpy as np
+    import pandas as pd
+
+    def rows(n: int) -> int:
+        return max(1, int(n * scale))
+
+    rng = np.random.default_rng(123)
+    frames = {}
+
+    n = rows(1_000_000)
+    frames["tall"] = pd.DataFrame({f"col_{c}": rng.standard_normal(n) for c in range(5)})
+
+    n = rows(1_000)
+    frames["wide"] = pd.DataFrame(rng.integers(0, 1000, size=(n, 1_000)))
+
+    n = rows(100_000)
+    index = pd.MultiIndex.from_arrays([np.arange(n) // 10, np.arange(n) % 10], names=["outer", "inner"])
+    columns = pd.MultiIndex.from_product([[f"group_{g}" for g in range(10)], ["a", "b"]])
+    frames["multi_index"] = pd.DataFrame(rng.standard_normal((n, 20)), index=index, columns=columns)
+
+    n = rows(200_000)
+    words = np.array(["alpha", "beta", "gamma", "delta", "epsilon" * 20])
+    frames["object_heavy"] = pd.DataFrame({
+        "str": words[rng.integers(0, len(words), n)].astype(object),
+        "list": [[i, str(i)] for i in range(n)],
+        "dict": [{"key": i} for i in range(n)],
+        "mixed": [i if i % 2 else str(i) for i in range(n)],
+    })
+
+    n = rows(500_000)
+    frames["datetime"] = pd.DataFrame({
+        "naive": pd.date_range("2000-01-01", periods=n, freq="s"),
+        "tz_aware": pd.date_range("2000-01-01", periods=n, freq="min", tz="Europe/Berlin"),
+        "timedelta": pd.to_timedelta(rng.integers(0, 10 ** 12, n), unit="ns"),
+    })
+
+    n = rows(500_000)
+    frames["categorical"] = pd.DataFrame({
+        f"cat_{c}": pd.Categorical(rng.integers(0, 100, n).astype(str)) for c in range(3)
+    })
+
+    return frames
+
+
+def _create_polars_frames(scale: float) -> Dict[str, Any]:
+    # numpy is not a dependency of the polars project
+    import random
+    import polars as pl
+
+    def rows(n: int) -> int:
+        return max(1, int(n * scale))
+
+    rng = random.Random(123)
+    frames = {}
+
+    n = rows(1_000_000)
+    frames["tall"] = pl.DataFrame({f"col_{c}": [rng.gauss(0, 1) for _ in range(n)] for c in range(5)})
+
+    n = rows(1_000)
+    frames["wide"] = pl.DataFrame({f"col_{c}": [rng.randrange(1000) for _ in range(n)] for c in range(1_000)})
+
+    n = rows(200_000)
+    words = ["alpha", "beta", "gamma", "delta", "epsilon" * 20]
+    frames["object_heavy"] = pl.DataFrame({
+        "str": [rng.choice(words) for _ in range(n)],
+        "list": [[i, i + 1] for i in range(n)],
+        "struct": [{"key": i, "value": str(i)} for i in range(n)],
+    })
+
+    n = rows(500_000)
+    frames["datetime"] = pl.DataFrame({
+        # microseconds since 2000-01-01
+        "datetime": pl.Series([946_684_800_000_000 + i * 1_000_000 for i in range(n)]).cast(pl.Datetime("us")),
+        "duration": pl.Series([rng.randrange(10 ** 12) for _ in range(n)]).cast(pl.Duration("ns")),
+    })
+
+    n = rows(500_000)
+    frames["categorical"] = pl.DataFrame({
+        f"cat_{c}": pl.Series([str(rng.randrange(100)) for _ in range(n)]).cast(pl.Categorical) for c in range(3)
+    })
+
+    return frames
+
+
+def measure(func: Callable[[], Any], runs: int, setup: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    timings = []
+    for _ in range(runs):
+        if setup is not None:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    # separate run, tracing slows down the measured code
+    if setup is not None:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "runs": runs,
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "min_ms": round(min(timings) * 1000, 3),
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def _benchmark_frame(factory: Any, frame: Any, runs: int) -> Dict[str, Dict[str, Any]]:
+    table_source = factory.create(frame)
+    if isinstance(table_source, str):
+        raise RuntimeError(f"Creating the table source failed: {table_source}")
+
+    def sort():
+        table_source.set_sort_criteria([0], [False])
+
+    def reset_sort():
+        table_source.set_sort_criteria(None, None)
+
+    def compute_chunk():
+        table_source.compute_chunk_table_frame(0, 0, _CHUNK_ROWS, _CHUNK_COLS)
+
+    def compute_middle_chunk():
+        rows = table_source.get_table_structure().rows_count
+        table_source.compute_chunk_table_frame(rows // 2, 0, _CHUNK_ROWS, _CHUNK_COLS)
+
+    results = {
+        "create": measure(lambda: factory.create(frame), runs),
+        "get_table_structure": measure(table_source.get_table_structure, runs),
+        "set_sort_criteria": measure(sort, runs, setup=reset_sort),
+        "compute_chunk_table_frame": measure(compute_chunk, runs, setup=reset_sort),
+    }
+    sort()
+    results["compute_chunk_table_frame (sorted)"] = measure(compute_middle_chunk, runs)
+    return results
+
+
+def run_benchmarks(project_dir: str = ".", runs: int = 5, scale: float = 1.0) -> Dict[str, Any]:
+    project_path = Path(project_dir).resolve()
+    sys.path[:0] = [str(project_path / "src"), str(_SDFV_BASE_DIR / "src")]
+
+    if project_path.name.startswith("polars"):
+        import polars as lib
+        from cms_rendner_sdfv.polars.table_source_factory import TableSourceFactory
+        frames = _create_polars_frames(scale)
+    else:
+        import pandas as lib
+        from cms_rendner_sdfv.pandas.frame.table_source_factory import TableSourceFactory
+        frames = _create_pandas_frames(scale)
+
+    factory = TableSourceFactory()
+    results = []
+    for name, frame in frames.items():
+        for operation, measurement in _benchmark_frame(factory, frame, runs).items():
+            results.append({"frame": name, "shape": list(frame.shape), "operation": operation, **measurement})
+            print(f"{name:<14}{operation:<38}{measurement['median_ms']:>10.2f} ms", file=sys.stderr)
+
+    return {
+        "project": project_path.name,
+        "library": lib.__name__,
+        "library_version": lib.__version__,
+        "python_version": platform.python_version(),
+        "scale": scale,
+        "chunk": [_CHUNK_ROWS, _CHUNK_COLS],
+        "results": results,
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], other: Dict[str, Any]) -> List[Tuple[str, str, float, float]]:
+    # Returns (frame, operation, baseline_median_ms, other_median_ms) for all measurements found in both reports.
+    baseline_results = {(r["frame"], r["operation"]): r for r in baseline["results"]}
+    result = []
+    for r in other["results"]:
+        b = baseline_results.get((r["frame"], r["operation"]), None)
+        if b is not None:
+            result.append((r["frame"], r["operation"], b["median_ms"], r["median_ms"]))
+    return result
+
+
+def print_comparison(baseline_file: str, other_file: str):
+    with open(baseline_file, encoding="utf8") as f:
+        baseline = json.load(f)
+    with open(other_file, encoding="utf8") as f:
+        other = json.load(f)
+    print(f"{baseline['project']} ({baseline['library_version']}) -> {other['project']} ({other['library_version']})")
+    comparison = compare_reports(baseline, other)
+    frame_width = max([len(c[0]) for c in comparison], default=12) + 2
+    for frame, operation, baseline_ms, other_ms in comparison:
+        change = (other_ms / baseline_ms - 1) * 100 if baseline_ms else 0.0
+        print(f"  {frame:<{frame_width}}{operation:<38}{baseline_ms:>10.2f} ms {other_ms:>10.2f} ms {change:>+8.1f} %")
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="Benchmarks the chunk generation of a pandas/polars project.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="factor applied to the number of rows of all frames")
+    parser.add_argument("--output", help="file to write the JSON report to (default: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "OTHER"), help="compare two reports")
+    args = parser.parse_args()
+
+    if args.compare:
+        print_comparison(*args.compare)
+        return
+
+    report = json.dumps(run_benchmarks(runs=args.runs, scale=args.scale), indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf8") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    _main()
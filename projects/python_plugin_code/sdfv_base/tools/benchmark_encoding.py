@@ -0,0 +1,111 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import argparse
+import json
+import platform
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+from tools.benchmark_chunks import measure, print_comparison
+
+# Compares the payload size and the encode/decode time of the JSON and the binary encoding
+# ("to_json" and "to_binary") of table frames computed for unstyled and styled chunks.
+#
+# usage (run from the directory of a pandas project, in the environment of its Pipfile):
+#   PYTHONPATH=../../sdfv_base python ../../sdfv_base/tools/benchmark_encoding.py [--runs 5] [--chunks 60x40 500x100]
+#   PYTHONPATH=../../sdfv_base python ../../sdfv_base/tools/benchmark_encoding.py --compare report_a.json report_b.json
+
+_SDFV_BASE_DIR = Path(__file__).resolve().parents[1]
+
+
+def _parse_chunk_size(value: str) -> List[int]:
+    rows, cols = value.lower().split("x")
+    return [int(rows), int(cols)]
+
+
+def run_benchmarks(project_dir: str = ".", runs: int = 5, chunks: List[List[int]] = ((60, 40),)) -> Dict[str, Any]:
+    project_path = Path(project_dir).resolve()
+    sys.path[:0] = [str(project_path / "src"), str(_SDFV_BASE_DIR / "src")]
+
+    import numpy as np
+    import pandas as pd
+    from cms_rendner_sdfv.base.transforms import from_binary, to_binary, to_json
+    from cms_rendner_sdfv.pandas.frame.table_source_factory import TableSourceFactory as FrameTableSourceFactory
+    from cms_rendner_sdfv.pandas.styler.table_source_factory import TableSourceFactory as StylerTableSourceFactory
+
+    rows = max(r for r, _ in chunks)
+    cols = max(c for _, c in chunks)
+    df = pd.DataFrame(np.random.RandomState(123).standard_normal((rows, cols)))
+    table_sources = {
+        "unstyled": FrameTableSourceFactory().create(df),
+        "styled": StylerTableSourceFactory().create(df.style.background_gradient().highlight_max(axis=0)),
+    }
+
+    results = []
+    for name, table_source in table_sources.items():
+        for chunk_rows, chunk_cols in chunks:
+            case = f"{name} ({chunk_rows}x{chunk_cols})"
+            table_frame = table_source.compute_chunk_table_frame(0, 0, chunk_rows, chunk_cols)
+            encoded_json = to_json(table_frame)
+            encoded_binary = to_binary(table_frame)
+            measurements = {
+                "to_json": (measure(lambda: to_json(table_frame), runs), len(encoded_json.encode("utf-8"))),
+                "to_binary": (measure(lambda: to_binary(table_frame), runs), len(encoded_binary)),
+                "json.loads": (measure(lambda: json.loads(encoded_json), runs), None),
+                "from_binary": (measure(lambda: from_binary(encoded_binary), runs), None),
+            }
+            for operation, (measurement, payload_bytes) in measurements.items():
+                results.append({
+                    "frame": case,
+                    "shape": [chunk_rows, chunk_cols],
+                    "operation": operation,
+                    **measurement,
+                    "payload_bytes": payload_bytes,
+                })
+                size = "" if payload_bytes is None else f"{payload_bytes:>12} bytes"
+                print(f"{case:<24}{operation:<14}{measurement['median_ms']:>10.2f} ms{size}", file=sys.stderr)
+
+    return {
+        "project": project_path.name,
+        "library": pd.__name__,
+        "library_version": pd.__version__,
+        "python_version": platform.python_version(),
+        "results": results,
+    }
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="Compares the JSON and binary encoding of table frames.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--chunks", type=_parse_chunk_size, nargs="+", default=[[60, 40], [500, 100]],
+                        help="chunk sizes, as ROWSxCOLS")
+    parser.add_argument("--output", help="file to write the JSON report to (default: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "OTHER"), help="compare two reports")
+    args = parser.parse_args()
+
+    if args.compare:
+        print_comparison(*args.compare)
+        return
+
+    report = json.dumps(run_benchmarks(runs=args.runs, chunks=args.chunks), indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf8") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    _main()
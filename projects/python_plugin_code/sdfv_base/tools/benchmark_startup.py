@@ -0,0 +1,99 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+# Measures the time-to-first-chunk of a fresh interpreter, which loads the plugin modules in the same way as
+# the plugin does (via the plugin-modules importer and registered dumps), with and without the bytecode cache.
+#
+# usage (run from the directory of a pandas or polars project, after the dumps were generated):
+#   python ../../sdfv_base/tools/benchmark_startup.py [runs]
+
+_SDFV_BASE_DIR = Path(__file__).resolve().parents[1]
+
+_CHILD_CODE = """
+import json, sys, time
+importer_path, base_dump_path, dump_path, dump_id, cache_dir = sys.argv[1:]
+
+if dump_id == "pandas":
+    import pandas as pd
+    data = pd.DataFrame({f"col_{c}": range(c, c + 10_000) for c in range(50)})
+    factory_module = "cms_rendner_sdfv.pandas.frame.table_source_factory"
+else:
+    import polars as pl
+    data = pl.DataFrame({f"col_{c}": range(c, c + 10_000) for c in range(50)})
+    factory_module = "cms_rendner_sdfv.polars.table_source_factory"
+
+start = time.perf_counter()
+with open(importer_path, encoding="utf8") as f:
+    exec(f.read(), {})
+from cms_rendner_sdfv import package_registry
+if cache_dir:
+    package_registry.enable_bytecode_cache(cache_dir=cache_dir)
+for d_id, path in (("base", base_dump_path), (dump_id, dump_path)):
+    with open(path, encoding="utf8") as f:
+        package_registry.register_package_dump(d_id, f.read())
+import importlib
+table_source = importlib.import_module(factory_module).TableSourceFactory().create(data)
+table_source.compute_chunk_table_frame(0, 0, 30, 20)
+print(json.dumps(time.perf_counter() - start))
+"""
+
+
+def _run_child(project_dir: Path, dump_id: str, cache_dir: Optional[str]) -> float:
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            _CHILD_CODE,
+            str(_SDFV_BASE_DIR / "generated" / "plugin_modules_importer"),
+            str(_SDFV_BASE_DIR / "generated" / "plugin_modules_dump.json"),
+            str(project_dir / "generated" / "plugin_modules_dump.json"),
+            dump_id,
+            cache_dir or "",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _format_timings(timings: List[float]) -> str:
+    return f"median: {statistics.median(timings) * 1000:.1f} ms, min: {min(timings) * 1000:.1f} ms"
+
+
+def benchmark_startup(project_dir: str = ".", runs: int = 5):
+    project_path = Path(project_dir).resolve()
+    dump_id = "polars" if project_path.name.startswith("polars") else "pandas"
+
+    without_cache = [_run_child(project_path, dump_id, None) for _ in range(runs)]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # first run populates the cache
+        cold_cache = _run_child(project_path, dump_id, cache_dir)
+        with_cache = [_run_child(project_path, dump_id, cache_dir) for _ in range(runs)]
+
+    print(f"time-to-first-chunk ({project_path.name}, {runs} runs)")
+    print(f"  without bytecode cache: {_format_timings(without_cache)}")
+    print(f"  populating the cache:   {cold_cache * 1000:.1f} ms")
+    print(f"  with bytecode cache:    {_format_timings(with_cache)}")
+
+
+if __name__ == "__main__":
+    benchmark_startup(runs=int(sys.argv[1]) if len(sys.argv) > 1 else 5)
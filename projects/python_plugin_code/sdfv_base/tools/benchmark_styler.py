@@ -0,0 +1,182 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import argparse
+import json
+import platform
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from tools.benchmark_chunks import measure, print_comparison
+
+# Measures how the styling of a chunk scales with the size of the frame and the number of todos, per todo type:
+#   - "patch_todos_for_chunk" of the "TodosPatcher" (creating the chunk aware todos)
+#   - "compute_chunk_table_frame" of a "PatchedStyler"
+#   - "validate_style_functions" of a "PatchedStyler" with the FAST and PRECISION strategy
+#
+# The report has the same format as the one of "benchmark_chunks.py" and can be compared with "--compare".
+#
+# usage (run from the directory of a pandas project, in the environment of its Pipfile):
+#   PYTHONPATH=../../sdfv_base python ../../sdfv_base/tools/benchmark_styler.py [--runs 5] [--rows 10000 100000]
+#   PYTHONPATH=../../sdfv_base python ../../sdfv_base/tools/benchmark_styler.py --compare report_a.json report_b.json
+
+_SDFV_BASE_DIR = Path(__file__).resolve().parents[1]
+
+_CHUNK_ROWS = 60
+_CHUNK_COLS = 20
+_COLS = 20
+
+
+def _highlight_negative(data):
+    return ["color: red" if v < 0 else "" for v in data]
+
+
+def _color_negative(value):
+    return "color: red" if value < 0 else ""
+
+
+def _create_todo_types() -> Dict[str, Callable[[Any], Any]]:
+    from pandas.io.formats.style import Styler
+
+    # "Styler.applymap" was renamed to "Styler.map" in pandas 2.1
+    map_name = "map" if hasattr(Styler, "map") else "applymap"
+
+    todo_types = {
+        "background_gradient": lambda s: s.background_gradient(axis=0),
+        "highlight_max": lambda s: s.highlight_max(axis=0),
+        "highlight_min": lambda s: s.highlight_min(axis=1),
+        "highlight_null": lambda s: s.highlight_null(),
+        "set_properties": lambda s: s.set_properties(**{"color": "blue"}),
+        "apply": lambda s: s.apply(_highlight_negative, axis=0),
+        "map": lambda s: getattr(s, map_name)(_color_negative),
+    }
+    # added in pandas 1.3
+    if hasattr(Styler, "text_gradient"):
+        todo_types["text_gradient"] = lambda s: s.text_gradient(axis=None)
+    if hasattr(Styler, "highlight_between"):
+        todo_types["highlight_between"] = lambda s: s.highlight_between(left=-0.5, right=0.5)
+    return todo_types
+
+
+def _chain(todo: Callable[[Any], Any], count: int) -> Callable[[Any], Any]:
+    def apply_todos(styler):
+        for _ in range(count):
+            styler = todo(styler)
+        return styler
+
+    return apply_todos
+
+
+def _benchmark_styler(styler: Any, runs: int) -> Dict[str, Dict[str, Any]]:
+    from cms_rendner_sdfv.base.types import Region
+    from cms_rendner_sdfv.pandas.styler.patched_styler import PatchedStyler
+    from cms_rendner_sdfv.pandas.styler.patched_styler_context import PatchedStylerContext
+    from cms_rendner_sdfv.pandas.styler.todos_patcher import TodosPatcher
+    from cms_rendner_sdfv.pandas.styler.types import ValidationStrategyType
+
+    context = PatchedStylerContext(styler)
+    patched_styler = PatchedStyler(context, "")
+    chunk_df = context.visible_frame.get_chunk(Region(0, 0, _CHUNK_ROWS, _CHUNK_COLS)).to_frame()
+    todos = context.get_styler_todos()
+
+    return {
+        "patch_todos_for_chunk": measure(
+            lambda: TodosPatcher().patch_todos_for_chunk(todos, styler.data, chunk_df),
+            runs,
+        ),
+        "compute_chunk_table_frame": measure(
+            lambda: patched_styler.compute_chunk_table_frame(0, 0, _CHUNK_ROWS, _CHUNK_COLS),
+            runs,
+        ),
+        "validate_style_functions (FAST)": measure(
+            lambda: patched_styler.validate_style_functions(
+                0, 0, _CHUNK_ROWS, _CHUNK_COLS, ValidationStrategyType.FAST,
+            ),
+            runs,
+        ),
+        "validate_style_functions (PRECISION)": measure(
+            lambda: patched_styler.validate_style_functions(
+                0, 0, _CHUNK_ROWS, _CHUNK_COLS, ValidationStrategyType.PRECISION,
+            ),
+            runs,
+        ),
+    }
+
+
+def run_benchmarks(project_dir: str = ".",
+                   runs: int = 5,
+                   rows: List[int] = (10_000, 100_000),
+                   todo_counts: List[int] = (1, 5, 20),
+                   ) -> Dict[str, Any]:
+    project_path = Path(project_dir).resolve()
+    sys.path[:0] = [str(project_path / "src"), str(_SDFV_BASE_DIR / "src")]
+
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.RandomState(123)
+    todo_types = _create_todo_types()
+    results = []
+
+    def add_results(case: str, df: pd.DataFrame, styler: Any):
+        for operation, measurement in _benchmark_styler(styler, runs).items():
+            results.append({"frame": case, "shape": list(df.shape), "operation": operation, **measurement})
+            print(f"{case:<36}{operation:<38}{measurement['median_ms']:>10.2f} ms", file=sys.stderr)
+
+    for n in rows:
+        df = pd.DataFrame(rng.standard_normal((n, _COLS)), columns=[f"col_{c}" for c in range(_COLS)])
+        # scaling with the size of the frame, per todo type
+        for name, todo in todo_types.items():
+            add_results(f"{name} ({n} rows)", df, todo(df.style))
+        # scaling with the number of todos
+        for count in todo_counts:
+            add_results(f"{count} x apply ({n} rows)", df, _chain(todo_types["apply"], count)(df.style))
+        all_todos = df.style
+        for todo in todo_types.values():
+            all_todos = todo(all_todos)
+        add_results(f"all todo types ({n} rows)", df, all_todos)
+
+    return {
+        "project": project_path.name,
+        "library": pd.__name__,
+        "library_version": pd.__version__,
+        "python_version": platform.python_version(),
+        "chunk": [_CHUNK_ROWS, _CHUNK_COLS],
+        "results": results,
+    }
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="Benchmarks the styler patchers and style function validation.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000], help="rows of the styled frames")
+    parser.add_argument("--todos", type=int, nargs="+", default=[1, 5, 20], help="numbers of chained apply todos")
+    parser.add_argument("--output", help="file to write the JSON report to (default: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "OTHER"), help="compare two reports")
+    args = parser.parse_args()
+
+    if args.compare:
+        print_comparison(*args.compare)
+        return
+
+    report = json.dumps(run_benchmarks(runs=args.runs, rows=args.rows, todo_counts=args.todos), indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf8") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    _main()
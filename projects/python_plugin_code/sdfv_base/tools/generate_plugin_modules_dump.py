@@ -1,4 +1,4 @@
-#  Copyright 2021-2023 cms.rendner (Daniel Schmidt)
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
 #
 #  Licensed under the Apache License, Version 2.0 (the "License");
 #  you may not use this file except in compliance with the License.
@@ -11,28 +11,94 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+import base64
 import json
 import os
+import zlib
 from contextlib import closing
 from io import StringIO
 from pathlib import Path
+from typing import Dict, List, Optional
+
+from tools.source_minifier import minify_source, tree_shake
 
 
 class PackageStructureDumper:
 
     @staticmethod
-    def to_json(root: str, package: str):
+    def to_json(root: str, package: str, minify: bool = False, entry_points: Optional[List[str]] = None):
+        # minify:
+        #   Removes comments, docstrings and annotations (of function signatures and local variables)
+        #   from the dumped sources. Requires Python 3.9 or higher to generate the dump.
+        # entry_points:
+        #   Fully qualified names of the modules imported by the plugin. If specified, only these modules
+        #   and the modules (transitively) imported by them are dumped.
         v_file_system = {}
         root_path = Path(root)
         path_list = (root_path / package).rglob("*.py")
         for path in path_list:
-            PackageStructureDumper._insert_with_path_structure(v_file_system, root_path, path)
+            PackageStructureDumper._insert_with_path_structure(v_file_system, root_path, path, minify)
         if not v_file_system:
             raise ValueError(f"No files to dump, package '{(root_path / package).absolute()}' doesn't contain .py files.")
+        if entry_points is not None:
+            v_file_system = PackageStructureDumper._tree_shake(v_file_system, entry_points)
         return json.dumps(v_file_system, sort_keys=True, indent=4)
 
     @staticmethod
-    def _insert_with_path_structure(virtual_file_system: dict, root_dir: Path, file_path: Path):
+    def to_compressed(
+            root: str,
+            package: str,
+            minify: bool = False,
+            entry_points: Optional[List[str]] = None,
+    ) -> str:
+        # Creates a compressed dump which can be registered in the "package_registry" of the importer.
+        # The modules are stored as a flat JSON index {fq_name: [start, end]} followed by the utf8 encoded
+        # sources of all modules. The index is used by the importer to decode a module only on first import.
+        v_file_system = json.loads(PackageStructureDumper.to_json(root, package, minify, entry_points))
+        index = {}
+        blob = bytearray()
+
+        for fq_name, source in sorted(PackageStructureDumper.flatten(v_file_system).items()):
+            encoded = source.encode('utf8')
+            index[fq_name] = [len(blob), len(blob) + len(encoded)]
+            blob.extend(encoded)
+
+        payload = json.dumps(index).encode('utf8') + b'\n' + bytes(blob)
+        return base64.b64encode(zlib.compress(payload, 9)).decode('ascii')
+
+    @staticmethod
+    def flatten(v_file_system: dict) -> Dict[str, str]:
+        # Returns the sources of the virtual file system by the fully qualified names of the modules.
+        result = {}
+
+        def collect(package_name: str, entries: dict):
+            for key, entry in entries.items():
+                fq_name = f"{package_name}.{key}" if package_name else key
+                if isinstance(entry, dict):
+                    collect(fq_name, entry)
+                else:
+                    result[fq_name] = entry
+
+        collect("", v_file_system)
+        return result
+
+    @staticmethod
+    def _tree_shake(v_file_system: dict, entry_points: List[str]) -> dict:
+        sources = PackageStructureDumper.flatten(v_file_system)
+        missing = [e for e in entry_points if e not in sources]
+        if missing:
+            raise ValueError(f"Entry points not found in the dumped package: {missing}")
+        result = {}
+        for fq_name, source in tree_shake(sources, entry_points).items():
+            *package_parts, key = fq_name.split(".")
+            target_package = result
+            for p in package_parts:
+                target_package = target_package.setdefault(p, {})
+            target_package[key] = source
+        return result
+
+    @staticmethod
+    def _insert_with_path_structure(virtual_file_system: dict, root_dir: Path, file_path: Path, minify: bool):
         if os.path.getsize(file_path) == 0:
             return
 
@@ -45,6 +111,11 @@ class PackageStructureDumper:
 
             target_package = target_package[p]
 
+        key = parts[-1][:-len(".py")]
+        if minify:
+            target_package[key] = minify_source(file_path.read_text(encoding='utf8'))
+            return
+
         with closing(StringIO()) as output:
             with open(file_path, encoding='utf8', newline='\n') as file:
                 for line in file:
@@ -52,7 +123,6 @@ class PackageStructureDumper:
                     if not stripped_line.startswith("#"):
                         output.write(line)
 
-            key = parts[-1][:-len(".py")]
             target_package[key] = output.getvalue()
 
 
@@ -60,7 +130,13 @@ def generate_plugin_modules_dump(
         src_root: str = "src",
         root_package_to_dump: str = "cms_rendner_sdfv",
         output_file: str = "generated/plugin_modules_dump.json",
+        compress: bool = False,
+        minify: bool = False,
+        entry_points: Optional[List[str]] = None,
 ):
-    dump = PackageStructureDumper.to_json(src_root, root_package_to_dump)
+    if compress:
+        dump = PackageStructureDumper.to_compressed(src_root, root_package_to_dump, minify, entry_points)
+    else:
+        dump = PackageStructureDumper.to_json(src_root, root_package_to_dump, minify, entry_points)
     with open(output_file, 'w', encoding="utf8", newline='\n') as outfile:
         outfile.write(dump)
@@ -0,0 +1,162 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from tools.generate_plugin_modules_dump import PackageStructureDumper
+
+# Compares the regular dumps with the minified (and tree-shaken) dumps of a project:
+#   - verifies that the minified sources are equivalent, by running the tests of the project against them
+#   - reports the size of the dumps (plain and compressed)
+#   - reports the injection time (registering the dumps and importing the entry points) of a fresh interpreter
+#
+# usage (run from the directory of a pandas or polars project):
+#   PYTHONPATH=../../sdfv_base python ../../sdfv_base/tools/report_minified_dump.py [runs]
+
+_SDFV_BASE_DIR = Path(__file__).resolve().parents[1]
+_ROOT_PACKAGE = "cms_rendner_sdfv"
+
+# the modules imported by the plugin
+_ENTRY_POINTS = {
+    "pandas": [
+        "cms_rendner_sdfv.pandas.frame.table_source_factory",
+        "cms_rendner_sdfv.pandas.styler.table_source_factory",
+    ],
+    "polars": ["cms_rendner_sdfv.polars.table_source_factory"],
+}
+
+_CHILD_CODE = """
+import importlib, json, sys, time
+importer_path, base_dump_path, dump_path, dump_id, entry_points = sys.argv[1:]
+importlib.import_module(dump_id)
+
+with open(importer_path, encoding="utf8") as f:
+    importer_source = f.read()
+dumps = []
+for d_id, path in (("base", base_dump_path), (dump_id, dump_path)):
+    with open(path, encoding="utf8") as f:
+        dumps.append((d_id, f.read()))
+
+start = time.perf_counter()
+exec(importer_source, {})
+from cms_rendner_sdfv import package_registry
+for d_id, dump in dumps:
+    package_registry.register_package_dump(d_id, dump)
+for entry_point in entry_points.split(","):
+    importlib.import_module(entry_point)
+print(json.dumps(time.perf_counter() - start))
+"""
+
+
+def _write_sources(target_dir: Path, v_file_system: dict):
+    for fq_name, source in PackageStructureDumper.flatten(v_file_system).items():
+        path = target_dir.joinpath(*fq_name.split(".")).with_suffix(".py")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source, encoding="utf8")
+
+
+def _run_tests(project_dir: Path, src_dir: Path) -> int:
+    # "pythonpath" of the pytest.ini is overwritten to not use the original sources
+    return subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "-o", f"pythonpath=. {src_dir}"],
+        cwd=project_dir,
+        env={**os.environ, "PYTHONPATH": str(src_dir)},
+    ).returncode
+
+
+def _measure_injection(dump_files: Dict[str, Path], dump_id: str, entry_points: List[str]) -> float:
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            _CHILD_CODE,
+            str(_SDFV_BASE_DIR / "generated" / "plugin_modules_importer"),
+            str(dump_files["base"]),
+            str(dump_files[dump_id]),
+            dump_id,
+            ",".join(entry_points),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _format_size(size: int) -> str:
+    return f"{size / 1024:.1f} KiB"
+
+
+def report_minified_dump(project_dir: str = ".", runs: int = 5, entry_points: Optional[List[str]] = None):
+    project_path = Path(project_dir).resolve()
+    dump_id = "polars" if project_path.name.startswith("polars") else "pandas"
+    entry_points = entry_points or _ENTRY_POINTS[dump_id]
+    src_roots = {"base": str(_SDFV_BASE_DIR / "src"), dump_id: str(project_path / "src")}
+
+    # the base dump is shared by all projects, therefore it is only minified
+    dumps = {
+        "plain": {d_id: PackageStructureDumper.to_json(root, _ROOT_PACKAGE) for d_id, root in src_roots.items()},
+        "minified": {
+            "base": PackageStructureDumper.to_json(src_roots["base"], _ROOT_PACKAGE, minify=True),
+            dump_id: PackageStructureDumper.to_json(src_roots[dump_id], _ROOT_PACKAGE, True, entry_points),
+        },
+    }
+    compressed = {
+        "plain": {d_id: PackageStructureDumper.to_compressed(root, _ROOT_PACKAGE) for d_id, root in src_roots.items()},
+        "minified": {
+            "base": PackageStructureDumper.to_compressed(src_roots["base"], _ROOT_PACKAGE, minify=True),
+            dump_id: PackageStructureDumper.to_compressed(src_roots[dump_id], _ROOT_PACKAGE, True, entry_points),
+        },
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path = Path(tmp_dir)
+        src_dir = tmp_path / "src"
+        for dump in dumps["minified"].values():
+            _write_sources(src_dir, json.loads(dump))
+        if _run_tests(project_path, src_dir) != 0:
+            raise RuntimeError("The tests failed for the minified sources.")
+
+        timings = {}
+        for kind in ("plain", "minified"):
+            for variant, variant_dumps in ((kind, dumps[kind]), (f"{kind}, compressed", compressed[kind])):
+                dump_files = {}
+                for d_id, dump in variant_dumps.items():
+                    dump_files[d_id] = tmp_path / f"{d_id}_{len(timings)}.dump"
+                    dump_files[d_id].write_text(dump, encoding="utf8")
+                timings[variant] = [_measure_injection(dump_files, dump_id, entry_points) for _ in range(runs)]
+
+    print(f"dump sizes ({project_path.name}, base + {dump_id})")
+    for kind in ("plain", "minified"):
+        for variant, variant_dumps in ((kind, dumps[kind]), (f"{kind}, compressed", compressed[kind])):
+            sizes = {d_id: len(dump.encode("utf8")) for d_id, dump in variant_dumps.items()}
+            details = ", ".join(f"{d_id}: {_format_size(size)}" for d_id, size in sizes.items())
+            print(f"  {variant + ':':<22}{_format_size(sum(sizes.values()))} ({details})")
+
+    print(f"injection time ({runs} runs)")
+    for variant, variant_timings in timings.items():
+        print(
+            f"  {variant + ':':<22}median: {statistics.median(variant_timings) * 1000:.1f} ms, "
+            f"min: {min(variant_timings) * 1000:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    report_minified_dump(runs=int(sys.argv[1]) if len(sys.argv) > 1 else 5)
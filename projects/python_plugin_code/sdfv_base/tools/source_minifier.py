@@ -0,0 +1,122 @@
+#  Copyright 2021-2024 cms.rendner (Daniel Schmidt)
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import ast
+import sys
+from typing import Collection, Dict, Iterable, Set
+
+
+class _Minifier(ast.NodeTransformer):
+    # Removes docstrings, the annotations of function signatures and the annotations of local variables.
+    # Annotations in class bodies are kept, they are required by dataclasses and NamedTuples.
+
+    def __init__(self):
+        self._function_depth = 0
+
+    def visit_Module(self, node: ast.Module):
+        self._strip_docstring(node)
+        return self.generic_visit(node)
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self._strip_docstring(node)
+        function_depth = self._function_depth
+        self._function_depth = 0
+        node = self.generic_visit(node)
+        self._function_depth = function_depth
+        return node
+
+    def visit_FunctionDef(self, node):
+        self._strip_docstring(node)
+        args = node.args
+        for arg in [*args.posonlyargs, *args.args, *args.kwonlyargs, args.vararg, args.kwarg]:
+            if arg is not None:
+                arg.annotation = None
+        node.returns = None
+        self._function_depth += 1
+        node = self.generic_visit(node)
+        self._function_depth -= 1
+        return node
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_AnnAssign(self, node: ast.AnnAssign):
+        if self._function_depth == 0:
+            return self.generic_visit(node)
+        if node.value is None:
+            # a bare annotation of a local variable
+            return None
+        return ast.copy_location(ast.Assign(targets=[node.target], value=self.visit(node.value)), node)
+
+    def generic_visit(self, node):
+        node = super().generic_visit(node)
+        # removed statements can leave an empty block behind
+        body = getattr(node, "body", None)
+        if isinstance(body, list) and not body and not isinstance(node, ast.Module):
+            body.append(ast.Pass())
+        return node
+
+    @staticmethod
+    def _strip_docstring(node):
+        body = node.body
+        if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+                and isinstance(body[0].value.value, str):
+            del body[0]
+
+
+def minify_source(source: str) -> str:
+    # ast.unparse drops comments and blank lines, the result is semantically equivalent to the source
+    if sys.version_info < (3, 9):
+        raise RuntimeError("Minifying requires Python 3.9 or higher.")
+    tree = _Minifier().visit(ast.parse(source))
+    return ast.unparse(ast.fix_missing_locations(tree)) + "\n"
+
+
+def find_imported_modules(fq_name: str, source: str, module_names: Collection[str]) -> Set[str]:
+    # Returns the names of all modules from "module_names" which are imported by the module.
+    # Imports inside of functions are included, they are often used to resolve cyclic imports.
+    result = set()
+
+    def add(name: str):
+        parts = name.split(".")
+        for i in range(1, len(parts) + 1):
+            candidate = ".".join(parts[:i])
+            if candidate in module_names:
+                result.add(candidate)
+
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                add(alias.name)
+        elif isinstance(node, ast.ImportFrom):
+            module = node.module or ""
+            if node.level:
+                package = fq_name.split(".")[:-node.level]
+                module = ".".join(package + ([module] if module else []))
+            add(module)
+            for alias in node.names:
+                add(f"{module}.{alias.name}")
+
+    return result
+
+
+def tree_shake(sources: Dict[str, str], entry_points: Iterable[str]) -> Dict[str, str]:
+    # Returns only the modules which are (transitively) imported by the entry points.
+    reachable = set()
+    pending = [e for e in entry_points if e in sources]
+    while pending:
+        name = pending.pop()
+        if name in reachable:
+            continue
+        reachable.add(name)
+        pending.extend(find_imported_modules(name, sources[name], sources.keys()) - reachable)
+    return {name: source for name, source in sources.items() if name in reachable}